@@ -0,0 +1,156 @@
+"""
+文件树路径索引
+"""
+
+import os
+
+class PathIndex:
+    """
+    文件树的路径索引，按相对路径以O(1)查找节点
+    
+    除了相对路径到节点的映射，还按目录保存子节点名称表（目录字典树），
+    用于按路径前缀查询以及移除时找到整棵子树的索引项。
+    只索引已加载的节点；按需加载的目录在加载后首次查询时补充索引。
+    文件树被修改时（如实时同步）需调用 add / remove 同步更新。
+    """
+    
+    def __init__(self, root_path=""):
+        self._reset(root_path)
+    
+    def __len__(self):
+        return len(self._nodes)
+    
+    def __contains__(self, rel_path):
+        return self.get(rel_path) is not None
+    
+    def build(self, root_node):
+        """为整棵（已加载的）文件树重建索引"""
+        self._reset(root_node.path if root_node else "")
+        if root_node is not None:
+            self._nodes[""] = root_node
+            self._index_subtree("", root_node)
+    
+    def relative_path(self, node):
+        """节点相对于根节点的路径（根节点为""）"""
+        path = node.path
+        if path == self.root_path:
+            return ""
+        if path.startswith(self._prefix):
+            return path[len(self._prefix):]
+        return os.path.relpath(path, self.root_path)
+    
+    def get(self, rel_path):
+        """按相对路径查找节点，不在树中（或所在目录尚未加载）时返回None"""
+        node = self._nodes.get(rel_path)
+        if node is not None or not rel_path:
+            return node
+        
+        # 可能位于按需加载后尚未索引的目录中
+        rel_dir, _, name = rel_path.rpartition(os.sep)
+        entries = self._get_entries(rel_dir)
+        return entries.get(name) if entries else None
+    
+    def find(self, path):
+        """按完整路径查找节点"""
+        if path == self.root_path:
+            return self._nodes.get("")
+        if not self._prefix or not path.startswith(self._prefix):
+            return None
+        return self.get(path[len(self._prefix):])
+    
+    def iter_prefix(self, prefix):
+        """
+        按相对路径前缀先序产出节点，前缀的最后一段可以是名称的一部分（如 src/ma）
+        
+        Yields:
+            tuple: (相对路径, 节点)
+        """
+        rel_dir, _, name_prefix = prefix.rpartition(os.sep)
+        entries = self._get_entries(rel_dir)
+        if not entries:
+            return
+        
+        dir_prefix = rel_dir + os.sep if rel_dir else ""
+        stack = [dir_prefix + name for name in reversed(list(entries)) if name.startswith(name_prefix)]
+        while stack:
+            rel_path = stack.pop()
+            yield rel_path, self._nodes[rel_path]
+            children = self._get_entries(rel_path)
+            if children:
+                stack.extend(rel_path + os.sep + name for name in reversed(list(children)))
+    
+    def add(self, node):
+        """索引新挂接到树中的节点及其已加载的子树"""
+        rel_path = self.relative_path(node)
+        entries = self._entries.get(rel_path.rpartition(os.sep)[0])
+        if entries is None:
+            # 父目录的子节点尚未索引，查询时会连同该节点一起补充
+            return
+        entries[node.name] = node
+        self._nodes[rel_path] = node
+        self._index_subtree(rel_path, node)
+    
+    def remove(self, node):
+        """移除节点及其子树的索引项（节点可以已从父节点移除）"""
+        rel_path = self.relative_path(node)
+        if self._nodes.get(rel_path) is not node:
+            return
+        del self._nodes[rel_path]
+        entries = self._entries.get(rel_path.rpartition(os.sep)[0])
+        if entries is not None:
+            entries.pop(node.name, None)
+        
+        stack = [rel_path]
+        while stack:
+            current = stack.pop()
+            children = self._entries.pop(current, None)
+            if children:
+                for name in children:
+                    child_path = current + os.sep + name
+                    self._nodes.pop(child_path, None)
+                    stack.append(child_path)
+    
+    def _reset(self, root_path):
+        """清空索引"""
+        self.root_path = root_path  # 根节点的完整路径
+        self._prefix = root_path.rstrip(os.sep) + os.sep if root_path else ""
+        self._nodes = {}  # 相对路径 -> 节点，根节点为""
+        self._entries = {}  # 目录相对路径 -> {名称: 子节点}，只包含子节点已索引的目录
+    
+    def _index_subtree(self, rel_path, node):
+        """索引节点下已加载的子树（不触发按需加载）"""
+        stack = [(rel_path, node)]
+        while stack:
+            current_path, current = stack.pop()
+            if not current.is_directory or not current.is_loaded():
+                continue
+            
+            entries = self._entries[current_path] = {}
+            prefix = current_path + os.sep if current_path else ""
+            for child in current.children:
+                child_path = prefix + child.name
+                entries[child.name] = child
+                self._nodes[child_path] = child
+                stack.append((child_path, child))
+    
+    def _get_entries(self, rel_dir):
+        """目录的子节点名称表，目录已加载但尚未索引时从最近的已索引祖先向下补充"""
+        entries = self._entries.get(rel_dir)
+        if entries is not None:
+            return entries
+        
+        chain = [rel_dir]
+        current = rel_dir
+        while current and current not in self._entries:
+            current = current.rpartition(os.sep)[0]
+            chain.append(current)
+        
+        for current in reversed(chain):
+            if current in self._entries:
+                # 已随上级目录一起索引
+                continue
+            node = self._nodes.get(current)
+            if node is None or not node.is_directory or not node.is_loaded():
+                return None
+            self._index_subtree(current, node)
+        return self._entries.get(rel_dir)
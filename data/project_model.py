@@ -2,7 +2,10 @@
 工程数据模型
 """
 
+import os
 from data.tree_node import TreeNode
+from data.path_index import PathIndex
+from data.search_index import SearchIndex, rank_nodes
 
 class ProjectModel:
     """工程数据模型类"""
@@ -10,8 +13,14 @@ class ProjectModel:
     def __init__(self):
         self.project_path = ""  # 工程根目录路径
         self.root_node = None  # 根节点
+        self.tree_store = None  # 列式存储的文件树（使用时root_node为其根节点视图）
+        self.path_index = PathIndex()  # 相对路径 -> 节点的索引（列式存储不建索引）
+        self.search_index = SearchIndex()  # 名称搜索索引（列式存储不建索引）
+        self.annotation_store = None  # 描述和标签的持久化存储（按相对路径保存）
         self.filter_conditions = []  # 过滤条件列表
+        self.include_conditions = []  # 包含条件列表（为空时不限制）
         self.use_gitignore = False  # 是否使用.gitignore
+        self.lazy_load = False  # 是否按需加载（目录展开时才读取）
         
     def set_project_path(self, path):
         """设置工程路径"""
@@ -20,6 +29,132 @@ class ProjectModel:
     def set_root_node(self, root_node):
         """设置根节点"""
         self.root_node = root_node
+        self.tree_store = None
+        self.path_index.build(root_node)
+        self.search_index.build(root_node)
+        
+    def set_tree_store(self, tree_store):
+        """使用列式存储的文件树（适用于超大工程），根节点为存储的根节点视图"""
+        self.tree_store = tree_store
+        self.root_node = tree_store.root() if tree_store else None
+        self.path_index = PathIndex(tree_store.root_path if tree_store else "")
+        self.search_index = SearchIndex(tree_store.root_path if tree_store else "")
+        
+    def find_node(self, rel_path):
+        """按相对于工程根目录的路径查找节点（根节点为""），不存在时返回None"""
+        if self.tree_store is None:
+            return self.path_index.get(rel_path)
+        
+        # 列式存储没有索引，逐级按名称查找
+        node = self.root_node
+        for name in rel_path.split(os.sep) if rel_path else ():
+            node = next((child for child in node.children if child.name == name), None)
+            if node is None:
+                break
+        return node
+        
+    def search(self, query, limit=50, fuzzy=False):
+        """按名称搜索节点，返回按得分排序的前limit个（列式存储逐个比较，且不支持按路径搜索）"""
+        if self.tree_store is None:
+            return self.search_index.search(query, limit, fuzzy)
+        if not self.root_node:
+            return []
+        return rank_nodes((node for node, _ in self.root_node.walk()), query, limit, fuzzy)
+        
+    def get_relative_path(self, node):
+        """节点相对于工程根目录的路径（根节点为""）"""
+        return self.path_index.relative_path(node)
+        
+    def set_annotation_store(self, annotation_store):
+        """设置描述和标签的持久化存储，并将保存的描述应用到已加载的节点"""
+        self.annotation_store = annotation_store
+        if annotation_store is not None:
+            self.apply_descriptions()
+            
+    def apply_descriptions(self, node=None):
+        """
+        将保存的描述应用到节点（默认为根节点）的子树中已加载的节点，
+        按需加载的目录展开后需对该目录再次调用
+        
+        Returns:
+            int: 应用的描述数
+        """
+        if self.annotation_store is None or self.root_node is None:
+            return 0
+        count = 0
+        for target, _, description in self._read_annotations(self.annotation_store.get_descriptions, node):
+            target.description = description
+            count += 1
+        return count
+        
+    def _read_annotations(self, read, node=None):
+        """
+        读取节点（默认为根节点）子树中已加载节点保存的描述或标签
+        
+        完整加载的文件树按目录前缀一次读取；按需加载模式下先加载该节点，
+        再对子树中每个已加载的目录只读取其直接子条目，不读取未加载部分的条目
+        
+        Args:
+            read: AnnotationStore的读取方法（get_descriptions 或 get_tags）
+        
+        Returns:
+            list: [(节点, 相对路径, 值), ...]
+        """
+        node = node or self.root_node
+        if not self.lazy_load:
+            results = []
+            for rel_path, value in read(self.get_relative_path(node)).items():
+                target = self.find_node(rel_path)
+                if target is not None:
+                    results.append((target, rel_path, value))
+            return results
+        
+        if node.is_directory:
+            # 访问children即加载该目录（按需加载扫描后根节点尚未加载，而界面总会显示其子节点）
+            node.children
+        results = []
+        for directory, _ in node.walk(loaded_only=True):
+            if not directory.is_directory or not directory.is_loaded():
+                continue
+            rel_dir = self.get_relative_path(directory)
+            children = {child.name: child for child in directory.children}
+            for rel_path, value in read(rel_dir, direct=True).items():
+                if rel_path == rel_dir:
+                    target = directory if directory is node else None
+                else:
+                    target = children.get(rel_path.rpartition(os.sep)[2])
+                if target is not None:
+                    results.append((target, rel_path, value))
+        return results
+        
+    def set_description(self, node, description):
+        """修改节点描述，同时记入持久化存储"""
+        node.description = description
+        if self.annotation_store is not None:
+            self.annotation_store.set_description(self.get_relative_path(node), description)
+            
+    def load_tags(self, node=None):
+        """读取节点（默认为根节点）子树中已加载节点保存的标签，返回 相对路径 -> 标签列表（读取范围同 apply_descriptions）"""
+        if self.annotation_store is None or self.root_node is None:
+            return {}
+        return {rel_path: tags for _, rel_path, tags in self._read_annotations(self.annotation_store.get_tags, node)}
+        
+    def get_tags(self, rel_path):
+        """读取某个节点（相对路径）保存的标签"""
+        if self.annotation_store is None:
+            return []
+        return self.annotation_store.get_tags(rel_path, direct=True).get(rel_path, [])
+        
+    def set_tags(self, rel_path, tags):
+        """记入节点（相对路径）的标签"""
+        if self.annotation_store is not None:
+            self.annotation_store.set_tags(rel_path, tags)
+            
+    def find_tagged(self, tag, prefix=""):
+        """查找目录（相对路径）下标记了某标签的相对路径，没有持久化存储时返回None"""
+        if self.annotation_store is None:
+            return None
+        return self.annotation_store.find_tagged(tag, prefix)
         
     def add_filter_condition(self, condition):
         """添加过滤条件"""
@@ -39,11 +174,18 @@ class ProjectModel:
         """设置是否使用.gitignore"""
         self.use_gitignore = use_gitignore
         
+    def set_lazy_load(self, lazy_load):
+        """设置是否按需加载"""
+        self.lazy_load = lazy_load
+        
     def to_dict(self):
-        """转换为字典格式"""
-        return {
+        """转换为字典格式（包含条件只在设置时输出）"""
+        result = {
             'project_path': self.project_path,
             'filter_conditions': self.filter_conditions,
             'use_gitignore': self.use_gitignore,
             'structure': self.root_node.to_dict() if self.root_node else None
-        }
\ No newline at end of file
+        }
+        if self.include_conditions:
+            result['include_conditions'] = self.include_conditions
+        return result
\ No newline at end of file
@@ -0,0 +1,349 @@
+"""
+文件树搜索索引
+"""
+
+import os
+import re
+import heapq
+from array import array
+from bisect import bisect_right
+from itertools import accumulate, count
+
+# 名称中的分词位置，匹配从这些字符之后开始时加分
+BOUNDARY_CHARS = frozenset('/\\_-. ' + os.sep)
+
+NO_SLOT = -1
+
+# 模糊匹配中单个字符的得分：匹配1分，与上一个字符相连加5分，位于分词位置加3分
+MATCH_SCORE = 1
+CONSECUTIVE_BONUS = 5
+BOUNDARY_BONUS = 3
+MAX_CHAR_SCORE = MATCH_SCORE + CONSECUTIVE_BONUS + BOUNDARY_BONUS
+
+def substring_score(query, text):
+    """子串匹配得分（越大越好），不匹配时返回None"""
+    pos = text.find(query)
+    if pos < 0:
+        return None
+    score = 0
+    if len(text) == len(query):
+        score += 100
+    if pos == 0 or text[pos - 1] in BOUNDARY_CHARS:
+        score += 20
+    return score - pos - len(text) * 0.1
+
+def fuzzy_score(query, text):
+    """
+    模糊匹配（query为text的子序列）得分，不匹配时返回None
+    
+    连续匹配和从分词位置开始的匹配加分，字符间的间隔和较长的文本减分；
+    从首字符的每个出现位置各贪心匹配一次，取最高分。
+    """
+    best = None
+    start = text.find(query[0])
+    while start >= 0:
+        score = _greedy_score(query, text, start)
+        if score is None:
+            # 从更靠后的位置开始同样无法匹配
+            break
+        if best is None or score > best:
+            best = score
+        start = text.find(query[0], start + 1)
+    return best
+
+def _greedy_score(query, text, start):
+    """从start开始贪心匹配query的各字符并计分，无法匹配时返回None"""
+    score = -start * 0.1 - len(text) * 0.05
+    prev = start - 1
+    for c in query:
+        pos = text.find(c, prev + 1)
+        if pos < 0:
+            return None
+        score += MATCH_SCORE
+        if pos == prev + 1:
+            score += CONSECUTIVE_BONUS
+        if pos == 0 or text[pos - 1] in BOUNDARY_CHARS:
+            score += BOUNDARY_BONUS
+        score -= (pos - prev - 1) * 0.2
+        prev = pos
+    return score
+
+def rank_nodes(nodes, query, limit=50, fuzzy=False):
+    """
+    逐个比较节点名称并按得分排序（没有索引时使用）
+    
+    Args:
+        nodes: 节点的可迭代对象
+        query: 查询字符串（不区分大小写）
+        limit: 最多返回的结果数，为None时返回全部匹配
+        fuzzy: 为True时按子序列模糊匹配，否则按子串匹配
+    
+    Returns:
+        list: 按得分从高到低排列的节点
+    """
+    query = query.strip().lower()
+    if not query:
+        return []
+    score = fuzzy_score if fuzzy else substring_score
+    order = count()  # 得分相同时保持原顺序，避免比较节点
+    scored = []
+    for node in nodes:
+        node_score = score(query, node.name.lower())
+        if node_score is not None:
+            scored.append((node_score, -next(order), node))
+    
+    key = lambda item: item[:2]
+    ranked = sorted(scored, key=key, reverse=True) if limit is None else heapq.nlargest(limit, scored, key=key)
+    return [node for _, _, node in ranked]
+
+class SearchIndex:
+    """
+    文件树的名称搜索索引，支持子串和模糊（子序列）搜索并按得分返回前K个结果
+    
+    索引以去重后的小写名称为单位（大型工程中大量节点同名，如 __init__.py），
+    所有名称以NUL拼接成一个字符串，查询时由 str.find / 正则在C层一次扫描得到匹配的名称，
+    再对候选名称计分；同名节点共用一次比较。同名节点按索引顺序以数组链表相连，
+    不为每个名称创建列表，百万节点的索引也不会给垃圾回收带来负担。
+    查询包含路径分隔符时按节点的相对路径匹配（匹配须结束于节点自身的名称中）。
+    
+    只索引已加载的节点，按需加载的目录在加载后的下一次查询时补充索引；
+    文件树被修改时（如实时同步）需调用 add / remove 同步更新。
+    """
+    
+    def __init__(self, root_path=""):
+        self._reset(root_path)
+    
+    def __len__(self):
+        return self._count
+    
+    def build(self, root_node):
+        """为整棵（已加载的）文件树重建索引"""
+        self._reset(root_node.path if root_node else "")
+        self._root = root_node
+        if root_node is not None:
+            self.add(root_node)
+    
+    def add(self, node):
+        """索引节点及其已加载的子树"""
+        name_ids = self._name_ids
+        nodes = self._nodes
+        first, last, next_slot = self._first, self._last, self._next
+        for current, _ in node.walk(loaded_only=True):
+            slot = len(nodes)
+            nodes.append(current)
+            next_slot.append(NO_SLOT)
+            
+            key = current.name.lower()
+            name_id = name_ids.get(key)
+            if name_id is None:
+                name_ids[key] = len(self._names)
+                self._names.append(key)
+                first.append(slot)
+                last.append(slot)
+                self._joined = None
+            else:
+                if last[name_id] == NO_SLOT:
+                    first[name_id] = slot
+                else:
+                    next_slot[last[name_id]] = slot
+                last[name_id] = slot
+            
+            self._count += 1
+            if not current.is_loaded():
+                self._pending[current] = None
+    
+    def remove(self, node):
+        """移除节点及其子树的索引项（名称保留在名称表中）"""
+        for current, _ in node.walk(loaded_only=True):
+            name_id = self._name_ids.get(current.name.lower())
+            if name_id is not None:
+                self._unlink(name_id, current)
+            self._pending.pop(current, None)
+    
+    def search(self, query, limit=50, fuzzy=False):
+        """
+        搜索节点
+        
+        Args:
+            query: 查询字符串（不区分大小写），包含路径分隔符时按相对路径匹配
+            limit: 最多返回的结果数，为None时返回全部匹配
+            fuzzy: 为True时按子序列模糊匹配，否则按子串匹配
+        
+        Returns:
+            list: 按得分从高到低排列的节点
+        """
+        self._index_loaded()
+        query = query.strip().lower().replace('/', os.sep).strip(os.sep)
+        if not query or '\0' in query:
+            return []
+        if limit is None:
+            limit = self._count
+        
+        if os.sep in query:
+            return self._search_paths(query, limit, fuzzy)
+        
+        score = fuzzy_score if fuzzy else substring_score
+        candidates = self._find_names(self._fuzzy_regex(query) if fuzzy else query)
+        first = self._first
+        scored = ((score(query, self._names[name_id]), name_id) for name_id in candidates
+                  if first[name_id] != NO_SLOT)
+        
+        results = []
+        for _, name_id in heapq.nlargest(limit, scored):
+            for node in self._iter_nodes(name_id):
+                results.append(node)
+                if len(results) >= limit:
+                    return results
+        return results
+    
+    def _reset(self, root_path):
+        """清空索引"""
+        self.root_path = root_path  # 根节点的完整路径
+        self._root = None  # 根节点
+        self._names = []  # 名称序号 -> 小写名称
+        self._name_ids = {}  # 小写名称 -> 名称序号
+        self._first = array('i')  # 名称序号 -> 第一个同名节点的槽位，没有时为-1
+        self._last = array('i')  # 名称序号 -> 最后一个同名节点的槽位
+        self._nodes = []  # 槽位 -> 节点（移除后为None，槽位不再使用）
+        self._next = array('i')  # 槽位 -> 下一个同名节点的槽位
+        self._joined = None  # "\0名称0\0名称1...\0"，名称增加后在下一次查询时重建
+        self._offsets = None  # 各名称前的NUL在拼接字符串中的位置（末尾多一项）
+        self._pending = {}  # 已索引但子节点尚未加载的目录
+        self._count = 0  # 已索引的节点数
+    
+    def _iter_nodes(self, name_id):
+        """按索引顺序产出使用该名称的节点"""
+        slot = self._first[name_id]
+        while slot != NO_SLOT:
+            yield self._nodes[slot]
+            slot = self._next[slot]
+    
+    def _unlink(self, name_id, node):
+        """从名称的节点链表中移除节点"""
+        previous = NO_SLOT
+        slot = self._first[name_id]
+        while slot != NO_SLOT:
+            if self._nodes[slot] is node:
+                following = self._next[slot]
+                if previous == NO_SLOT:
+                    self._first[name_id] = following
+                else:
+                    self._next[previous] = following
+                if self._last[name_id] == slot:
+                    self._last[name_id] = previous
+                self._nodes[slot] = None
+                self._count -= 1
+                return
+            previous = slot
+            slot = self._next[slot]
+    
+    def _index_loaded(self):
+        """补充索引查询前已加载的按需加载目录"""
+        loaded = [node for node in self._pending if node.is_loaded()]
+        for node in loaded:
+            del self._pending[node]
+            for child in node.children:
+                self.add(child)
+    
+    def _find_names(self, pattern):
+        """
+        在拼接字符串中查找匹配的名称
+        
+        Args:
+            pattern: 子串，或编译后的正则（匹配不跨越NUL）
+        
+        Returns:
+            list: 匹配的名称序号（每个名称至多一次）
+        """
+        if self._joined is None:
+            self._joined = '\0' + '\0'.join(self._names) + '\0'
+            self._offsets = array('q', accumulate((len(name) + 1 for name in self._names), initial=0))
+        
+        joined = self._joined
+        offsets = self._offsets
+        if isinstance(pattern, str):
+            find = joined.find
+        else:
+            def find(sub, start):
+                match = pattern.search(joined, start)
+                return match.start() if match else -1
+        
+        name_ids = []
+        pos = find(pattern, 0)
+        while pos >= 0:
+            name_id = bisect_right(offsets, pos) - 1
+            name_ids.append(name_id)
+            # 跳到下一个名称，同一名称中的其他匹配不再重复
+            pos = find(pattern, offsets[name_id + 1])
+        return name_ids
+    
+    def _fuzzy_regex(self, query):
+        """query各字符依次出现（子序列）的正则，每段排除下一个字符，避免回溯"""
+        parts = [re.escape(query[0])]
+        for c in query[1:]:
+            parts.append(f'[^\\0{re.escape(c)}]*{re.escape(c)}')
+        return re.compile(''.join(parts))
+    
+    def _search_paths(self, query, limit, fuzzy):
+        """
+        按相对路径搜索
+        
+        匹配须结束于节点自身的名称中：最后一段匹配名称，其余部分匹配父目录的相对路径。
+        父目录部分的得分有上限，按名称得分从高到低处理，剩余名称不可能进入前limit时提前结束。
+        """
+        head, tail = query.rsplit(os.sep, 1)
+        if fuzzy:
+            names = self._find_names(self._fuzzy_regex(tail))
+            name_score = fuzzy_score
+            head_bound = MAX_CHAR_SCORE * len(head)
+        else:
+            # 最后一段是名称的前缀，其余部分是父目录相对路径的后缀（父目录部分不计分）
+            names = self._find_names('\0' + tail)
+            name_score = substring_score
+            head_bound = 0
+        
+        first = self._first
+        ranked_names = sorted(((name_score(tail, self._names[name_id]), name_id) for name_id in names
+                               if first[name_id] != NO_SLOT), reverse=True)
+        
+        directory_paths = {self._root: ""}  # 目录节点 -> 小写相对路径
+        parent_scores = {}  # 父节点 -> 父目录部分的得分，不匹配时为None
+        order = count()  # 得分相同时按索引顺序，避免比较节点
+        heap = []  # 当前得分最高的limit个 (得分, -顺序, 节点)
+        for score, name_id in ranked_names:
+            if len(heap) >= limit and score + head_bound <= heap[0][0]:
+                break
+            for node in self._iter_nodes(name_id):
+                parent = node.parent
+                if parent not in parent_scores:
+                    parent_path = self._directory_path(parent, directory_paths)
+                    if fuzzy:
+                        parent_scores[parent] = fuzzy_score(head, parent_path)
+                    else:
+                        parent_scores[parent] = 0 if parent_path.endswith(head) else None
+                parent_score = parent_scores[parent]
+                if parent_score is None:
+                    continue
+                item = (score + parent_score, -next(order), node)
+                if len(heap) < limit:
+                    heapq.heappush(heap, item)
+                else:
+                    heapq.heappushpop(heap, item)
+        
+        return [node for _, _, node in sorted(heap, reverse=True)]
+    
+    def _directory_path(self, node, cache):
+        """目录的小写相对路径，由已缓存的最近上级目录逐级拼接"""
+        chain = []
+        while node not in cache:
+            if node is None:
+                # 不在根节点之下
+                return ""
+            chain.append(node)
+            node = node.parent
+        path = cache[node]
+        for directory in reversed(chain):
+            name = directory.name.lower()
+            path = path + os.sep + name if path else name
+            cache[directory] = path
+        return path
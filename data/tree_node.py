@@ -2,32 +2,233 @@
 树节点数据结构定义
 """
 
+import sys
+from utils.path_utils import PathUtils
+
+# 没有子节点时共用的空子节点序列，添加第一个子节点时才创建列表
+EMPTY_CHILDREN = ()
+
 class TreeNode:
-    """树节点类，用于表示文件系统中的文件或目录"""
+    """
+    树节点类，用于表示文件系统中的文件或目录
+    
+    大型工程中节点数量可达数十万，因此节点使用__slots__，名称经过驻留，
+    没有子节点时共用空序列；完整路径只在根节点（及未挂接的节点）上保存，
+    其余节点由父节点链按需拼接。
+    """
+    
+    __slots__ = ('name', 'is_directory', 'parent', '_path', '_children', 'loader', 'description',
+                 '_size', 'truncated', 'total_size', 'file_count', 'dir_count', 'ext_counts', '_height')
     
     def __init__(self, name, path, is_directory=False, parent=None):
-        self.name = name  # 文件/目录名
-        self.path = path  # 完整路径
+        self.name = sys.intern(name)  # 文件/目录名
+        self._path = path  # 完整路径，挂接到父节点后不再保存
         self.is_directory = is_directory  # 是否为目录
         self.parent = parent  # 父节点
-        self.children = []  # 子节点列表
+        self._children = EMPTY_CHILDREN  # 子节点列表
+        self.loader = None  # 按需加载函数，首次访问children时调用一次
         self.description = ""  # 用户填写的功能描述
+        self._size = 0  # 文件大小（字节），扫描时从DirEntry获取，目录为0
+        self.truncated = False  # 目录是否因扫描取消或限制而未完整列出
+        
+        # 子树汇总（含自身），添加/移除子节点时沿祖先链增量维护
+        self.total_size = 0  # 总大小
+        self.file_count = 0 if is_directory else 1  # 文件数
+        self.dir_count = 1 if is_directory else 0  # 目录数
+        self.ext_counts = {} if is_directory else None  # 扩展名 -> 文件数（仅目录）
+        self._height = 1  # 子树层数，移除子节点后可能变小时置为None，访问时重新计算
+        
+    @property
+    def children(self):
+        """子节点列表（按需加载模式下首次访问时才列出目录）"""
+        if self.loader is not None:
+            loader = self.loader
+            self.loader = None
+            loader(self)
+        return self._children
+        
+    @children.setter
+    def children(self, value):
+        self._children = value
+        
+    @property
+    def path(self):
+        """完整路径（由根节点路径和各级名称拼接）"""
+        names = []
+        node = self
+        while node._path is None:
+            names.append(node.name)
+            node = node.parent
+        if not names:
+            return node._path
+        names.append(node._path)
+        names.reverse()
+        return PathUtils.join_path(*names)
+        
+    @property
+    def node_count(self):
+        """子树节点总数（含自身）"""
+        return self.file_count + self.dir_count
+        
+    @property
+    def height(self):
+        """子树层数（只有自身时为1），按需加载模式下只计已加载部分"""
+        if self._height is None:
+            self._recompute_height()
+        return self._height
+        
+    def _recompute_height(self):
+        """重新计算失效的子树层数（只进入同样失效的子节点，显式栈后序计算）"""
+        stack = [(self, False)]
+        while stack:
+            node, expanded = stack.pop()
+            if expanded:
+                node._height = 1 + max((child._height for child in node._children), default=0)
+                continue
+            stack.append((node, True))
+            stack.extend((child, False) for child in node._children if child._height is None)
+        
+    @property
+    def size(self):
+        """文件大小（字节）"""
+        return self._size
+        
+    @size.setter
+    def size(self, value):
+        delta = value - self._size
+        self._size = value
+        node = self
+        while delta and node is not None:
+            node.total_size += delta
+            node = node.parent
+        
+    def get_extension(self):
+        """获取文件扩展名（小写，无扩展名时为空字符串）"""
+        return PathUtils.get_file_extension(self.name)
+        
+    def is_loaded(self):
+        """子节点是否已加载"""
+        return self.loader is None
         
     def add_child(self, child):
         """添加子节点"""
         child.parent = self
-        self.children.append(child)
+        child._path = None
+        if self._children is EMPTY_CHILDREN:
+            self._children = [child]
+        else:
+            self._children.append(child)
+        self._update_rollups(child, 1)
+        
+        # 子树层数只会增大，沿祖先链更新到不再变化为止（失效的祖先留待访问时计算）
+        height = child.height + 1
+        node = self
+        while node is not None and node._height is not None and node._height < height:
+            node._height = height
+            height += 1
+            node = node.parent
+        
+    def remove_child(self, child):
+        """移除子节点"""
+        children = self.children
+        if child not in children:
+            raise ValueError(f"{child.name} 不是 {self.name} 的子节点")
+        child._path = child.path  # 脱离父节点后保留完整路径
+        children.remove(child)
+        child.parent = None
+        self._update_rollups(child, -1)
+        
+        # 移除的可能是最高的子树，当前节点及祖先的层数失效
+        if self._height is not None and (child._height is None or child._height + 1 >= self._height):
+            node = self
+            while node is not None and node._height is not None:
+                node._height = None
+                node = node.parent
+        
+    def _update_rollups(self, child, sign):
+        """将子节点子树的汇总加到（sign=-1时从）当前节点及所有祖先上"""
+        total_size = child.total_size * sign
+        
+        if not child.is_directory:
+            # 文件：只需更新一个扩展名计数
+            ext = child.get_extension()
+            node = self
+            while node is not None:
+                node.total_size += total_size
+                node.file_count += sign
+                counts = node.ext_counts
+                if counts is not None:
+                    value = counts.get(ext, 0) + sign
+                    if value:
+                        counts[ext] = value
+                    else:
+                        counts.pop(ext, None)
+                node = node.parent
+            return
+        
+        file_count = child.file_count * sign
+        dir_count = child.dir_count * sign
+        ext_counts = child.ext_counts
+        
+        node = self
+        while node is not None:
+            node.total_size += total_size
+            node.file_count += file_count
+            node.dir_count += dir_count
+            counts = node.ext_counts
+            if counts is not None:
+                for ext, count in ext_counts.items():
+                    value = counts.get(ext, 0) + count * sign
+                    if value:
+                        counts[ext] = value
+                    else:
+                        counts.pop(ext, None)
+            node = node.parent
         
     def get_full_path(self):
         """获取完整路径"""
         return self.path
         
+    def walk(self, loaded_only=False):
+        """
+        先序遍历以当前节点为根的子树（显式栈实现，不受递归深度限制）
+        
+        Args:
+            loaded_only: 为True时只遍历已加载的节点，不触发按需加载
+        
+        Yields:
+            tuple: (节点, 相对于当前节点的深度)
+        """
+        stack = [(self, 0)]
+        while stack:
+            node, depth = stack.pop()
+            yield node, depth
+            children = node._children if loaded_only else node.children
+            if children:
+                stack.extend((child, depth + 1) for child in reversed(children))
+        
     def to_dict(self):
         """转换为字典格式，用于导出"""
+        result = self._to_flat_dict(self.path)
+        stack = [(self, result)]
+        while stack:
+            node, node_dict = stack.pop()
+            # 子节点路径由父节点路径拼接，不必逐个沿父节点链计算
+            prefix = PathUtils.join_path(node_dict['path'], "")
+            children_list = node_dict['children']
+            for child in node.children:
+                child_dict = child._to_flat_dict(prefix + child.name)
+                children_list.append(child_dict)
+                if child.children:
+                    stack.append((child, child_dict))
+        return result
+        
+    def _to_flat_dict(self, path):
+        """转换当前节点为字典（children为空列表，由to_dict填充）"""
         return {
             'name': self.name,
-            'path': self.path,
+            'path': path,
             'is_directory': self.is_directory,
             'description': self.description,
-            'children': [child.to_dict() for child in self.children]
+            'children': []
         }
\ No newline at end of file
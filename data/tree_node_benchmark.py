@@ -0,0 +1,161 @@
+"""
+文件树节点的内存占用对比
+
+对比原先基于__dict__、每个节点保存完整路径和子节点列表的节点实现
+与当前的紧凑节点（__slots__、名称驻留、共用空子节点序列、路径由父节点链拼接）。
+用tracemalloc统计建树期间新分配且仍被持有的内存（节点及其名称、路径、子节点列表、汇总字典），
+按节点数平均。
+
+用法:
+    python -m data.tree_node_benchmark
+    python -m data.tree_node_benchmark --path /path/to/project
+    python -m data.tree_node_benchmark --packages 400 --root /home/user/projects/some/deeper/root
+"""
+
+import argparse
+import gc
+import os
+import sys
+import tracemalloc
+from data.tree_node import TreeNode
+
+class LegacyTreeNode:
+    """原先的节点实现（实例属性保存在__dict__中，与当前节点的字段相同）"""
+    
+    def __init__(self, name, path, is_directory=False, parent=None):
+        self.name = name
+        self.path = path
+        self.is_directory = is_directory
+        self.parent = parent
+        self._children = []
+        self.loader = None
+        self.description = ""
+        self._size = 0
+        self.truncated = False
+        self.total_size = 0
+        self.file_count = 0 if is_directory else 1
+        self.dir_count = 1 if is_directory else 0
+        self.ext_counts = {} if is_directory else None
+    
+    get_extension = TreeNode.get_extension
+    _update_rollups = TreeNode._update_rollups
+    
+    def add_child(self, child):
+        """添加子节点"""
+        child.parent = self
+        self._children.append(child)
+        self._update_rollups(child, 1)
+
+def generate_records(packages):
+    """
+    生成类似Python源码工程的目录结构
+    
+    Returns:
+        list: 先序排列的 (父记录序号, 名称字节串, 是否目录, 大小)
+    """
+    records = []
+    
+    def add(parent, name, is_directory=False, size=0):
+        records.append((parent, name.encode(), is_directory, size))
+        return len(records) - 1
+    
+    for package in range(packages):
+        package_index = add(-1, f"package_{package}", True)
+        add(package_index, "__init__.py", size=120)
+        for module in range(20):
+            add(package_index, f"module_{module}.py", size=4000 + module)
+        for sub in range(3):
+            sub_index = add(package_index, f"sub_{sub}", True)
+            add(sub_index, "__init__.py")
+            for module in range(8):
+                add(sub_index, f"handler_{module}.py", size=2000)
+        tests_index = add(package_index, "tests", True)
+        add(tests_index, "__init__.py")
+        for module in range(20):
+            add(tests_index, f"test_module_{module}.py", size=1500)
+    return records
+
+def read_records(path):
+    """列出实际目录（不跟随符号链接），记录格式同 generate_records"""
+    records = []
+    stack = [(os.fsencode(path), -1)]
+    while stack:
+        directory, parent = stack.pop()
+        try:
+            with os.scandir(directory) as it:
+                entries = sorted(it, key=lambda entry: entry.name)
+        except OSError:
+            continue
+        for entry in entries:
+            try:
+                is_directory = entry.is_dir(follow_symlinks=False)
+                size = 0 if is_directory else entry.stat(follow_symlinks=False).st_size
+            except OSError:
+                continue
+            records.append((parent, entry.name, is_directory, size))
+            if is_directory:
+                stack.append((entry.path, len(records) - 1))
+    return records
+
+def build_tree(node_class, root_path, records):
+    """
+    按记录建树，名称和路径在建树时新创建（与扫描时从DirEntry得到新字符串一致）
+    
+    旧节点保存由父路径拼接的完整路径，新节点只在根节点上保存路径
+    """
+    root = node_class(os.path.basename(root_path) or root_path, root_path, is_directory=True)
+    nodes = []
+    legacy = node_class is LegacyTreeNode
+    for parent_index, name, is_directory, size in records:
+        parent = root if parent_index < 0 else nodes[parent_index]
+        name = os.fsdecode(name)
+        path = os.path.join(parent.path, name) if legacy else name
+        node = node_class(name, path, is_directory=is_directory)
+        parent.add_child(node)
+        if size:
+            node.size = size
+        nodes.append(node)
+    return root
+
+def measure(node_class, root_path, records):
+    """建树并返回 (新分配且仍被持有的字节数, 节点数)"""
+    gc.collect()
+    tracemalloc.start()
+    root = build_tree(node_class, root_path, records)
+    gc.collect()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    node_count = root.file_count + root.dir_count
+    del root
+    return current, node_count
+
+def parse_args(argv=None):
+    """解析命令行参数"""
+    parser = argparse.ArgumentParser(prog="python -m data.tree_node_benchmark",
+                                     description="对比旧节点实现与紧凑节点的内存占用")
+    parser.add_argument('--path', help="统计实际目录的结构（默认生成合成工程）")
+    parser.add_argument('--packages', type=int, default=800, help="合成工程的包数量（每个包约75个节点）")
+    parser.add_argument('--root', default="/home/user/projects/example", help="合成工程的根目录路径")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    """命令行入口"""
+    args = parse_args(argv)
+    if args.path:
+        root_path = os.path.abspath(args.path)
+        records = read_records(root_path)
+    else:
+        root_path = args.root
+        records = generate_records(args.packages)
+    
+    print(f"根目录: {root_path}")
+    results = []
+    for label, node_class in (("旧节点", LegacyTreeNode), ("紧凑节点", TreeNode)):
+        total, node_count = measure(node_class, root_path, records)
+        results.append(total / node_count)
+        print(f"  {label:<6} {node_count} 个节点, 共 {total / 1e6:.1f} MB, 每节点 {total / node_count:.0f} 字节")
+    print(f"  每节点减少 {1 - results[1] / results[0]:.0%}")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,430 @@
+"""
+列式文件树存储
+"""
+
+from array import array
+from data.tree_node import TreeNode, EMPTY_CHILDREN
+from utils.path_utils import PathUtils
+
+# 节点标志位
+FLAG_DIRECTORY = 1
+FLAG_TRUNCATED = 2
+FLAG_UNLOADED = 4  # 按需加载的目录尚未列出（由按需加载的TreeNode文件树转换而来）
+
+NO_NODE = -1
+
+class TreeStore:
+    """
+    列式存储的文件树，适用于数百万节点的超大工程
+    
+    每个节点不再是一个Python对象，而是各列数组中的同一个序号：父节点、
+    名称在字符串表中的偏移、标志位、大小、第一个子节点和下一个兄弟节点。
+    节点按先序追加，任一子树都是一段连续的序号区间，遍历和汇总只需顺序扫描数组。
+    需要与界面和导出交互时通过 NodeView 按需创建轻量视图。
+    """
+    
+    def __init__(self, root_path):
+        self.root_path = root_path  # 根节点的完整路径
+        self.parent = array('i')  # 父节点序号，根节点为-1
+        self.name_offset = array('Q')  # 名称在字符串表中的起始偏移（结束于下一个节点的偏移）
+        self.flags = array('B')  # FLAG_DIRECTORY | FLAG_TRUNCATED
+        self.size = array('q')  # 文件大小（字节），目录为0
+        self.first_child = array('i')  # 第一个子节点序号，没有时为-1
+        self.next_sibling = array('i')  # 下一个兄弟节点序号，没有时为-1
+        self.names = bytearray()  # 字符串表，名称按UTF-8编码（无法编码的字符按surrogateescape）首尾相接
+        self.descriptions = {}  # 节点序号 -> 用户填写的描述（只保存非空描述）
+        self._heights = None  # 各节点的子树层数，首次访问时一次计算，追加节点后失效
+    
+    def __len__(self):
+        return len(self.parent)
+    
+    @classmethod
+    def from_tree(cls, root_node):
+        """由TreeNode文件树构建存储（只包含已加载的节点，不触发按需加载）"""
+        store = cls(root_node.path)
+        root = store.append(NO_NODE, root_node.name, root_node.is_directory, root_node.size)
+        store._copy_node_state(root, root_node)
+        
+        # 栈帧：[子节点迭代器, 目录序号, 上一个子节点序号]
+        stack = [[iter(root_node.children if root_node.is_loaded() else ()), root, NO_NODE]]
+        while stack:
+            frame = stack[-1]
+            node = next(frame[0], None)
+            if node is None:
+                stack.pop()
+                continue
+            
+            index = store.append(frame[1], node.name, node.is_directory, node.size, frame[2])
+            frame[2] = index
+            store._copy_node_state(index, node)
+            if node.is_directory and node.is_loaded():
+                stack.append([iter(node.children), index, NO_NODE])
+        return store
+    
+    def _copy_node_state(self, index, node):
+        """复制节点的截断/未加载标志和描述"""
+        if node.truncated:
+            self.flags[index] |= FLAG_TRUNCATED
+        if not node.is_loaded():
+            self.flags[index] |= FLAG_UNLOADED
+        if node.description:
+            self.descriptions[index] = node.description
+    
+    def to_tree(self, index=0, loader=None):
+        """
+        还原为TreeNode文件树（如从快照恢复需要编辑和实时同步的工程）
+        
+        子树汇总在一次倒序遍历中直接计算，不经由add_child逐个沿祖先链更新。
+        
+        Args:
+            index: 子树根节点序号
+            loader: 未加载目录的按需加载函数，为None时这些目录标记为未完整扫描
+        
+        Returns:
+            TreeNode: 根节点
+        """
+        end = self.subtree_end(index)
+        parent = self.parent
+        flags = self.flags
+        sizes = self.size
+        offsets = self.name_offset
+        names = self.names
+        
+        nodes = [None] * (end - index)
+        for current in range(index, end):
+            flag = flags[current]
+            stop = offsets[current + 1] if current + 1 < len(offsets) else len(names)
+            name = str(names[offsets[current]:stop], 'utf-8', 'surrogateescape')
+            node = TreeNode(name, None, is_directory=bool(flag & FLAG_DIRECTORY))
+            node._size = node.total_size = sizes[current]
+            node.truncated = bool(flag & FLAG_TRUNCATED)
+            if flag & FLAG_UNLOADED:
+                node.loader = loader
+                node.truncated = node.truncated or loader is None
+            if current != index:
+                owner = nodes[parent[current] - index]
+                node.parent = owner
+                if owner._children is EMPTY_CHILDREN:
+                    owner._children = [node]
+                else:
+                    owner._children.append(node)
+            nodes[current - index] = node
+        
+        root = nodes[0]
+        root._path = self.get_path(index)
+        for current, description in self.descriptions.items():
+            if index <= current < end:
+                nodes[current - index].description = description
+        
+        # 先序存储中子节点总在父节点之后，倒序一遍即可由子节点汇总到父节点
+        get_extension = PathUtils.get_file_extension
+        for current in range(end - 1, index, -1):
+            node = nodes[current - index]
+            owner = nodes[parent[current] - index]
+            owner.total_size += node.total_size
+            owner.file_count += node.file_count
+            owner.dir_count += node.dir_count
+            counts = owner.ext_counts
+            if node.is_directory:
+                for ext, count in node.ext_counts.items():
+                    counts[ext] = counts.get(ext, 0) + count
+            else:
+                ext = get_extension(node.name)
+                counts[ext] = counts.get(ext, 0) + 1
+            if node._height >= owner._height:
+                owner._height = node._height + 1
+        return root
+    
+    def append(self, parent, name, is_directory=False, size=0, previous_sibling=NO_NODE):
+        """
+        追加节点（必须按先序追加，即父节点的子树追加完之前不能追加父节点的兄弟）
+        
+        Args:
+            parent: 父节点序号，根节点为-1
+            name: 名称
+            is_directory: 是否为目录
+            size: 文件大小
+            previous_sibling: 同一父节点下上一个追加的子节点，第一个子节点为-1
+        
+        Returns:
+            int: 新节点的序号
+        """
+        index = len(self.parent)
+        self.parent.append(parent)
+        self.name_offset.append(len(self.names))
+        self.names += name.encode('utf-8', 'surrogateescape')
+        self.flags.append(FLAG_DIRECTORY if is_directory else 0)
+        self.size.append(size)
+        self.first_child.append(NO_NODE)
+        self.next_sibling.append(NO_NODE)
+        self._heights = None
+        
+        if previous_sibling != NO_NODE:
+            self.next_sibling[previous_sibling] = index
+        elif parent != NO_NODE:
+            self.first_child[parent] = index
+        return index
+    
+    def set_truncated(self, index, truncated=True):
+        """标记目录是否未完整列出"""
+        if truncated:
+            self.flags[index] |= FLAG_TRUNCATED
+        else:
+            self.flags[index] &= ~FLAG_TRUNCATED
+    
+    def get_name(self, index):
+        """获取节点名称"""
+        end = self.name_offset[index + 1] if index + 1 < len(self.name_offset) else len(self.names)
+        return str(self.names[self.name_offset[index]:end], 'utf-8', 'surrogateescape')
+    
+    def get_path(self, index):
+        """获取节点完整路径（沿父节点链拼接名称）"""
+        names = []
+        while index > 0:
+            names.append(self.get_name(index))
+            index = self.parent[index]
+        names.append(self.root_path)
+        names.reverse()
+        return PathUtils.join_path(*names)
+    
+    def iter_children(self, index):
+        """按顺序产出子节点序号"""
+        child = self.first_child[index]
+        while child != NO_NODE:
+            yield child
+            child = self.next_sibling[child]
+    
+    def subtree_end(self, index):
+        """子树区间的结束位置（不含），子树为 [index, subtree_end)"""
+        while index != NO_NODE:
+            sibling = self.next_sibling[index]
+            if sibling != NO_NODE:
+                return sibling
+            index = self.parent[index]
+        return len(self.parent)
+    
+    def iter_subtree(self, index=0):
+        """
+        先序遍历子树，不创建节点对象
+        
+        Yields:
+            tuple: (节点序号, 相对于index的深度)
+        """
+        end = self.subtree_end(index)
+        parent = self.parent
+        ancestors = []  # 当前节点的祖先链
+        for current in range(index, end):
+            owner = parent[current]
+            while ancestors and ancestors[-1] != owner:
+                ancestors.pop()
+            yield current, len(ancestors)
+            ancestors.append(current)
+    
+    def get_height(self, index=0):
+        """子树层数（只有自身时为1）"""
+        if self._heights is None:
+            # 先序存储中子节点总在父节点之后，倒序一遍即可由子节点得到所有父节点的层数
+            heights = array('i', [1]) * len(self.parent)
+            parent = self.parent
+            for current in range(len(parent) - 1, 0, -1):
+                height = heights[current] + 1
+                owner = parent[current]
+                if height > heights[owner]:
+                    heights[owner] = height
+            self._heights = heights
+        return self._heights[index]
+    
+    def get_statistics(self, index=0):
+        """
+        汇总子树（含自身）的统计信息，直接扫描连续的数组区间
+        
+        Returns:
+            dict: total_size, file_count, dir_count, ext_counts（扩展名 -> 文件数）
+        """
+        end = self.subtree_end(index)
+        flags = self.flags[index:end]
+        file_count = self.count_files(index, end)
+        
+        ext_counts = {}
+        for current, flag in enumerate(flags, index):
+            if not flag:
+                ext = PathUtils.get_file_extension(self.get_name(current))
+                ext_counts[ext] = ext_counts.get(ext, 0) + 1
+        
+        return {
+            'total_size': sum(self.size[index:end]),
+            'file_count': file_count,
+            'dir_count': end - index - file_count,
+            'ext_counts': ext_counts
+        }
+    
+    def count_files(self, index, end):
+        """序号区间 [index, end) 中的文件数（文件没有任何标志位）"""
+        return self.flags[index:end].count(0)
+    
+    def root(self):
+        """根节点视图，空存储时返回None"""
+        return NodeView(self, 0) if len(self.parent) else None
+    
+    def memory_usage(self):
+        """各列数组与字符串表占用的字节数（不含描述）"""
+        columns = (self.parent, self.name_offset, self.flags, self.size, self.first_child, self.next_sibling)
+        return sum(column.itemsize * len(column) for column in columns) + len(self.names)
+
+class NodeView:
+    """
+    TreeStore中单个节点的轻量视图
+    
+    提供与TreeNode相同的只读接口（以及描述的修改），供导出和界面使用；
+    视图按需创建，不持有数据，序号相同的视图相等。
+    由按需加载的文件树转换而来时，未加载的目录没有子节点。
+    """
+    
+    __slots__ = ('store', 'index')
+    
+    loader = None  # 数据都在存储中，没有需要按需加载的子节点
+    
+    def __init__(self, store, index):
+        self.store = store
+        self.index = index
+    
+    def __eq__(self, other):
+        return isinstance(other, NodeView) and other.store is self.store and other.index == self.index
+    
+    def __hash__(self):
+        return hash((id(self.store), self.index))
+    
+    def __repr__(self):
+        return f"NodeView({self.index}, {self.name!r})"
+    
+    @property
+    def name(self):
+        """文件/目录名"""
+        return self.store.get_name(self.index)
+    
+    @property
+    def path(self):
+        """完整路径"""
+        return self.store.get_path(self.index)
+    
+    @property
+    def is_directory(self):
+        """是否为目录"""
+        return bool(self.store.flags[self.index] & FLAG_DIRECTORY)
+    
+    @property
+    def truncated(self):
+        """目录是否未完整列出"""
+        return bool(self.store.flags[self.index] & FLAG_TRUNCATED)
+    
+    @property
+    def size(self):
+        """文件大小（字节）"""
+        return self.store.size[self.index]
+    
+    @property
+    def description(self):
+        """用户填写的功能描述"""
+        return self.store.descriptions.get(self.index, "")
+    
+    @description.setter
+    def description(self, value):
+        if value:
+            self.store.descriptions[self.index] = value
+        else:
+            self.store.descriptions.pop(self.index, None)
+    
+    @property
+    def parent(self):
+        """父节点视图"""
+        parent = self.store.parent[self.index]
+        return NodeView(self.store, parent) if parent != NO_NODE else None
+    
+    @property
+    def children(self):
+        """子节点视图列表"""
+        return [NodeView(self.store, child) for child in self.store.iter_children(self.index)]
+    
+    def has_children(self):
+        """是否有子节点（无需创建子节点视图）"""
+        return self.store.first_child[self.index] != NO_NODE
+    
+    @property
+    def node_count(self):
+        """子树节点总数（含自身），即子树区间的长度"""
+        return self.store.subtree_end(self.index) - self.index
+    
+    @property
+    def height(self):
+        """子树层数（只有自身时为1）"""
+        return self.store.get_height(self.index)
+    
+    # 子树汇总，与TreeNode上增量维护的字段含义相同，这里按需扫描子树区间计算
+    @property
+    def total_size(self):
+        end = self.store.subtree_end(self.index)
+        return sum(self.store.size[self.index:end])
+    
+    @property
+    def file_count(self):
+        end = self.store.subtree_end(self.index)
+        return self.store.count_files(self.index, end)
+    
+    @property
+    def dir_count(self):
+        end = self.store.subtree_end(self.index)
+        return end - self.index - self.store.count_files(self.index, end)
+    
+    @property
+    def ext_counts(self):
+        if not self.is_directory:
+            return None
+        return self.store.get_statistics(self.index)['ext_counts']
+    
+    def get_extension(self):
+        """获取文件扩展名（小写，无扩展名时为空字符串）"""
+        return PathUtils.get_file_extension(self.name)
+    
+    def is_loaded(self):
+        """子节点是否已加载"""
+        return not self.store.flags[self.index] & FLAG_UNLOADED
+    
+    def get_full_path(self):
+        """获取完整路径"""
+        return self.path
+    
+    def walk(self, loaded_only=False):
+        """
+        先序遍历以当前节点为根的子树
+        
+        Yields:
+            tuple: (节点视图, 相对于当前节点的深度)
+        """
+        store = self.store
+        for index, depth in store.iter_subtree(self.index):
+            yield NodeView(store, index), depth
+    
+    def to_dict(self):
+        """转换为字典格式，用于导出（与TreeNode.to_dict的结构相同）"""
+        store = self.store
+        result = None
+        stack = []  # (节点序号, 节点字典)，当前节点的祖先链
+        for index, _ in store.iter_subtree(self.index):
+            parent = store.parent[index]
+            while stack and stack[-1][0] != parent:
+                stack.pop()
+            
+            name = store.get_name(index)
+            node_dict = {
+                'name': name,
+                'path': PathUtils.join_path(stack[-1][1]['path'], name) if stack else store.get_path(index),
+                'is_directory': bool(store.flags[index] & FLAG_DIRECTORY),
+                'description': store.descriptions.get(index, ""),
+                'children': []
+            }
+            if stack:
+                stack[-1][1]['children'].append(node_dict)
+            else:
+                result = node_dict
+            stack.append((index, node_dict))
+        return result
@@ -0,0 +1,211 @@
+"""
+描述与标签的持久化存储
+"""
+
+import os
+import json
+import sqlite3
+import hashlib
+from utils.path_utils import PathUtils
+
+class AnnotationStore:
+    """
+    按工程根目录持久化的描述和标签（SQLite，每个工程一个数据库文件）
+    
+    以节点相对于工程根目录的路径为键，重新扫描或重启后仍能对应到节点。
+    路径按UTF-8字节（surrogateescape）保存，某目录下的所有条目是一段连续的键区间，
+    按目录前缀的查询（如 logic/ 下所有标记为某标签的节点）直接走主键索引。
+    
+    打开时不读取任何数据，首次访问时才连接数据库；修改先在内存中排队，
+    由 flush() 在一个事务中批量写入，读取前会先写入排队的修改。
+    """
+    
+    VERSION = 1
+    
+    SCHEMA = (
+        "CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)",
+        "CREATE TABLE IF NOT EXISTS descriptions (path BLOB PRIMARY KEY, description TEXT NOT NULL) WITHOUT ROWID",
+        "CREATE TABLE IF NOT EXISTS tags (tag TEXT NOT NULL, path BLOB NOT NULL, PRIMARY KEY (tag, path)) WITHOUT ROWID",
+        "CREATE INDEX IF NOT EXISTS tags_by_path ON tags (path)",
+    )
+    
+    def __init__(self, project_path, store_dir="runtime/annotations"):
+        self.project_path = PathUtils.normalize_path(project_path)
+        digest = hashlib.sha1(self.project_path.encode('utf-8', 'surrogateescape')).hexdigest()
+        self.db_file = PathUtils.join_path(store_dir, f"{digest}.sqlite3")
+        self._connection = None
+        self._pending_descriptions = {}  # 相对路径 -> 描述（空字符串表示删除）
+        self._pending_tags = {}  # 相对路径 -> 标签列表（空列表表示删除）
+    
+    def get_descriptions(self, prefix="", direct=False):
+        """
+        读取描述
+        
+        Args:
+            prefix: 只读取该目录（相对路径，含目录本身）下的条目，为空时读取全部
+            direct: 只读取目录本身及其直接子条目（用于按需加载时逐个目录读取）
+        
+        Returns:
+            dict: 相对路径 -> 描述
+        """
+        rows = self._query_prefix("SELECT path, description FROM descriptions", "path", prefix, direct=direct)
+        return {self._decode(path): description for path, description in rows}
+    
+    def get_tags(self, prefix="", direct=False):
+        """读取标签，返回 相对路径 -> 标签列表（参数含义同 get_descriptions）"""
+        tags = {}
+        for path, tag in self._query_prefix("SELECT path, tag FROM tags", "path", prefix,
+                                            order="path", direct=direct):
+            tags.setdefault(self._decode(path), []).append(tag)
+        return tags
+    
+    def find_tagged(self, tag, prefix=""):
+        """查找目录下标记了某标签的条目，返回按路径排序的相对路径列表"""
+        rows = self._query_prefix("SELECT path FROM tags WHERE tag = ?", "path", prefix, (tag,), order="path")
+        return [self._decode(path) for path, in rows]
+    
+    def set_description(self, rel_path, description):
+        """修改描述（排队，flush时写入），空描述表示删除"""
+        self._pending_descriptions[rel_path] = description or ""
+    
+    def set_tags(self, rel_path, tags):
+        """修改标签（排队，flush时写入），空列表表示删除"""
+        self._pending_tags[rel_path] = list(dict.fromkeys(tags or ()))
+    
+    def has_pending(self):
+        """是否有尚未写入的修改"""
+        return bool(self._pending_descriptions or self._pending_tags)
+    
+    def get_available_tags(self):
+        """读取保存的可用标签列表，未保存过时返回None"""
+        connection = self._connect()
+        if connection is None:
+            return None
+        row = connection.execute("SELECT value FROM meta WHERE key = 'available_tags'").fetchone()
+        return json.loads(row[0]) if row else None
+    
+    def set_available_tags(self, tags):
+        """保存可用标签列表（立即写入）"""
+        connection = self._connect()
+        if connection is None:
+            return False
+        try:
+            with connection:
+                connection.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('available_tags', ?)",
+                                   (json.dumps(list(tags), ensure_ascii=False),))
+            return True
+        except sqlite3.Error as e:
+            print(f"保存可用标签失败: {self.db_file}, 错误: {str(e)}")
+            return False
+    
+    def flush(self):
+        """
+        在一个事务中写入所有排队的修改
+        
+        Returns:
+            int: 写入的条目数，失败时返回-1（修改保留在队列中，下次重试）
+        """
+        if not self.has_pending():
+            return 0
+        connection = self._connect()
+        if connection is None:
+            return -1
+        
+        descriptions = self._pending_descriptions
+        tags = self._pending_tags
+        # 按键排序后写入，B树顺序追加，大批量写入时明显更快
+        description_rows = sorted((self._encode(path), text) for path, text in descriptions.items())
+        tag_rows = sorted((self._encode(path), path_tags) for path, path_tags in tags.items())
+        try:
+            with connection:
+                connection.executemany(
+                    "INSERT OR REPLACE INTO descriptions (path, description) VALUES (?, ?)",
+                    (row for row in description_rows if row[1]))
+                connection.executemany(
+                    "DELETE FROM descriptions WHERE path = ?",
+                    ((key,) for key, text in description_rows if not text))
+                connection.executemany(
+                    "DELETE FROM tags WHERE path = ?",
+                    ((key,) for key, _ in tag_rows))
+                connection.executemany(
+                    "INSERT INTO tags (tag, path) VALUES (?, ?)",
+                    sorted((tag, key) for key, path_tags in tag_rows for tag in path_tags))
+        except sqlite3.Error as e:
+            print(f"保存描述和标签失败: {self.db_file}, 错误: {str(e)}")
+            return -1
+        
+        count = len(descriptions) + len(tags)
+        self._pending_descriptions = {}
+        self._pending_tags = {}
+        return count
+    
+    def close(self):
+        """写入排队的修改并关闭数据库"""
+        self.flush()
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+    
+    def _connect(self):
+        """首次访问时打开数据库并创建表，失败时返回None"""
+        if self._connection is not None:
+            return self._connection
+        try:
+            os.makedirs(os.path.dirname(self.db_file) or os.curdir, exist_ok=True)
+            connection = sqlite3.connect(self.db_file)
+            connection.execute("PRAGMA journal_mode = WAL")
+            connection.execute("PRAGMA synchronous = NORMAL")
+            with connection:
+                for statement in self.SCHEMA:
+                    connection.execute(statement)
+                connection.execute("INSERT OR IGNORE INTO meta (key, value) VALUES ('version', ?)",
+                                   (str(self.VERSION),))
+                connection.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('project_path', ?)",
+                                   (self.project_path.encode('utf-8', 'surrogateescape').decode('utf-8', 'replace'),))
+        except sqlite3.Error as e:
+            print(f"打开描述数据库失败: {self.db_file}, 错误: {str(e)}")
+            return None
+        self._connection = connection
+        return connection
+    
+    def _query_prefix(self, sql, column, prefix, params=(), order=None, direct=False):
+        """
+        执行查询，prefix不为空时限定为该目录本身及其下的条目（主键区间查询），
+        direct时再排除更深层的条目
+        """
+        self.flush()
+        connection = self._connect()
+        if connection is None:
+            return []
+        
+        params = list(params)
+        conditions = []
+        base = self._encode(prefix)
+        separator = os.sep.encode()
+        if prefix:
+            # 目录本身及以 "目录/" 开头的条目都在 [目录, 目录+分隔符的下一个字节) 区间内，
+            # 区间中其余的同级条目（如 目录-bak）由后一个条件排除
+            conditions.append(f"{column} >= ? AND {column} < ? AND ({column} = ? OR {column} > ?)")
+            params += [base, base + bytes([separator[0] + 1]), base, base + separator]
+        if direct:
+            # 目录前缀之后的部分不再含分隔符（键为字节串，substr和instr按字节计算）
+            conditions.append(f"({column} = ? OR instr(substr({column}, ?), ?) = 0)")
+            params += [base, len(base) + 2 if prefix else 1, separator]
+        for condition in conditions:
+            sql += (" AND " if " WHERE " in sql else " WHERE ") + condition
+        if order:
+            sql += f" ORDER BY {order}"
+        
+        try:
+            return connection.execute(sql, params).fetchall()
+        except sqlite3.Error as e:
+            print(f"读取描述数据库失败: {self.db_file}, 错误: {str(e)}")
+            return []
+    
+    def _encode(self, rel_path):
+        """相对路径 -> 键"""
+        return rel_path.encode('utf-8', 'surrogateescape')
+    
+    def _decode(self, key):
+        """键 -> 相对路径"""
+        return bytes(key).decode('utf-8', 'surrogateescape')
@@ -0,0 +1,158 @@
+"""
+深层文件树遍历与扫描的性能对比
+
+对比显式栈实现（TreeNode.walk / to_dict、FileProcessor的扫描）与原先的递归实现：
+内存中构造指定深度和分支数的合成树，磁盘上在临时目录中创建一条深层目录链。
+递归实现超过解释器递归深度限制时记为 RecursionError。
+
+用法:
+    python -m logic.deep_tree_benchmark
+    python -m logic.deep_tree_benchmark --depth 900 3000 --fanout 20 --disk-depth 1500
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from data.tree_node import TreeNode
+from logic.file_processor import FileProcessor
+from utils.path_utils import PathUtils
+
+def build_tree(depth, fanout):
+    """构造合成树：一条depth层的目录链，每层目录另有fanout-1个文件"""
+    root = TreeNode("root", "/bench/root", is_directory=True)
+    current = root
+    for level in range(depth):
+        for i in range(fanout - 1):
+            current.add_child(TreeNode(f"file_{level}_{i}.py", None))
+        child = TreeNode(f"dir_{level}", None, is_directory=True)
+        current.add_child(child)
+        current = child
+    return root
+
+def recursive_node_count(node):
+    """原先的递归节点计数"""
+    count = 1
+    for child in node.children:
+        count += recursive_node_count(child)
+    return count
+
+def recursive_to_dict(node, path):
+    """原先的递归to_dict"""
+    return {
+        'name': node.name,
+        'path': path,
+        'is_directory': node.is_directory,
+        'description': node.description,
+        'children': [recursive_to_dict(child, PathUtils.join_path(path, child.name)) for child in node.children]
+    }
+
+def recursive_scan(current_path, parent_node):
+    """原先的递归扫描（不含过滤）"""
+    for name in sorted(os.listdir(current_path)):
+        item_path = PathUtils.join_path(current_path, name)
+        node = TreeNode(name, item_path, is_directory=os.path.isdir(item_path))
+        parent_node.add_child(node)
+        if node.is_directory:
+            recursive_scan(item_path, node)
+
+def create_chain(base, depth):
+    """在base下创建depth层的 d/d/... 目录链（逐级进入创建，避免路径超过系统长度限制）"""
+    cwd = os.getcwd()
+    os.chdir(base)
+    try:
+        for _ in range(depth):
+            os.mkdir("d")
+            os.chdir("d")
+    finally:
+        os.chdir(cwd)
+
+def remove_chain(base):
+    """自底向上删除目录链（shutil.rmtree本身是递归实现，无法删除过深的目录）"""
+    cwd = os.getcwd()
+    os.chdir(base)
+    try:
+        depth = 0
+        while os.path.isdir("d"):
+            os.chdir("d")
+            depth += 1
+        for _ in range(depth):
+            os.chdir(os.pardir)
+            os.rmdir("d")
+    finally:
+        os.chdir(cwd)
+    os.rmdir(base)
+
+def iterative_node_count(node):
+    """显式栈实现的节点计数"""
+    return sum(1 for _ in node.walk())
+
+def measure(function, *args):
+    """执行一次并计时，超过递归深度限制时返回None"""
+    start = time.perf_counter()
+    try:
+        function(*args)
+    except RecursionError:
+        return None
+    return time.perf_counter() - start
+
+def format_seconds(seconds):
+    """格式化耗时"""
+    return "RecursionError" if seconds is None else f"{seconds:.4f}s"
+
+def run_tree_benchmark(depth, fanout):
+    """内存中合成树的遍历对比"""
+    root = build_tree(depth, fanout)
+    rows = [
+        ("节点计数", measure(recursive_node_count, root), measure(iterative_node_count, root)),
+        ("to_dict", measure(recursive_to_dict, root, root.path), measure(root.to_dict)),
+    ]
+    print(f"合成树: 深度 {depth}, 每层 {fanout} 个子节点, 共 {root.node_count} 个节点")
+    for label, recursive, iterative in rows:
+        print(f"  {label:<8} 递归 {format_seconds(recursive):>15}  显式栈 {format_seconds(iterative):>10}")
+
+def run_scan_benchmark(depth):
+    """磁盘上深层目录链的扫描对比"""
+    base = tempfile.mkdtemp(prefix="deep_tree_")
+    try:
+        create_chain(base, depth)
+        
+        root = TreeNode("root", base, is_directory=True)
+        recursive = measure(recursive_scan, base, root)
+        recursive_count = root.node_count
+        
+        start = time.perf_counter()
+        scanned = FileProcessor().scan_directory(base, [], False)
+        iterative = time.perf_counter() - start
+        
+        print(f"磁盘目录链: 深度 {depth}")
+        print(f"  递归扫描 {format_seconds(recursive):>15}（{recursive_count} 个节点）")
+        print(f"  显式栈   {format_seconds(iterative):>15}（{scanned.node_count} 个节点）")
+    except OSError as e:
+        print(f"无法创建深层目录（{str(e)}），跳过磁盘扫描对比")
+    finally:
+        remove_chain(base)
+
+def parse_args(argv=None):
+    """解析命令行参数"""
+    parser = argparse.ArgumentParser(prog="python -m logic.deep_tree_benchmark",
+                                     description="对比深层文件树的递归与显式栈实现")
+    parser.add_argument('--depth', type=int, nargs='+', default=[500, 2000], help="合成树深度，可指定多个")
+    parser.add_argument('--fanout', type=int, default=10, help="合成树每层的子节点数")
+    parser.add_argument('--disk-depth', type=int, default=1500, help="磁盘目录链深度，0表示跳过")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    """命令行入口"""
+    args = parse_args(argv)
+    print(f"递归深度限制: {sys.getrecursionlimit()}")
+    for depth in args.depth:
+        run_tree_benchmark(depth, 1)
+        run_tree_benchmark(depth, args.fanout)
+    if args.disk_depth:
+        run_scan_benchmark(args.disk_depth)
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
\ No newline at end of file
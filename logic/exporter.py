@@ -2,11 +2,15 @@
 导出模块
 """
 
+import os
 import json
+from json.encoder import encode_basestring
 from datetime import datetime
 from utils.utils import Utils
 from utils.path_utils import PathUtils
 
+JSON_BUFFER_CHUNKS = 4096  # JSON导出时缓冲的片段数，攒满后一次写入文件
+
 class Exporter:
     """导出功能类"""
     
@@ -14,18 +18,20 @@ class Exporter:
         pass
     
     def export_to_json(self, project_model, output_path=None):
-        """导出为JSON格式"""
+        """导出为JSON格式（边遍历文件树边写入，不构建整棵树的字典）"""
         try:
-            # 构建导出数据
-            export_data = {
+            # 构建导出数据（structure由文件树逐个节点写入）
+            export_info = {
                 'export_time': Utils.format_datetime(),
                 'project_info': {
                     'project_path': project_model.project_path,
                     'filter_conditions': project_model.filter_conditions,
                     'use_gitignore': project_model.use_gitignore
-                },
-                'structure': project_model.root_node.to_dict() if project_model.root_node else None
+                }
             }
+            # 包含条件只在设置时导出，未设置时与原有格式相同
+            if project_model.include_conditions:
+                export_info['project_info']['include_conditions'] = project_model.include_conditions
             
             # 如果没有指定输出路径，使用默认路径
             if not output_path:
@@ -34,7 +40,7 @@ class Exporter:
                 output_path = PathUtils.join_path("exports", filename)
             
             # 写入文件
-            success = Utils.write_json_file(output_path, export_data)
+            success = self._write_json_export(output_path, export_info, project_model.root_node)
             
             if success:
                 return output_path, "JSON导出成功"
@@ -44,6 +50,85 @@ class Exporter:
         except Exception as e:
             return None, f"JSON导出失败: {str(e)}"
     
+    def _write_json_export(self, output_path, export_info, root_node):
+        """
+        写入JSON导出文件，内容与 json.dumps(..., ensure_ascii=False, indent=2) 完全相同
+        
+        文件树逐个节点序列化，片段攒满一批后写入，内存占用与文件树大小无关；
+        先写入临时文件，完成后替换，失败时不留下不完整的文件。
+        """
+        temp_path = output_path + ".tmp"
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(output_path)), exist_ok=True)
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                buffer = []
+                for chunk in self._iter_json_export(export_info, root_node):
+                    buffer.append(chunk)
+                    if len(buffer) >= JSON_BUFFER_CHUNKS:
+                        f.write(''.join(buffer))
+                        buffer.clear()
+                f.write(''.join(buffer))
+            os.replace(temp_path, output_path)
+            return True
+        except Exception as e:
+            print(f"写入JSON文件失败: {output_path}, 错误: {str(e)}")
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            return False
+    
+    def _iter_json_export(self, export_info, root_node):
+        """按顶层字典的格式产出JSON片段，最后一项为structure"""
+        yield "{"
+        for key, value in export_info.items():
+            # 各项单独序列化后整体缩进一级（JSON字符串中的换行已转义，不受影响）
+            content = json.dumps(value, ensure_ascii=False, indent=2).replace("\n", "\n  ")
+            yield f"\n  {encode_basestring(key)}: {content},"
+        yield '\n  "structure": '
+        if root_node is None:
+            yield "null"
+        else:
+            yield from self._iter_node_json(root_node, 1)
+        yield "\n}"
+    
+    def _iter_node_json(self, root_node, level):
+        """
+        先序遍历文件树，产出与 to_dict() 经 json.dumps(indent=2) 序列化后相同的片段
+        
+        Args:
+            root_node: 根节点
+            level: 根节点字典在整个JSON中的嵌套层级（缩进为 2*level）
+        """
+        # 栈帧：[子节点迭代器, 子节点路径前缀, 目录字典的层级, 是否已输出子节点]
+        stack = []
+        node, path = root_node, root_node.path
+        while True:
+            indent = " " * (2 * level + 2)
+            children = node.children
+            head = (f"{{\n{indent}\"name\": {encode_basestring(node.name)},"
+                    f"\n{indent}\"path\": {encode_basestring(path)},"
+                    f"\n{indent}\"is_directory\": {'true' if node.is_directory else 'false'},"
+                    f"\n{indent}\"description\": {encode_basestring(node.description)},"
+                    f"\n{indent}\"children\": ")
+            if children:
+                yield head + "["
+                stack.append([iter(children), PathUtils.join_path(path, ""), level, False])
+            else:
+                yield f"{head}[]\n{' ' * (2 * level)}}}"
+            
+            # 找到下一个要输出的节点，子节点已全部输出的目录在此闭合
+            while stack:
+                frame = stack[-1]
+                child = next(frame[0], None)
+                if child is not None:
+                    yield ("," if frame[3] else "") + "\n" + " " * (2 * frame[2] + 4)
+                    frame[3] = True
+                    node, path, level = child, frame[1] + child.name, frame[2] + 2
+                    break
+                stack.pop()
+                yield f"\n{' ' * (2 * frame[2] + 2)}]\n{' ' * (2 * frame[2])}}}"
+            else:
+                return
+    
     def export_to_markdown(self, project_model, output_path=None):
         """导出为Markdown格式"""
         try:
@@ -82,6 +167,8 @@ class Exporter:
         lines.append(f"- **项目路径**: `{project_model.project_path}`")
         lines.append(f"- **导出时间**: {Utils.format_datetime()}")
         lines.append(f"- **使用.gitignore**: {'是' if project_model.use_gitignore else '否'}")
+        root_node = project_model.root_node
+        stats_index = len(lines)
         lines.append("")
         
         # 过滤条件
@@ -92,12 +179,23 @@ class Exporter:
                 lines.append(f"- `{condition}`")
             lines.append("")
         
+        # 包含条件
+        if project_model.include_conditions:
+            lines.append("## 包含条件")
+            lines.append("")
+            for condition in project_model.include_conditions:
+                lines.append(f"- `{condition}`")
+            lines.append("")
+        
         # 目录结构
         lines.append("## 目录结构")
         lines.append("")
         
-        if project_model.root_node:
-            self._build_tree_markdown(project_model.root_node, lines, 0)
+        if root_node:
+            self._build_tree_markdown(root_node, lines, 0)
+            # 统计在遍历之后读取：按需加载的目录在遍历时才加载，汇总随之更新，与正文一致
+            lines.insert(stats_index, f"- **统计**: 目录 {root_node.dir_count} 个，文件 {root_node.file_count} 个，"
+                                      f"共 {Utils.format_file_size(root_node.total_size)}")
         else:
             lines.append("无数据")
         
@@ -105,24 +203,77 @@ class Exporter:
     
     def _build_tree_markdown(self, node, lines, depth):
         """构建树状结构的Markdown"""
-        # 缩进
-        indent = "  " * depth
-        
-        # 图标
-        icon = "📁" if node.is_directory else "📄"
+        for current, level in node.walk():
+            # 缩进
+            indent = "  " * (depth + level)
+            
+            # 图标
+            icon = "📁" if current.is_directory else "📄"
+            
+            # 描述
+            description = f" - {current.description}" if current.description else ""
+            
+            # 未完整扫描的目录
+            truncated = " *(未完整扫描)*" if current.truncated else ""
+            
+            # 添加行
+            lines.append(f"{indent}- {icon} **{current.name}**{truncated}{description}")
+    
+    def export_filter_report(self, project_model, pattern_stats, output_path=None):
+        """导出过滤条件统计报告（Markdown格式）"""
+        try:
+            report_content = self._build_filter_report_content(project_model, pattern_stats)
+            
+            # 如果没有指定输出路径，使用默认路径
+            if not output_path:
+                project_name = PathUtils.get_filename(project_model.project_path) or "project"
+                filename = f"{project_name}_filter_report_{Utils.get_timestamp()}.md"
+                output_path = PathUtils.join_path("exports", filename)
+            
+            # 写入文件
+            success = Utils.write_file_content(output_path, report_content)
+            
+            if success:
+                return output_path, "过滤统计报告导出成功"
+            else:
+                return None, "过滤统计报告导出失败"
+                
+        except Exception as e:
+            return None, f"过滤统计报告导出失败: {str(e)}"
+    
+    def _build_filter_report_content(self, project_model, pattern_stats):
+        """构建过滤条件统计报告，按累计耗时从高到低排列"""
+        lines = []
         
-        # 节点名称
-        name = node.name
+        project_name = PathUtils.get_filename(project_model.project_path) or "项目"
+        lines.append(f"# {project_name} 过滤条件统计")
+        lines.append("")
+        lines.append(f"- **项目路径**: `{project_model.project_path}`")
+        lines.append(f"- **导出时间**: {Utils.format_datetime()}")
+        lines.append(f"- **总耗时**: {sum(stats['time'] for stats in pattern_stats) * 1000:.2f} ms")
+        lines.append("")
         
-        # 描述
-        description = f" - {node.description}" if node.description else ""
+        lines.append("## 各模式统计")
+        lines.append("")
+        lines.append("| 模式 | 匹配次数 | 命中次数 | 累计耗时 (ms) | 排除条目 | 排除大小 |")
+        lines.append("| --- | ---: | ---: | ---: | ---: | ---: |")
+        for stats in sorted(pattern_stats, key=lambda stats: stats['time'], reverse=True):
+            pattern = stats['pattern'].replace('|', '\\|')  # 表格分隔符需转义
+            lines.append(f"| `{pattern}` | {stats['evaluations']} | {stats['hits']} | "
+                         f"{stats['time'] * 1000:.2f} | {stats['pruned_entries']} | "
+                         f"{Utils.format_file_size(stats['pruned_bytes'])} |")
+        lines.append("")
         
-        # 添加行
-        lines.append(f"{indent}- {icon} **{name}**{description}")
+        # 从未命中的模式可以考虑删除
+        unused = [stats['pattern'] for stats in pattern_stats if not stats['hits']]
+        if unused:
+            lines.append("## 未命中的模式")
+            lines.append("")
+            for pattern in unused:
+                lines.append(f"- `{pattern}`")
+            lines.append("")
         
-        # 递归处理子节点
-        for child in node.children:
-            self._build_tree_markdown(child, lines, depth + 1)
+        return "\n".join(lines)
     
     def export_to_cursor_rules(self, project_model, output_path=None):
         """导出为Cursor rules格式"""
@@ -173,12 +324,10 @@ class Exporter:
     
     def _build_cursor_rules_structure(self, node, lines, depth):
         """构建Cursor rules的结构说明"""
-        indent = "  " * depth
-        
-        if node.is_directory:
-            lines.append(f"{indent}- `{node.name}/`: {node.description or '目录'}")
-        else:
-            lines.append(f"{indent}- `{node.name}`: {node.description or '文件'}")
-        
-        for child in node.children:
-            self._build_cursor_rules_structure(child, lines, depth + 1)
\ No newline at end of file
+        for current, level in node.walk():
+            indent = "  " * (depth + level)
+            
+            if current.is_directory:
+                lines.append(f"{indent}- `{current.name}/`: {current.description or '目录'}")
+            else:
+                lines.append(f"{indent}- `{current.name}`: {current.description or '文件'}")
\ No newline at end of file
@@ -3,8 +3,14 @@
 """
 
 import os
+import time
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, wait, FIRST_COMPLETED
 from data.tree_node import TreeNode
+from data.tree_store import TreeStore
+from data.search_index import rank_nodes
 from logic.filter_engine import FilterEngine
+from logic.scan_cache import ScanCache
+from logic.git_index import GitIndex, MODE_TYPE_MASK, MODE_GITLINK
 from utils.path_utils import PathUtils
 
 class FileProcessor:
@@ -12,8 +18,11 @@ class FileProcessor:
     
     def __init__(self):
         self.filter_engine = FilterEngine()
+        self.scan_cache = None  # 当前扫描使用的增量缓存
+        self.scan_stop_reason = None  # 最近一次扫描的中止原因
     
-    def scan_directory(self, project_path, filter_patterns=None, use_gitignore=False):
+    def scan_directory(self, project_path, filter_patterns=None, use_gitignore=False,
+                       on_batch=None, **scan_options):
         """
         扫描目录并构建文件树
         
@@ -21,10 +30,145 @@ class FileProcessor:
             project_path: 项目根目录路径
             filter_patterns: 过滤模式列表
             use_gitignore: 是否使用.gitignore
+            on_batch: 可选回调，扫描过程中按批次接收 [(父节点, 节点), ...]
+            scan_options: 其余扫描选项，见 iter_scan
             
         Returns:
             TreeNode: 根节点
         """
+        root_node = None
+        for batch in self.iter_scan(project_path, filter_patterns, use_gitignore, **scan_options):
+            if root_node is None:
+                root_node = batch[0][1]
+            if on_batch:
+                on_batch(batch)
+        
+        # 设置了包含条件时，扫描完成后移除其中没有任何匹配条目的目录
+        if self.filter_engine.include_matcher is not None and not scan_options.get('lazy'):
+            self._remove_empty_directories(root_node)
+        
+        return root_node
+    
+    def iter_scan(self, project_path, filter_patterns=None, use_gitignore=False,
+                  follow_symlinks=True, workers=1, processes=1, shard_depth=1,
+                  batch_size=500, batch_interval=0.2, use_cache=False,
+                  cancel_event=None, max_nodes=None, max_depth=None, max_time=None,
+                  lazy=False, source='filesystem', include_untracked=False,
+                  collect_filter_stats=False, include_patterns=None):
+        """
+        流式扫描目录，边扫描边按批次产出新发现的节点
+        
+        第一批的第一个事件为 (None, 根节点)；之后每个事件的父节点都已在之前产出。
+        产出时节点已挂接到父节点下，消费者可以在扫描过程中直接使用已构建的部分树。
+        
+        扫描被取消或超出限制时提前结束，未完整列出的目录节点标记为 truncated，
+        中止原因记录在 scan_stop_reason 中（'cancelled'、'max_nodes' 或 'max_time'）。
+        
+        Args:
+            project_path: 项目根目录路径
+            filter_patterns: 过滤模式列表
+            use_gitignore: 是否使用.gitignore
+            follow_symlinks: 是否跟随符号链接（False时使用lstat，符号链接按文件处理）
+            workers: 列目录使用的线程数，大于1时启用多线程并行扫描
+            processes: 扫描使用的进程数，大于1时按子目录分片在进程池中扫描（可传入os.cpu_count()）
+            shard_depth: 进程分片的目录层级，该层级的每个子目录作为一个分片
+            batch_size: 每批最多包含的事件数
+            batch_interval: 距上次产出超过该秒数时，即使未满也产出当前批次
+            use_cache: 是否使用增量扫描缓存（mtime未变化的目录复用上次的列表；按需加载和source为'git'时不使用）
+            cancel_event: 可选的threading.Event，置位后扫描尽快结束
+            max_nodes: 最多构建的节点数（含根节点）
+            max_depth: 最大深度（根节点深度为0），该深度的目录不再列出并标记为 truncated
+            max_time: 最长扫描时间（秒）
+            lazy: 按需加载模式，只创建根节点，目录的子节点在首次访问时才列出
+            source: 文件来源，'filesystem' 遍历文件系统，'git' 直接读取git索引中已跟踪的文件
+                （此时忽略workers和processes）
+            include_untracked: source为'git'时，同时列出未跟踪且未被过滤的文件
+            collect_filter_stats: 记录各过滤模式的匹配次数、命中次数、耗时和排除的条目，
+                扫描后通过 filter_engine.get_pattern_stats() 获取（逐条匹配较慢，且不使用增量缓存；
+                被排除的目录如node_modules会在磁盘上完整遍历一次以统计其条目数和大小）
+            include_patterns: 包含条件（语法同.gitignore），只保留匹配的条目及通往它们的目录，
+                不可能包含匹配条目的目录不会被列出
+            
+        Yields:
+            list: [(父节点, 节点), ...]
+        """
+        project_path = self._prepare_scan(project_path, filter_patterns, use_gitignore,
+                                          collect_filter_stats, include_patterns)
+        
+        # 创建根节点
+        root_name = PathUtils.get_filename(project_path) or project_path
+        root_node = TreeNode(root_name, project_path, is_directory=True)
+        
+        # 加载增量扫描缓存（统计过滤模式时需要实际匹配每个条目，不复用缓存；
+        # 按需加载和读取git索引时不经过缓存，也不保存，避免覆盖文件系统扫描的缓存）
+        if use_cache and not collect_filter_stats and not lazy and source != 'git':
+            self.scan_cache = ScanCache(project_path)
+            fingerprint = ScanCache.make_fingerprint(self.filter_engine.filter_patterns, follow_symlinks,
+                                                     use_gitignore, self.filter_engine.include_patterns)
+            self.scan_cache.load(fingerprint)
+        
+        # 扫描目录
+        if lazy:
+            root_node.loader = self._create_lazy_loader(project_path, follow_symlinks, source, include_untracked)
+            events = iter(())
+        elif not self._within_depth(0, max_depth):
+            root_node.truncated = True
+            events = iter(())
+        elif source == 'git':
+            list_directory = self._create_index_lister(project_path, include_untracked)
+            events = self._scan_tree(project_path, root_node, project_path, follow_symlinks, max_depth,
+                                     list_directory=list_directory)
+        elif processes and processes > 1:
+            events = self._scan_sharded(project_path, root_node, project_path, follow_symlinks,
+                                        processes, shard_depth, max_depth)
+        elif workers and workers > 1:
+            events = self._scan_parallel(project_path, root_node, project_path, follow_symlinks,
+                                         workers, max_depth)
+        else:
+            events = self._scan_tree(project_path, root_node, project_path, follow_symlinks, max_depth)
+        
+        start_time = time.monotonic()
+        node_count = 1
+        try:
+            # 按数量和时间间隔分批产出
+            batch = [(None, root_node)]
+            last_flush = start_time
+            for parent_node, node in events:
+                stop_reason = self._check_scan_limits(node_count, start_time, cancel_event,
+                                                      max_nodes, max_time)
+                if stop_reason:
+                    # 超出限制的节点不保留
+                    parent_node.remove_child(node)
+                    parent_node.truncated = True
+                    self.scan_stop_reason = stop_reason
+                    break
+                
+                node_count += 1
+                batch.append((parent_node, node))
+                now = time.monotonic()
+                if len(batch) >= batch_size or now - last_flush >= batch_interval:
+                    yield batch
+                    batch = []
+                    last_flush = now
+            
+            # 关闭扫描器，由其标记未完整列出的目录
+            self._close_events(events)
+            
+            if batch:
+                yield batch
+            
+            # 未访问到全部目录时（中止、限制深度、分片在子进程中扫描）保留其余目录的旧缓存
+            if self.scan_cache:
+                partial = (bool(self.scan_stop_reason) or max_depth is not None
+                           or bool(processes and processes > 1))
+                self.scan_cache.save(merge=partial)
+        finally:
+            self._close_events(events)
+            self.scan_cache = None
+    
+    def _prepare_scan(self, project_path, filter_patterns=None, use_gitignore=False,
+                      collect_filter_stats=False, include_patterns=None):
+        """校验工程目录并设置过滤条件，返回标准化后的路径"""
         # 标准化路径
         project_path = PathUtils.normalize_path(project_path)
         
@@ -32,120 +176,620 @@ class FileProcessor:
             raise ValueError(f"无效的目录路径: {project_path}")
         
         # 设置过滤条件
-        all_patterns = filter_patterns or []
+        self.filter_engine.set_filter_patterns(list(filter_patterns or []))
+        self.filter_engine.set_collect_stats(collect_filter_stats)
+        self.filter_engine.set_include_patterns(include_patterns)
         
-        # 如果使用.gitignore，加载其规则
-        if use_gitignore:
-            gitignore_patterns = self.filter_engine.load_gitignore(project_path)
-            all_patterns.extend(gitignore_patterns)
+        # 如果使用.gitignore，扫描时逐级加载各目录的规则
+        self.filter_engine.set_gitignore_root(project_path if use_gitignore else None)
+        self.scan_stop_reason = None
+        return project_path
+    
+    def scan_to_store(self, project_path, filter_patterns=None, use_gitignore=False,
+                      follow_symlinks=True, max_depth=None, cancel_event=None, on_progress=None,
+                      include_patterns=None, source='filesystem', include_untracked=False,
+                      collect_filter_stats=False, progress_interval=10000, max_nodes=None, max_time=None):
+        """
+        扫描目录并构建列式存储的文件树（TreeStore），不为每个条目创建节点对象
         
-        self.filter_engine.set_filter_patterns(all_patterns)
+        适用于数百万条目的超大工程。深度优先扫描，节点按先序写入存储，
+        同一时刻只保留当前路径上各级目录的列表。设置包含条件时不移除空目录。
         
-        # 创建根节点
-        root_name = PathUtils.get_filename(project_path) or project_path
-        root_node = TreeNode(root_name, project_path, is_directory=True)
+        扫描被取消或超出限制时提前结束，仍有条目未写入的目录标记为未完整扫描，
+        中止原因记录在 scan_stop_reason 中（同 iter_scan）。由于按先序深度优先写入，
+        超出节点数上限时保留的节点与 scan_directory 不一定相同。
         
-        # 递归扫描目录
-        self._scan_recursive(project_path, root_node, project_path)
+        Args:
+            project_path: 项目根目录路径
+            filter_patterns: 过滤模式列表
+            use_gitignore: 是否使用.gitignore
+            follow_symlinks: 是否跟随符号链接
+            max_depth: 最大深度（根节点深度为0），该深度的目录不再列出并标记为未完整扫描
+            cancel_event: 可选的threading.Event，置位后尽快结束，未列完的目录标记为未完整扫描
+            on_progress: 可选回调，每写入progress_interval个节点调用一次，参数为已写入的节点数
+            include_patterns: 包含条件
+            source: 文件来源，'filesystem' 或 'git'，见 iter_scan
+            include_untracked: source为'git'时，同时列出未跟踪且未被过滤的文件
+            collect_filter_stats: 记录各过滤模式的匹配统计，见 iter_scan
+            progress_interval: 进度回调的间隔节点数
+            max_nodes: 最多写入的节点数（含根节点）
+            max_time: 最长扫描时间（秒）
+            
+        Returns:
+            TreeStore: 文件树存储
+        """
+        project_path = self._prepare_scan(project_path, filter_patterns, use_gitignore,
+                                          collect_filter_stats, include_patterns)
+        if source == 'git':
+            list_directory = self._create_index_lister(project_path, include_untracked)
+        else:
+            list_directory = self._list_directory
         
-        return root_node
+        store = TreeStore(project_path)
+        root = store.append(-1, PathUtils.get_filename(project_path) or project_path, is_directory=True)
+        if not self._within_depth(0, max_depth):
+            store.set_truncated(root)
+            return store
+        
+        # 栈帧：[目录列表, 下一个条目的位置, 目录序号, 上一个子节点序号, 目录深度]
+        stack = [[list_directory(project_path, project_path, follow_symlinks), 0, root, -1, 0]]
+        start_time = time.monotonic()
+        next_progress = progress_interval
+        
+        while stack:
+            frame = stack[-1]
+            listing = frame[0]
+            if frame[1] >= len(listing):
+                stack.pop()
+                continue
+            
+            stop_reason = self._check_scan_limits(len(store), start_time, cancel_event, max_nodes, max_time)
+            if stop_reason:
+                # 超出限制的节点不写入，仍有条目未写入的目录标记为未完整扫描
+                for pending in stack:
+                    if pending[1] < len(pending[0]):
+                        store.set_truncated(pending[2])
+                self.scan_stop_reason = stop_reason
+                break
+            
+            name, path, is_directory, size, descend = listing[frame[1]]
+            frame[1] += 1
+            index = store.append(frame[2], name, is_directory, size, frame[3])
+            frame[3] = index
+            
+            if descend:
+                if self._within_depth(frame[4] + 1, max_depth):
+                    stack.append([list_directory(path, project_path, follow_symlinks), 0,
+                                  index, -1, frame[4] + 1])
+                else:
+                    store.set_truncated(index)
+            
+            if on_progress and len(store) >= next_progress:
+                on_progress(len(store))
+                next_progress += progress_interval
+        
+        return store
     
-    def _scan_recursive(self, current_path, parent_node, base_path):
-        """递归扫描目录"""
-        try:
-            # 获取目录下的所有项目
-            items = os.listdir(current_path)
-            items.sort()  # 排序便于展示
+    def configure_filters(self, project_path, filter_patterns=None, use_gitignore=False, include_patterns=None):
+        """
+        按扫描时的方式设置过滤条件，用于不经扫描得到的文件树（如从快照恢复），
+        使之后的实时同步和按需加载使用与扫描相同的规则
+        
+        Returns:
+            str: 标准化后的工程路径
+        
+        Raises:
+            ValueError: 工程目录不存在
+        """
+        return self._prepare_scan(project_path, filter_patterns, use_gitignore,
+                                  include_patterns=include_patterns)
+    
+    def create_lazy_loader(self, project_path, filter_patterns=None, use_gitignore=False,
+                           include_patterns=None, follow_symlinks=True):
+        """
+        按过滤条件创建按需加载函数，用于为已有文件树（如从快照恢复）中未加载的目录重新挂接
+        
+        Returns:
+            function: 以目录节点为参数的加载函数
+        """
+        project_path = self.configure_filters(project_path, filter_patterns, use_gitignore, include_patterns)
+        return self._create_lazy_loader(project_path, follow_symlinks)
+    
+    def _create_lazy_loader(self, base_path, follow_symlinks=True, source='filesystem', include_untracked=False):
+        """
+        创建按需加载函数，使用独立的过滤引擎副本，不受之后扫描的影响
+        
+        source为'git'时从git索引中列出已跟踪的条目（索引在创建时读取），含义同 iter_scan
+        """
+        processor = FileProcessor()
+        processor.filter_engine.set_filter_patterns(list(self.filter_engine.filter_patterns))
+        processor.filter_engine.set_include_patterns(self.filter_engine.include_patterns)
+        processor.filter_engine.set_gitignore_root(self.filter_engine.gitignore_root)
+        processor.filter_engine.share_pattern_stats(self.filter_engine)
+        
+        list_directory = processor._list_directory
+        if source == 'git':
+            list_directory = processor._create_index_lister(base_path, include_untracked)
+        
+        def load_children(node):
+            for name, path, is_directory, size, descend in list_directory(
+                    node.path, base_path, follow_symlinks):
+                child = TreeNode(name, path, is_directory=is_directory)
+                child.size = size
+                if descend:
+                    child.loader = load_children
+                node.add_child(child)
+        
+        return load_children
+    
+    def _create_index_lister(self, project_path, include_untracked=False):
+        """
+        创建基于git索引的列目录函数，接口与_list_directory相同
+        
+        已跟踪的条目直接取自索引（大小为索引中记录的值），只应用过滤条件，不再匹配.gitignore；
+        include_untracked时再列出目录，补充未跟踪且未被过滤和忽略的条目。
+        """
+        index, prefix = GitIndex.open(project_path)
+        tracked = {project_path: index.build_tree(prefix)}
+        ignored_directories = set()  # 被.gitignore忽略但含有已跟踪文件的目录，不再补充未跟踪条目
+        
+        def list_directory(current_path, base_path, follow_symlinks=True):
+            entries = tracked.pop(current_path, {})
+            rel_dir = PathUtils.get_relative_path(base_path, current_path)
+            rel_prefix = "" if rel_dir == os.curdir else rel_dir + os.sep
+            merge_untracked = include_untracked and current_path not in ignored_directories
+            gitignore = None
+            if merge_untracked:
+                gitignore = self.filter_engine.get_gitignore_matcher(current_path, rel_prefix.rstrip(os.sep))
             
-            for item in items:
-                item_path = PathUtils.join_path(current_path, item)
+            results = []
+            path_prefix = PathUtils.join_path(current_path, "")
+            for name, value in entries.items():
+                rel_path = rel_prefix + name
+                path = path_prefix + name
+                if self.filter_engine.should_exclude_relative(rel_path, path):
+                    continue
                 
-                # 检查是否应该排除
-                if self.filter_engine.should_exclude(item_path, base_path):
+                # 子模块显示为目录，不展开
+                is_directory = isinstance(value, dict) or value[0] & MODE_TYPE_MASK == MODE_GITLINK
+                if not self.filter_engine.should_include_relative(rel_path, is_directory):
                     continue
                 
-                # 判断是文件还是目录
-                is_directory = os.path.isdir(item_path)
+                if isinstance(value, dict):
+                    tracked[path] = value
+                    # 当前目录不补充未跟踪条目时，其子目录同样不补充
+                    if not merge_untracked or (gitignore and gitignore.is_ignored(rel_path, True)):
+                        ignored_directories.add(path)
+                    results.append((name, path, True, 0, True))
+                else:
+                    results.append((name, path, is_directory, value[1], False))
+            
+            if merge_untracked:
+                for item in self._list_directory(current_path, base_path, follow_symlinks):
+                    if item[0] not in entries and item[0] != '.git':
+                        results.append(item)
+            
+            results.sort(key=lambda item: item[0])
+            return results
+        
+        return list_directory
+    
+    def _check_scan_limits(self, node_count, start_time, cancel_event, max_nodes, max_time):
+        """检查扫描是否需要中止，返回中止原因"""
+        if cancel_event is not None and cancel_event.is_set():
+            return 'cancelled'
+        if max_nodes and node_count >= max_nodes:
+            return 'max_nodes'
+        if max_time and time.monotonic() - start_time >= max_time:
+            return 'max_time'
+        return None
+    
+    def _close_events(self, events):
+        """关闭扫描事件生成器"""
+        close = getattr(events, 'close', None)
+        if close:
+            close()
+    
+    def _within_depth(self, depth, max_depth):
+        """判断该深度的目录是否允许继续列出"""
+        return max_depth is None or depth < max_depth
+    
+    def _scan_tree(self, project_path, root_node, base_path, follow_symlinks=True,
+                   max_depth=None, frontier=None, list_directory=None):
+        """
+        扫描目录（显式栈实现，不受递归深度限制），逐个产出 (父节点, 节点)
+        
+        达到max_depth的目录不再列出：若提供了frontier列表则追加 (路径, 节点) 交由调用方处理，
+        否则标记为 truncated。list_directory可替换列目录的方式，接口与_list_directory相同。
+        """
+        list_directory = list_directory or self._list_directory
+        stack = [(project_path, root_node, 0)]
+        parent_node = None
+        subdirectories = []
+        remaining = 0
+        
+        try:
+            while stack:
+                current_path, parent_node, depth = stack.pop()
+                subdirectories = []
+                listing = list_directory(current_path, base_path, follow_symlinks)
                 
-                # 创建节点
-                node = TreeNode(item, item_path, is_directory=is_directory)
-                parent_node.add_child(node)
+                for index, (name, path, is_directory, size, descend) in enumerate(listing):
+                    # 创建节点
+                    node = TreeNode(name, path, is_directory=is_directory)
+                    node.size = size
+                    parent_node.add_child(node)
+                    remaining = len(listing) - index - 1
+                    
+                    # 如果是目录，稍后继续扫描
+                    if descend:
+                        if self._within_depth(depth + 1, max_depth):
+                            subdirectories.append((path, node, depth + 1))
+                        elif frontier is not None:
+                            frontier.append((path, node))
+                        else:
+                            node.truncated = True
+                    
+                    yield parent_node, node
                 
-                # 如果是目录，递归扫描
-                if is_directory:
-                    self._scan_recursive(item_path, node, base_path)
+                # 逆序入栈，保证按名称顺序深度优先处理
+                stack.extend(reversed(subdirectories))
+                subdirectories = []
+        except GeneratorExit:
+            # 扫描被中止：未完整列出的目录标记为截断
+            if remaining:
+                parent_node.truncated = True
+            for _, node, _ in stack + subdirectories:
+                node.truncated = True
+            raise
+    
+    def _scan_parallel(self, project_path, root_node, base_path, follow_symlinks, workers,
+                       max_depth=None):
+        """
+        多线程并行扫描目录，逐个产出 (父节点, 节点)
+        
+        列目录（I/O）在线程池中执行，节点只在当前线程中创建和挂接；
+        每个目录的子节点按其排序后的列表顺序追加，因此结果与顺序扫描完全一致。
+        """
+        executor = ThreadPoolExecutor(max_workers=workers)
+        pending = {
+            executor.submit(self._list_directory, project_path, base_path, follow_symlinks): (root_node, 0)
+        }
+        parent_node = None
+        remaining = 0
+        
+        try:
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    parent_node, depth = pending.pop(future)
+                    listing = future.result()
                     
+                    for index, (name, path, is_directory, size, descend) in enumerate(listing):
+                        node = TreeNode(name, path, is_directory=is_directory)
+                        node.size = size
+                        parent_node.add_child(node)
+                        remaining = len(listing) - index - 1
+                        
+                        if descend:
+                            if self._within_depth(depth + 1, max_depth):
+                                future_child = executor.submit(
+                                    self._list_directory, path, base_path, follow_symlinks)
+                                pending[future_child] = (node, depth + 1)
+                            else:
+                                node.truncated = True
+                        
+                        yield parent_node, node
+                    remaining = 0
+        except GeneratorExit:
+            # 扫描被中止：未完整列出的目录标记为截断
+            if remaining:
+                parent_node.truncated = True
+            for node, _ in pending.values():
+                node.truncated = True
+            raise
+        finally:
+            for future in pending:
+                future.cancel()
+            executor.shutdown(wait=True)
+    
+    def _scan_sharded(self, project_path, root_node, base_path, follow_symlinks,
+                      processes, shard_depth=1, max_depth=None):
+        """
+        多进程分片扫描目录，逐个产出 (父节点, 节点)
+        
+        在当前进程中展开前shard_depth层目录，该层级的每个子目录作为一个分片
+        交给进程池扫描；子进程返回紧凑的记录列表，再拼接到对应的目录节点下。
+        """
+        shard_depth = max(shard_depth, 1)
+        if max_depth is not None and max_depth <= shard_depth:
+            yield from self._scan_tree(project_path, root_node, base_path, follow_symlinks, max_depth)
+            return
+        
+        shards = []
+        try:
+            yield from self._scan_tree(project_path, root_node, base_path, follow_symlinks,
+                                       shard_depth, frontier=shards)
+        except GeneratorExit:
+            for _, node in shards:
+                node.truncated = True
+            raise
+        
+        if not shards:
+            return
+        
+        remaining_depth = None if max_depth is None else max_depth - shard_depth
+        filter_patterns = list(self.filter_engine.filter_patterns)
+        gitignore_root = self.filter_engine.gitignore_root
+        collect_stats = self.filter_engine.collect_stats
+        include_patterns = self.filter_engine.include_patterns
+        executor = ProcessPoolExecutor(max_workers=processes)
+        futures = [
+            (node, executor.submit(_scan_shard, path, base_path, filter_patterns, follow_symlinks,
+                                   remaining_depth, gitignore_root, collect_stats, include_patterns))
+            for path, node in shards
+        ]
+        attached = 0
+        
+        try:
+            for node, future in futures:
+                child_count, records, pattern_stats = future.result()
+                self.filter_engine.merge_pattern_stats(pattern_stats)
+                yield from self._attach_records(node, child_count, records)
+                attached += 1
+        except GeneratorExit:
+            # 当前分片由_attach_records标记，其余未拼接的分片整体标记为截断
+            for node, _ in futures[attached + 1:]:
+                node.truncated = True
+            raise
+        finally:
+            for _, future in futures:
+                future.cancel()
+            executor.shutdown(wait=False)
+    
+    def _serialize_subtree(self, current_path, base_path, follow_symlinks=True, max_depth=None):
+        """
+        扫描子树并序列化为紧凑的先序记录列表
+        
+        Returns:
+            tuple: (顶层子节点数, [(名称, 是否目录, 大小, 子节点数, 是否截断), ...])
+        """
+        top_level = self._list_directory(current_path, base_path, follow_symlinks)
+        records = []
+        stack = [(iter(top_level), 1)]
+        
+        while stack:
+            entries, depth = stack[-1]
+            item = next(entries, None)
+            if item is None:
+                stack.pop()
+                continue
+            
+            name, path, is_directory, size, descend = item
+            children = []
+            truncated = False
+            if descend:
+                if self._within_depth(depth, max_depth):
+                    children = self._list_directory(path, base_path, follow_symlinks)
+                else:
+                    truncated = True
+            
+            records.append((name, is_directory, size, len(children), truncated))
+            if children:
+                stack.append((iter(children), depth + 1))
+        
+        return len(top_level), records
+    
+    def _attach_records(self, parent_node, child_count, records):
+        """将紧凑的先序记录列表还原为节点并挂接到parent_node下，逐个产出 (父节点, 节点)"""
+        # 栈帧：[目录节点, 剩余子节点数, 目录路径前缀]
+        stack = [[parent_node, child_count, PathUtils.join_path(parent_node.path, "")]]
+        
+        try:
+            for name, is_directory, size, count, truncated in records:
+                while stack[-1][1] == 0:
+                    stack.pop()
+                frame = stack[-1]
+                frame[1] -= 1
+                
+                path = frame[2] + name
+                node = TreeNode(name, path, is_directory=is_directory)
+                node.size = size
+                node.truncated = truncated
+                frame[0].add_child(node)
+                
+                if count:
+                    stack.append([node, count, PathUtils.join_path(path, "")])
+                
+                yield frame[0], node
+        except GeneratorExit:
+            # 扫描被中止：尚有子节点未拼接的目录标记为截断
+            for node, count, _ in stack:
+                if count:
+                    node.truncated = True
+            raise
+    
+    def _list_directory(self, current_path, base_path, follow_symlinks=True):
+        """
+        列出单个目录下未被过滤的条目，启用增量缓存时优先复用缓存的列表
+        
+        Returns:
+            list: 按名称排序的 (名称, 路径, 是否目录, 大小, 是否继续深入) 元组列表
+        """
+        scan_cache = self.scan_cache
+        try:
+            rel_dir = PathUtils.get_relative_path(base_path, current_path)
+            if rel_dir == os.curdir:
+                rel_dir = ""
+            gitignore = self.filter_engine.get_gitignore_matcher(current_path, rel_dir)
+            
+            if scan_cache is None:
+                return self._read_directory(current_path, rel_dir, gitignore, follow_symlinks)
+            
+            # 缓存的列表只在目录和生效的.gitignore规则都未变化时复用
+            dir_stat = os.stat(current_path)
+            token = gitignore.token if gitignore else ""
+            cached = scan_cache.lookup(current_path, dir_stat, token)
+            if cached is not None:
+                # 文件内容的修改不改变目录mtime，文件大小每次重新获取
+                path_prefix = PathUtils.join_path(current_path, "")
+                results = []
+                for name, is_directory, descend in cached:
+                    path = path_prefix + name
+                    size = 0 if is_directory else self._get_path_size(path, follow_symlinks)
+                    results.append((name, path, is_directory, size, descend))
+                return results
+            
+            results = self._read_directory(current_path, rel_dir, gitignore, follow_symlinks)
+            scan_cache.store(current_path, dir_stat, [
+                (name, is_directory, descend)
+                for name, _, is_directory, _, descend in results
+            ], token)
+            return results
+            
         except PermissionError:
             # 跳过没有权限的目录
             print(f"跳过无权限访问的目录: {current_path}")
         except Exception as e:
             print(f"扫描目录时出错: {current_path}, 错误: {str(e)}")
-    
-    def get_file_statistics(self, root_node):
-        """获取文件统计信息"""
-        stats = {
-            'total_files': 0,
-            'total_directories': 0,
-            'file_types': {},
-            'total_size': 0
-        }
         
-        self._collect_statistics(root_node, stats)
-        return stats
+        return []
     
-    def _collect_statistics(self, node, stats):
-        """收集统计信息"""
-        if node.is_directory:
-            stats['total_directories'] += 1
-            # 递归处理子节点
-            for child in node.children:
-                self._collect_statistics(child, stats)
-        else:
-            stats['total_files'] += 1
-            
-            # 获取文件扩展名
-            ext = PathUtils.get_file_extension(node.path)
-            if ext:
-                stats['file_types'][ext] = stats['file_types'].get(ext, 0) + 1
-            else:
-                stats['file_types']['无扩展名'] = stats['file_types'].get('无扩展名', 0) + 1
+    def _read_directory(self, current_path, rel_dir, gitignore=None, follow_symlinks=True):
+        """
+        基于os.scandir列目录，在同一次遍历中获取类型和大小并执行过滤
+        
+        Args:
+            current_path: 目录完整路径
+            rel_dir: 目录相对于工程根目录的路径，根目录为空字符串
+            gitignore: 该目录下生效的.gitignore匹配器
+            follow_symlinks: 是否跟随符号链接
+        """
+        results = []
+        
+        # 获取目录下的所有项目
+        with os.scandir(current_path) as it:
+            entries = sorted(it, key=lambda entry: entry.name)  # 排序便于展示
+        
+        # 条目的相对路径由目录的相对路径逐级拼接，无需逐个计算
+        rel_prefix = rel_dir + os.sep if rel_dir else ""
+        
+        for entry in entries:
+            # 检查是否应该排除
+            rel_path = rel_prefix + entry.name
+            if self.filter_engine.should_exclude_relative(rel_path, entry.path):
+                continue
             
-            # 获取文件大小
+            # 判断是文件还是目录（优先使用DirEntry缓存的类型信息）
             try:
-                file_size = os.path.getsize(node.path)
-                stats['total_size'] += file_size
+                is_directory = entry.is_dir(follow_symlinks=follow_symlinks)
             except OSError:
-                pass
-    
-    def search_in_tree(self, root_node, keyword):
-        """在文件树中搜索"""
-        results = []
-        self._search_recursive(root_node, keyword.lower(), results)
+                is_directory = False
+            
+            # .gitignore规则（只匹配目录的规则需要条目类型），被忽略的目录不会再被列出
+            if gitignore is not None and gitignore.is_ignored(rel_path, is_directory):
+                continue
+            
+            # 包含条件：不可能包含匹配条目的目录直接跳过
+            if not self.filter_engine.should_include_relative(rel_path, is_directory):
+                continue
+            
+            if is_directory:
+                descend = not (follow_symlinks and entry.is_symlink()
+                               and self._is_symlink_loop(entry.path, current_path))
+                results.append((entry.name, entry.path, True, 0, descend))
+            else:
+                size = self._get_entry_size(entry, follow_symlinks)
+                results.append((entry.name, entry.path, False, size, False))
+        
         return results
     
-    def _search_recursive(self, node, keyword, results):
-        """递归搜索"""
-        if keyword in node.name.lower():
-            results.append(node)
+    def _is_symlink_loop(self, link_path, current_path):
+        """检查指向目录的符号链接是否指向自身的祖先目录（避免无限扫描）"""
+        target = os.path.realpath(link_path)
+        current = os.path.realpath(current_path)
+        return current == target or current.startswith(target.rstrip(os.sep) + os.sep)
+    
+    def _get_entry_size(self, entry, follow_symlinks=True):
+        """从DirEntry获取文件大小，失败时返回0"""
+        try:
+            return entry.stat(follow_symlinks=follow_symlinks).st_size
+        except OSError:
+            return 0
+    
+    def _get_path_size(self, path, follow_symlinks=True):
+        """按路径获取文件大小，失败时返回0"""
+        try:
+            return (os.stat(path) if follow_symlinks else os.lstat(path)).st_size
+        except OSError:
+            return 0
+    
+    def _remove_empty_directories(self, root_node):
+        """移除没有任何子节点的目录（本身匹配包含条件或未完整扫描的目录除外），由深到浅逐级处理"""
+        include_matcher = self.filter_engine.include_matcher
+        prefix_length = len(PathUtils.join_path(root_node.path, ""))
+        stack = [(root_node, False)]
         
-        for child in node.children:
-            self._search_recursive(child, keyword, results)
+        while stack:
+            node, visited = stack.pop()
+            if not visited:
+                # 子目录先于父目录处理，父目录是否为空取决于子目录是否被移除
+                stack.append((node, True))
+                stack.extend((child, False) for child in node.children if child.is_directory)
+                continue
+            
+            if (node is not root_node and not node.children and not node.truncated
+                    and not include_matcher.matches_directory(node.path[prefix_length:])):
+                node.parent.remove_child(node)
     
-    def get_tree_depth(self, root_node):
-        """获取树的最大深度"""
-        if not root_node.children:
-            return 1
+    def get_file_statistics(self, root_node):
+        """获取文件统计信息（直接读取节点上扫描时维护的子树汇总，无需遍历）"""
+        file_types = {}
+        if root_node.is_directory:
+            ext_counts = root_node.ext_counts
+        else:
+            ext_counts = {root_node.get_extension(): 1}
+        for ext, count in ext_counts.items():
+            file_types[ext or '无扩展名'] = count
         
-        max_depth = 0
-        for child in root_node.children:
-            child_depth = self.get_tree_depth(child)
-            max_depth = max(max_depth, child_depth)
+        return {
+            'total_files': root_node.file_count,
+            'total_directories': root_node.dir_count,
+            'file_types': file_types,
+            'total_size': root_node.total_size
+        }
+    
+    def search_in_tree(self, root_node, keyword, fuzzy=False, limit=None, search_index=None):
+        """
+        在文件树中搜索名称匹配的节点，按得分从高到低排列
         
-        return max_depth + 1
+        Args:
+            root_node: 根节点
+            keyword: 关键字（不区分大小写）
+            fuzzy: 为True时按子序列模糊匹配，否则按子串匹配
+            limit: 最多返回的结果数，为None时返回全部匹配
+            search_index: 该文件树的搜索索引（SearchIndex），提供时不再遍历整棵树
+        """
+        if search_index is not None:
+            return search_index.search(keyword, limit, fuzzy)
+        return rank_nodes((node for node, _ in root_node.walk()), keyword, limit, fuzzy)
+    
+    def get_tree_depth(self, root_node):
+        """获取树的最大深度（读取节点上维护的子树层数，按需加载模式下只计已加载部分）"""
+        return root_node.height
     
     def get_node_count(self, root_node):
-        """获取节点总数"""
-        count = 1  # 包含根节点
-        for child in root_node.children:
-            count += self.get_node_count(child)
-        return count
\ No newline at end of file
+        """获取节点总数（读取节点上维护的子树汇总）"""
+        return root_node.node_count
+
+
+def _scan_shard(shard_path, base_path, filter_patterns, follow_symlinks=True, max_depth=None,
+                gitignore_root=None, collect_stats=False, include_patterns=None):
+    """进程池工作函数：扫描一个分片目录，返回紧凑的记录列表及该分片的过滤模式统计"""
+    processor = FileProcessor()
+    processor.filter_engine.set_filter_patterns(filter_patterns)
+    processor.filter_engine.set_collect_stats(collect_stats)
+    processor.filter_engine.set_include_patterns(include_patterns)
+    processor.filter_engine.set_gitignore_root(gitignore_root)
+    child_count, records = processor._serialize_subtree(shard_path, base_path, follow_symlinks, max_depth)
+    return child_count, records, processor.filter_engine.get_pattern_stats()
\ No newline at end of file
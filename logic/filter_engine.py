@@ -3,8 +3,12 @@
 """
 
 import os
-import fnmatch
 import re
+import threading
+import time
+from logic.pattern_matcher import PatternMatcher
+from logic.include_matcher import IncludeMatcher
+from logic.gitignore import GitignoreRules, GitignoreMatcher, parse_gitignore
 from utils.path_utils import PathUtils
 from utils.utils import Utils
 
@@ -13,25 +17,174 @@ class FilterEngine:
     
     def __init__(self):
         self.filter_patterns = []
+        self.matcher = PatternMatcher()
+        self.include_patterns = []
+        self.include_matcher = None  # 包含条件，None表示不限制
+        self.gitignore_root = None  # 应用.gitignore规则的工程根目录，None表示不使用
+        self._gitignore_files = {}  # 规则文件路径 -> 编译后的规则（按mtime和大小校验）
+        self._gitignore_matchers = {}  # 目录相对路径 -> 该目录生效的匹配器
+        
+        # 逐条模式的匹配统计（开启后按模式顺序逐条匹配，用于找出开销大或从未命中的模式）
+        self.collect_stats = False
+        self.pattern_stats = []  # 与filter_patterns一一对应的统计字典
+        self._pattern_matchers = []
+        self._stats_lock = threading.Lock()
     
     def load_gitignore(self, project_path):
         """加载.gitignore文件的过滤规则"""
         gitignore_path = PathUtils.join_path(project_path, '.gitignore')
-        patterns = []
         
         if os.path.exists(gitignore_path):
-            content = Utils.read_file_content(gitignore_path)
-            for line in content.splitlines():
-                line = line.strip()
-                # 忽略注释和空行
-                if line and not line.startswith('#'):
-                    patterns.append(line)
+            return parse_gitignore(Utils.read_file_content(gitignore_path))
+        return []
+    
+    def set_gitignore_root(self, project_path):
+        """
+        设置应用.gitignore规则的工程根目录（None表示不使用.gitignore）
+        
+        各目录的.gitignore在扫描到该目录时才加载，.git/info/exclude优先级最低。
+        已编译的规则文件按mtime缓存，重新设置时只重建目录与规则的对应关系。
+        """
+        self.gitignore_root = project_path
+        self.refresh_gitignore()
+    
+    def refresh_gitignore(self):
+        """清除目录与规则的对应关系，之后访问时重新检查各级.gitignore是否变化"""
+        self._gitignore_matchers = {}
+    
+    def get_gitignore_matcher(self, dir_path, rel_dir):
+        """
+        获取目录下生效的.gitignore匹配器
+        
+        Args:
+            dir_path: 目录完整路径
+            rel_dir: 目录相对于工程根目录的路径，根目录为空字符串
         
-        return patterns
+        Returns:
+            GitignoreMatcher: 没有任何规则时返回None
+        """
+        if self.gitignore_root is None:
+            return None
+        matchers = self._gitignore_matchers
+        if rel_dir in matchers:
+            return matchers[rel_dir]
+        
+        # 向上找到已加载的祖先目录，再逐级向下加载
+        pending = []
+        while rel_dir not in matchers:
+            pending.append((dir_path, rel_dir))
+            if not rel_dir:
+                break
+            dir_path = os.path.dirname(dir_path)
+            rel_dir = os.path.dirname(rel_dir)
+        
+        if rel_dir in matchers:
+            matcher = matchers[rel_dir]
+        else:
+            rules = self._load_gitignore_rules(os.path.join(self.gitignore_root, '.git', 'info', 'exclude'))
+            matcher = GitignoreMatcher(rules) if rules and rules.patterns else None
+        
+        for dir_path, rel_dir in reversed(pending):
+            rules = self._load_gitignore_rules(os.path.join(dir_path, '.gitignore'))
+            if rules and rules.patterns:
+                matcher = GitignoreMatcher(rules, rel_dir, matcher)
+            matchers[rel_dir] = matcher
+        return matcher
+    
+    def is_gitignored(self, file_path):
+        """判断路径是否被.gitignore规则忽略（任一上级目录被忽略时也视为忽略）"""
+        if self.gitignore_root is None:
+            return False
+        rel_path = PathUtils.get_relative_path(self.gitignore_root, file_path)
+        if rel_path == os.curdir or rel_path.startswith(os.pardir) or os.path.isabs(rel_path):
+            return False
+        
+        parts = rel_path.split(os.sep)
+        for i in range(len(parts)):
+            rel_dir = os.sep.join(parts[:i])
+            matcher = self.get_gitignore_matcher(os.path.join(self.gitignore_root, rel_dir), rel_dir)
+            is_directory = i < len(parts) - 1 or os.path.isdir(file_path)
+            if matcher is not None and matcher.is_ignored(os.sep.join(parts[:i + 1]), is_directory):
+                return True
+        return False
+    
+    def _load_gitignore_rules(self, file_path):
+        """加载并编译规则文件，文件未变化时复用缓存，不存在或没有规则时返回None"""
+        try:
+            stat = os.stat(file_path)
+        except OSError:
+            return None
+        
+        signature = (stat.st_mtime_ns, stat.st_size)
+        cached = self._gitignore_files.get(file_path)
+        if cached is not None and cached.signature == signature:
+            return cached
+        
+        rules = GitignoreRules(parse_gitignore(Utils.read_file_content(file_path)), signature)
+        self._gitignore_files[file_path] = rules
+        return rules
     
     def set_filter_patterns(self, patterns):
-        """设置过滤模式"""
+        """设置过滤模式（模式在此编译，之后修改模式列表需重新设置）"""
         self.filter_patterns = patterns or []
+        self.matcher = PatternMatcher(self.filter_patterns)
+        self.reset_pattern_stats()
+    
+    def set_include_patterns(self, patterns):
+        """设置包含条件（白名单），为空时不限制；设置后只保留匹配的条目及通往它们的目录"""
+        self.include_patterns = list(patterns or [])
+        matcher = IncludeMatcher(self.include_patterns)
+        self.include_matcher = matcher if matcher.patterns else None
+    
+    def set_collect_stats(self, enabled):
+        """开启或关闭逐条模式的匹配统计（开启后匹配明显变慢），并清空已有统计"""
+        self.collect_stats = enabled
+        self.reset_pattern_stats()
+    
+    def reset_pattern_stats(self):
+        """清空匹配统计"""
+        with self._stats_lock:
+            if self.collect_stats:
+                self.pattern_stats = [self._new_pattern_stats(pattern) for pattern in self.filter_patterns]
+                self._pattern_matchers = [PatternMatcher([pattern]) for pattern in self.filter_patterns]
+            else:
+                self.pattern_stats = []
+                self._pattern_matchers = []
+    
+    def _new_pattern_stats(self, pattern):
+        """创建单个模式的统计字典"""
+        return {
+            'pattern': pattern,
+            'evaluations': 0,  # 匹配次数
+            'hits': 0,  # 命中次数（排在前面的模式已命中时不再匹配后面的模式）
+            'time': 0.0,  # 累计匹配耗时（秒）
+            'pruned_entries': 0,  # 因该模式被排除的条目数，含被排除目录下的所有条目
+            'pruned_bytes': 0  # 被排除条目的文件总大小
+        }
+    
+    def get_pattern_stats(self):
+        """
+        获取各过滤模式的匹配统计
+        
+        Returns:
+            list: 按模式顺序排列的统计字典副本，未开启统计时为空列表
+        """
+        with self._stats_lock:
+            return [dict(stats) for stats in self.pattern_stats]
+    
+    def merge_pattern_stats(self, pattern_stats):
+        """合并其他过滤引擎（如子进程中）使用相同模式得到的统计"""
+        with self._stats_lock:
+            for stats, other in zip(self.pattern_stats, pattern_stats):
+                for key in ('evaluations', 'hits', 'time', 'pruned_entries', 'pruned_bytes'):
+                    stats[key] += other[key]
+    
+    def share_pattern_stats(self, other):
+        """与另一个使用相同模式的过滤引擎共用统计（按需加载时的引擎副本）"""
+        self.collect_stats = other.collect_stats
+        self.pattern_stats = other.pattern_stats
+        self._pattern_matchers = other._pattern_matchers
+        self._stats_lock = other._stats_lock
     
     def should_exclude(self, file_path, base_path):
         """判断文件是否应该被排除"""
@@ -39,63 +192,152 @@ class FilterEngine:
         rel_path = PathUtils.get_relative_path(base_path, file_path)
         filename = PathUtils.get_filename(file_path)
         
-        # 检查每个过滤模式
-        for pattern in self.filter_patterns:
-            if self._match_pattern(pattern, rel_path, filename):
-                return True
+        return self._should_exclude_path(file_path, rel_path, filename)
+    
+    def _should_exclude_path(self, file_path, rel_path, filename):
+        """should_exclude的判断部分，相对路径由调用方计算"""
+        if self.collect_stats:
+            excluded = self._match_with_stats(file_path, rel_path, filename)
+        else:
+            excluded = self.matcher.matches(rel_path, filename)
+        if not excluded and self.include_matcher is not None:
+            excluded = not self.include_matcher.includes(rel_path, os.path.isdir(file_path))
+        return excluded or self.is_gitignored(file_path)
+    
+    def should_exclude_relative(self, rel_path, file_path=None):
+        """
+        判断扫描到的条目是否应该被排除
         
-        return False
+        rel_path由扫描器逐级拼接得到，且其祖先目录都已通过过滤，
+        因此无需计算相对路径，也无需再检查路径中间的各级目录。
+        file_path为条目完整路径，仅在开启统计时用于计算被排除的子树大小。
+        """
+        if self.collect_stats:
+            return self._match_with_stats(file_path, rel_path, check_ancestors=False)
+        return self.matcher.matches(rel_path, check_ancestors=False)
     
-    def _match_pattern(self, pattern, rel_path, filename):
-        """匹配单个模式"""
-        # 清理模式
-        pattern = pattern.strip()
-        if not pattern:
-            return False
+    def should_include_relative(self, rel_path, is_directory):
+        """
+        判断扫描到的条目是否满足包含条件
         
-        # 处理否定模式（以!开头）
-        negate = False
-        if pattern.startswith('!'):
-            negate = True
-            pattern = pattern[1:]
+        目录只要其下可能存在匹配的条目就返回True；不可能存在匹配的目录直接跳过，不再列出。
+        """
+        return self.include_matcher is None or self.include_matcher.includes(rel_path, is_directory)
+    
+    def _match_with_stats(self, file_path, rel_path, filename=None, check_ancestors=True):
+        """按模式顺序逐条匹配并记录统计，第一个命中的模式记为排除该条目的模式"""
+        elapsed = []
+        hit = None
+        for index, matcher in enumerate(self._pattern_matchers):
+            start = time.perf_counter()
+            matched = matcher.matches(rel_path, filename, check_ancestors)
+            elapsed.append(time.perf_counter() - start)
+            if matched:
+                hit = index
+                break
         
-        # 处理目录模式（以/结尾）
-        is_dir_pattern = pattern.endswith('/')
-        if is_dir_pattern:
-            pattern = pattern[:-1]
+        # 被排除子树的统计在锁外进行，且不计入匹配耗时
+        pruned_entries, pruned_bytes = 1, 0
+        if hit is not None and file_path:
+            pruned_entries, pruned_bytes = self._measure_pruned(file_path)
         
-        # 匹配逻辑
-        matched = False
+        with self._stats_lock:
+            for stats, seconds in zip(self.pattern_stats, elapsed):
+                stats['evaluations'] += 1
+                stats['time'] += seconds
+            if hit is not None:
+                stats = self.pattern_stats[hit]
+                stats['hits'] += 1
+                stats['pruned_entries'] += pruned_entries
+                stats['pruned_bytes'] += pruned_bytes
+        return hit is not None
+    
+    def _measure_pruned(self, file_path):
+        """
+        统计被排除的条目及其下所有条目的数量和文件总大小（不跟随符号链接）
         
-        # 绝对路径模式（以/开头）
-        if pattern.startswith('/'):
-            pattern = pattern[1:]
-            matched = fnmatch.fnmatch(rel_path, pattern)
-        else:
-            # 相对路径模式
-            # 检查文件名匹配
-            if fnmatch.fnmatch(filename, pattern):
-                matched = True
-            # 检查路径匹配
-            elif fnmatch.fnmatch(rel_path, pattern):
-                matched = True
-            # 检查路径中任意部分匹配
-            elif fnmatch.fnmatch(rel_path, f"*/{pattern}") or fnmatch.fnmatch(rel_path, f"*/{pattern}/*"):
-                matched = True
-        
-        # 应用否定逻辑
-        return not matched if negate else matched
+        被排除的目录（如node_modules）在这里完整遍历一次，开启统计时扫描会因此明显变慢。
+        """
+        try:
+            if not os.path.isdir(file_path) or os.path.islink(file_path):
+                return 1, os.lstat(file_path).st_size
+        except OSError:
+            return 1, 0
+        
+        entries, total = 1, 0
+        stack = [file_path]
+        while stack:
+            try:
+                with os.scandir(stack.pop()) as it:
+                    for entry in it:
+                        entries += 1
+                        if entry.is_dir(follow_symlinks=False):
+                            stack.append(entry.path)
+                        else:
+                            total += entry.stat(follow_symlinks=False).st_size
+            except OSError:
+                continue
+        return entries, total
     
     def filter_file_list(self, file_list, base_path):
         """过滤文件列表"""
-        filtered_list = []
+        return self.filter_path_batch(file_list, base_path)
+    
+    def filter_path_batch(self, paths, base_path):
+        """
+        过滤一批路径，返回未被排除的路径，结果与逐个调用should_exclude相同
         
-        for file_path in file_list:
-            if not self.should_exclude(file_path, base_path):
-                filtered_list.append(file_path)
+        基准目录只规范化一次，位于其下的路径直接截取得到相对路径，不再逐个调用relpath。
+        """
+        base_prefix = PathUtils.join_path(PathUtils.normalize_path(base_path), "")
+        cwd_prefix = PathUtils.join_path(os.getcwd(), "")
+        prefix_length = len(base_prefix)
+        normpath = os.path.normpath
+        isabs = os.path.isabs
+        basename = os.path.basename
+        
+        # 只有过滤条件时直接调用编译后的匹配器
+        matches = None
+        if not self.collect_stats and self.include_matcher is None and self.gitignore_root is None:
+            matches = self.matcher.matches
         
+        filtered_list = []
+        for file_path in paths:
+            # 与relpath相同：相对路径视为相对于当前目录
+            full_path = normpath(file_path if isabs(file_path) else cwd_prefix + file_path)
+            if full_path.startswith(base_prefix):
+                rel_path = full_path[prefix_length:]
+            else:
+                rel_path = PathUtils.get_relative_path(base_path, file_path)
+            if matches is not None:
+                excluded = matches(rel_path, basename(file_path))
+            else:
+                excluded = self._should_exclude_path(file_path, rel_path, basename(file_path))
+            if not excluded:
+                filtered_list.append(file_path)
         return filtered_list
     
+    def iter_filter_paths(self, paths, base_path, batch_size=10000):
+        """
+        流式批量过滤路径，内存占用只与批大小有关
+        
+        Args:
+            paths: 可迭代的路径序列（如逐行读取的文件），不会整体读入内存
+            base_path: 计算相对路径的基准目录
+            batch_size: 每批的路径数
+        
+        Yields:
+            list: 每批中未被排除的路径，保持输入顺序
+        """
+        batch = []
+        for file_path in paths:
+            batch.append(file_path)
+            if len(batch) >= batch_size:
+                yield self.filter_path_batch(batch, base_path)
+                batch = []
+        if batch:
+            yield self.filter_path_batch(batch, base_path)
+    
     def get_common_ignore_patterns(self):
         """获取常见的忽略模式"""
         return [
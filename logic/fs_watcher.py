@@ -0,0 +1,450 @@
+"""
+文件系统监听模块
+"""
+
+import os
+import sys
+import time
+import errno
+import select
+import struct
+import threading
+import ctypes
+import ctypes.util
+from data.tree_node import TreeNode
+from utils.path_utils import PathUtils
+
+# inotify 事件掩码
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+
+class InotifyBackend:
+    """基于Linux inotify的目录变化监听（通过ctypes调用，无需第三方依赖）"""
+    
+    MASK = (IN_CREATE | IN_DELETE | IN_MOVED_FROM | IN_MOVED_TO | IN_CLOSE_WRITE |
+            IN_DELETE_SELF | IN_MOVE_SELF | IN_ONLYDIR)
+    
+    EVENT_HEADER = struct.Struct('iIII')
+    
+    def __init__(self):
+        if not sys.platform.startswith('linux'):
+            raise OSError(errno.ENOSYS, "inotify仅支持Linux")
+        
+        libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+        libc.inotify_init1.argtypes = [ctypes.c_int]
+        libc.inotify_add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+        libc.inotify_rm_watch.argtypes = [ctypes.c_int, ctypes.c_int]
+        self._libc = libc
+        
+        self._fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self._fd < 0:
+            code = ctypes.get_errno()
+            raise OSError(code, os.strerror(code))
+        
+        # 同一目录经符号链接可能以多个路径出现，内核对同一inode返回相同的wd
+        self._wd_to_paths = {}
+        self._path_to_wd = {}
+        # add/remove在主线程调用，poll在监听线程调用，两者都会修改上面的映射
+        self._lock = threading.Lock()
+    
+    def add(self, path):
+        """监听目录"""
+        with self._lock:
+            wd = self._libc.inotify_add_watch(self._fd, os.fsencode(path), self.MASK)
+            if wd < 0:
+                code = ctypes.get_errno()
+                raise OSError(code, os.strerror(code), path)
+            self._wd_to_paths.setdefault(wd, set()).add(path)
+            self._path_to_wd[path] = wd
+    
+    def remove(self, path):
+        """取消监听目录"""
+        with self._lock:
+            wd = self._path_to_wd.pop(path, None)
+            if wd is None:
+                return
+            paths = self._wd_to_paths.get(wd)
+            if paths:
+                paths.discard(path)
+                if paths:
+                    return
+            self._wd_to_paths.pop(wd, None)
+            self._libc.inotify_rm_watch(self._fd, wd)
+    
+    def paths(self):
+        """获取所有已监听的目录"""
+        with self._lock:
+            return list(self._path_to_wd)
+    
+    def poll(self, timeout):
+        """
+        等待目录变化
+        
+        Returns:
+            set: 发生变化的目录路径集合；事件队列溢出时返回None，表示需要全量同步
+        """
+        dirty = set()
+        readable, _, _ = select.select([self._fd], [], [], timeout)
+        if not readable:
+            return dirty
+        
+        while True:
+            try:
+                data = os.read(self._fd, 65536)
+            except BlockingIOError:
+                break
+            
+            with self._lock:
+                offset = 0
+                while offset < len(data):
+                    wd, mask, _, length = self.EVENT_HEADER.unpack_from(data, offset)
+                    offset += self.EVENT_HEADER.size + length
+                    
+                    if mask & IN_Q_OVERFLOW:
+                        return None
+                    
+                    paths = self._wd_to_paths.get(wd)
+                    if not paths:
+                        continue
+                    
+                    if mask & IN_IGNORED:
+                        # 监听已被内核移除（目录被删除或所在文件系统卸载）
+                        for path in self._wd_to_paths.pop(wd, ()):
+                            self._path_to_wd.pop(path, None)
+                    elif mask & (IN_DELETE_SELF | IN_MOVE_SELF):
+                        dirty.update(PathUtils.get_parent_directory(path) for path in paths)
+                    else:
+                        dirty.update(paths)
+        
+        return dirty
+    
+    def close(self):
+        """关闭监听"""
+        if self._fd >= 0:
+            os.close(self._fd)
+            self._fd = -1
+
+class PollingBackend:
+    """基于目录mtime轮询的监听（inotify不可用时的后备方案）"""
+    
+    def __init__(self):
+        self._signatures = {}
+        self._lock = threading.Lock()
+    
+    def add(self, path):
+        """监听目录"""
+        signature = self._get_signature(path)
+        with self._lock:
+            self._signatures[path] = signature
+    
+    def remove(self, path):
+        """取消监听目录"""
+        with self._lock:
+            self._signatures.pop(path, None)
+    
+    def paths(self):
+        """获取所有已监听的目录"""
+        with self._lock:
+            return list(self._signatures)
+    
+    def poll(self, timeout):
+        """等待timeout秒后比较所有目录的mtime，返回发生变化的目录路径集合"""
+        time.sleep(timeout)
+        
+        with self._lock:
+            watched = list(self._signatures.items())
+        
+        dirty = set()
+        for path, signature in watched:
+            current = self._get_signature(path)
+            if current != signature:
+                with self._lock:
+                    # 比较期间被取消监听或重新监听的目录以主线程的结果为准
+                    if self._signatures.get(path, current) == signature:
+                        self._signatures[path] = current
+                        dirty.add(path)
+        return dirty
+    
+    def close(self):
+        """关闭监听"""
+        with self._lock:
+            self._signatures.clear()
+    
+    def _get_signature(self, path):
+        """目录签名：(mtime, inode)，目录不存在时为None"""
+        try:
+            stat = os.stat(path)
+            return stat.st_mtime_ns, stat.st_ino
+        except OSError:
+            return None
+
+class FileSystemWatcher:
+    """
+    文件系统监听器，使已加载的文件树与磁盘保持同步
+    
+    后台线程只负责收集发生变化的目录，并在变化平息后（或累计超过max_delay秒）
+    合并为一次回调 on_changes(dirty_paths)。回调在后台线程中执行，
+    调用方应在持有文件树的线程（如Tk主线程）中调用 apply(dirty_paths)，
+    重新列出这些目录并按当前FilterEngine规则更新节点。
+    
+    只监听已加载的目录：按需加载的目录应在加载前调用 watch_directory；
+    lazy为True时新出现的目录也改为按需加载，加载时自动监听。
+    """
+    
+    def __init__(self, file_processor, root_node, on_changes, interval=0.5, max_delay=2.0,
+                 follow_symlinks=True, use_inotify=True, path_index=None, search_index=None,
+                 lazy=False):
+        self.file_processor = file_processor
+        self.root_node = root_node
+        self.base_path = root_node.path
+        self.on_changes = on_changes
+        self.interval = interval
+        self.max_delay = max_delay
+        self.follow_symlinks = follow_symlinks
+        self.use_inotify = use_inotify
+        self.path_index = path_index  # 文件树的路径索引（PathIndex），随节点增删同步更新
+        self.search_index = search_index  # 文件树的搜索索引（SearchIndex），同上
+        self.lazy = lazy
+        self.backend = None
+        self._retired = []  # 已被替换、等待监听线程关闭的后端
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._thread = None
+    
+    def start(self):
+        """开始监听"""
+        self.backend = self._create_backend()
+        for node, _ in self.root_node.walk(loaded_only=True):
+            if node.is_directory:
+                self._watch(node.path)
+        
+        self._stopped.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+    
+    def stop(self):
+        """停止监听"""
+        self._stopped.set()
+        if self._thread and self._thread is not threading.current_thread():
+            self._thread.join(timeout=self.interval * 2)
+        self._close_retired()
+        if self.backend:
+            self.backend.close()
+    
+    def watch_directory(self, node):
+        """
+        监听按需加载的目录，应在加载其子节点之前调用（先监听再列目录，避免遗漏期间的变化）
+        """
+        if self.backend is not None and node.is_directory and not self._stopped.is_set():
+            self._watch(node.path)
+    
+    def is_polling(self):
+        """是否使用轮询后备方案"""
+        return isinstance(self.backend, PollingBackend)
+    
+    def apply(self, dirty_paths):
+        """
+        将目录变化应用到文件树
+        
+        Args:
+            dirty_paths: 发生变化的目录路径集合
+        
+        Returns:
+            list: [(动作, 父节点, 节点), ...]，动作为 'added'、'removed' 或 'updated'
+        """
+        changes = []
+        # .gitignore可能已被修改，重新检查规则文件（未变化的规则文件复用已编译的结果）
+        self.file_processor.filter_engine.refresh_gitignore()
+        for path in sorted(dirty_paths):
+            node = self.find_node(path)
+            if node is not None and node.is_directory:
+                self._sync_directory(node, changes)
+        return changes
+    
+    def find_node(self, path):
+        """根据完整路径查找节点，不在树中时返回None"""
+        if self.path_index is not None:
+            return self.path_index.find(path)
+        if path == self.base_path:
+            return self.root_node
+        if not path.startswith(self.base_path.rstrip(os.sep) + os.sep):
+            return None
+        
+        node = self.root_node
+        rel_path = PathUtils.get_relative_path(self.base_path, path)
+        for name in rel_path.split(os.sep):
+            node = next((child for child in node.children if child.name == name), None)
+            if node is None:
+                return None
+        return node
+    
+    def _run(self):
+        """后台线程：收集变化的目录并合并回调"""
+        pending = set()
+        first_change = None
+        
+        while not self._stopped.is_set():
+            backend = self.backend
+            try:
+                dirty = backend.poll(self.interval)
+            except (OSError, ValueError):
+                if self.backend is backend:
+                    # 监听已关闭
+                    break
+                dirty = set()
+            
+            if self.backend is not backend:
+                # 主线程已切换后端，旧后端在此关闭（此时没有线程阻塞在其中）
+                self._close_retired()
+            
+            if dirty is None:
+                # 事件队列溢出，全量同步
+                dirty = set(self.backend.paths())
+            
+            if dirty:
+                pending.update(dirty)
+                if first_change is None:
+                    first_change = time.monotonic()
+            
+            quiet = not dirty
+            overdue = first_change is not None and time.monotonic() - first_change >= self.max_delay
+            if pending and (quiet or overdue) and not self._stopped.is_set():
+                self.on_changes(pending)
+                pending = set()
+                first_change = None
+    
+    def _create_backend(self):
+        """创建监听后端，inotify不可用时使用轮询"""
+        if self.use_inotify:
+            try:
+                return InotifyBackend()
+            except (OSError, AttributeError):
+                pass
+        return PollingBackend()
+    
+    def _watch(self, path):
+        """监听目录，inotify监听数达到系统上限时切换为轮询"""
+        try:
+            self.backend.add(path)
+        except OSError as e:
+            if e.errno == errno.ENOSPC and not self.is_polling():
+                print(f"inotify监听数已达上限，切换为轮询模式: {path}")
+                self._switch_to_polling()
+                self.backend.add(path)
+            elif e.errno != errno.ENOENT:
+                print(f"监听目录失败: {path}, 错误: {str(e)}")
+    
+    def _switch_to_polling(self):
+        """
+        将已监听的目录转移到轮询后端
+        
+        监听线程可能正阻塞在旧后端的poll中，因此旧后端不在调用方线程关闭，
+        而是交给监听线程在poll返回后关闭；监听线程未运行时直接关闭
+        """
+        old_backend = self.backend
+        polling = PollingBackend()
+        for watched_path in old_backend.paths():
+            polling.add(watched_path)
+        
+        with self._lock:
+            self.backend = polling
+            if self._thread is not None and self._thread.is_alive():
+                self._retired.append(old_backend)
+                old_backend = None
+        if old_backend is not None:
+            old_backend.close()
+    
+    def _close_retired(self):
+        """关闭已被替换的后端"""
+        with self._lock:
+            retired, self._retired = self._retired, []
+        for backend in retired:
+            backend.close()
+    
+    def _sync_directory(self, node, changes):
+        """重新列出目录，与现有子节点比较并更新"""
+        listing = self.file_processor._list_directory(node.path, self.base_path, self.follow_symlinks)
+        existing = {child.name: child for child in node.children}
+        seen = set()
+        
+        for name, path, is_directory, size, descend in listing:
+            seen.add(name)
+            child = existing.get(name)
+            
+            if child is not None and child.is_directory == is_directory:
+                if child.size != size:
+                    child.size = size
+                    changes.append(('updated', node, child))
+                continue
+            
+            # 新增的条目，或类型发生变化的条目（先移除旧节点）
+            if child is not None:
+                self._remove_node(node, child, changes)
+            
+            new_node = TreeNode(name, path, is_directory=is_directory)
+            new_node.size = size
+            node.add_child(new_node)
+            if descend:
+                self._scan_new_directory(new_node)
+            if self.path_index is not None:
+                self.path_index.add(new_node)
+            if self.search_index is not None:
+                self.search_index.add(new_node)
+            changes.append(('added', node, new_node))
+        
+        for name, child in existing.items():
+            if name not in seen:
+                self._remove_node(node, child, changes)
+        
+        if node.children:
+            node.children.sort(key=lambda child: child.name)
+    
+    def _scan_new_directory(self, dir_node):
+        """扫描新出现的目录子树（先监听再列目录，避免遗漏期间的变化），按需加载模式下只挂接加载函数"""
+        if self.lazy:
+            dir_node.loader = self._load_new_directory
+            return
+        
+        stack = [dir_node]
+        while stack:
+            current = stack.pop()
+            self._watch(current.path)
+            for name, path, is_directory, size, descend in self.file_processor._list_directory(
+                    current.path, self.base_path, self.follow_symlinks):
+                node = TreeNode(name, path, is_directory=is_directory)
+                node.size = size
+                current.add_child(node)
+                if descend:
+                    stack.append(node)
+    
+    def _load_new_directory(self, dir_node):
+        """新出现目录的按需加载函数：监听后列出子节点，子目录同样按需加载"""
+        self.watch_directory(dir_node)
+        for name, path, is_directory, size, descend in self.file_processor._list_directory(
+                dir_node.path, self.base_path, self.follow_symlinks):
+            node = TreeNode(name, path, is_directory=is_directory)
+            node.size = size
+            if descend:
+                node.loader = self._load_new_directory
+            dir_node.add_child(node)
+    
+    def _remove_node(self, parent_node, node, changes):
+        """移除节点并取消其子树中目录的监听"""
+        parent_node.remove_child(node)
+        if self.path_index is not None:
+            self.path_index.remove(node)
+        if self.search_index is not None:
+            self.search_index.remove(node)
+        for current, _ in node.walk(loaded_only=True):
+            if current.is_directory:
+                self.backend.remove(current.path)
+        changes.append(('removed', parent_node, node))
@@ -0,0 +1,183 @@
+"""
+git索引文件解析
+"""
+
+import os
+import re
+import struct
+from utils.utils import Utils
+
+# 索引条目的文件类型
+MODE_TYPE_MASK = 0o170000
+MODE_DIRECTORY = 0o040000  # 稀疏索引中的目录条目
+MODE_GITLINK = 0o160000  # 子模块
+
+FLAG_EXTENDED = 0x4000
+FLAG_SKIP_WORKTREE = 0x4000  # 扩展标志：稀疏检出时不在工作区中
+
+class GitIndex:
+    """
+    git索引文件（.git/index）的纯Python解析器，无需git命令
+    
+    支持索引版本2、3、4（版本4的路径前缀压缩）以及SHA-256仓库。
+    只读取路径、文件模式和大小，不校验文件末尾的校验和。
+    """
+    
+    SIGNATURE = b'DIRC'
+    HEADER = struct.Struct('>4sII')
+    MODE_AND_SIZE = struct.Struct('>I8xI')  # 条目偏移24处的mode，以及偏移36处的size
+    FLAGS = struct.Struct('>H')
+    
+    def __init__(self, index_path, hash_size=20):
+        self.index_path = index_path
+        self.hash_size = hash_size
+        self.version = None
+    
+    @staticmethod
+    def find_repository(project_path):
+        """
+        查找工程所在的git仓库
+        
+        Returns:
+            tuple: (git目录, 工作区根目录)，不在仓库中时返回 (None, None)
+        """
+        path = project_path
+        while True:
+            dot_git = os.path.join(path, '.git')
+            if os.path.isdir(dot_git):
+                return dot_git, path
+            if os.path.isfile(dot_git):
+                # 工作树或子模块：.git文件中记录实际的git目录
+                content = Utils.read_file_content(dot_git).strip()
+                if content.startswith('gitdir:'):
+                    git_dir = os.path.join(path, content[len('gitdir:'):].strip())
+                    return os.path.normpath(git_dir), path
+            
+            parent = os.path.dirname(path)
+            if parent == path:
+                return None, None
+            path = parent
+    
+    @classmethod
+    def open(cls, project_path):
+        """打开工程所在仓库的索引，返回 (GitIndex, 工程相对于工作区根目录的路径)"""
+        git_dir, work_tree = cls.find_repository(project_path)
+        if git_dir is None:
+            raise ValueError(f"未找到git仓库: {project_path}")
+        
+        config = os.path.join(git_dir, 'config')
+        hash_size = 20
+        if os.path.exists(config) and re.search(r'objectformat\s*=\s*sha256',
+                                                Utils.read_file_content(config), re.IGNORECASE):
+            hash_size = 32
+        
+        index_path = os.path.join(git_dir, 'index')
+        if not os.path.exists(index_path):
+            raise ValueError(f"未找到git索引文件: {index_path}")
+        
+        prefix = os.path.relpath(project_path, work_tree)
+        return cls(index_path, hash_size), "" if prefix == os.curdir else prefix
+    
+    def read_entries(self):
+        """
+        读取索引中的条目
+        
+        Returns:
+            list: 按路径排序的 (路径字节串, 文件模式, 大小) 列表。
+                合并冲突的多个暂存阶段只保留一条，稀疏检出时不在工作区的条目被跳过
+        """
+        with open(self.index_path, 'rb') as f:
+            data = f.read()
+        
+        if len(data) < self.HEADER.size:
+            raise ValueError(f"git索引文件不完整: {self.index_path}")
+        signature, version, count = self.HEADER.unpack_from(data, 0)
+        if signature != self.SIGNATURE:
+            raise ValueError(f"不是有效的git索引文件: {self.index_path}")
+        if version not in (2, 3, 4):
+            raise ValueError(f"不支持的git索引版本: {version}")
+        self.version = version
+        
+        entries = []
+        flags_offset = 40 + self.hash_size
+        previous = b''
+        pos = self.HEADER.size
+        
+        for _ in range(count):
+            start = pos
+            mode, size = self.MODE_AND_SIZE.unpack_from(data, pos + 24)
+            flags, = self.FLAGS.unpack_from(data, pos + flags_offset)
+            pos += flags_offset + 2
+            
+            skip_worktree = False
+            if version >= 3 and flags & FLAG_EXTENDED:
+                extended, = self.FLAGS.unpack_from(data, pos)
+                skip_worktree = bool(extended & FLAG_SKIP_WORKTREE)
+                pos += 2
+            
+            if version == 4:
+                # 路径前缀压缩：先去掉上一条路径末尾的若干字节，再追加本条的后缀
+                strip, pos = self._read_varint(data, pos)
+                end = data.index(b'\0', pos)
+                path = previous[:len(previous) - strip] + data[pos:end]
+                pos = end + 1
+            else:
+                # 条目以NUL填充到8字节的整数倍
+                end = data.index(b'\0', pos)
+                path = data[pos:end]
+                pos = start + ((end - start + 8) & ~7)
+            
+            if path == previous:
+                continue
+            previous = path
+            if skip_worktree or mode & MODE_TYPE_MASK == MODE_DIRECTORY:
+                continue
+            entries.append((path, mode, size))
+        
+        return entries
+    
+    def _read_varint(self, data, pos):
+        """读取git的变长整数编码（版本4索引的路径前缀长度）"""
+        byte = data[pos]
+        pos += 1
+        value = byte & 0x7f
+        while byte & 0x80:
+            byte = data[pos]
+            pos += 1
+            value = ((value + 1) << 7) | (byte & 0x7f)
+        return value, pos
+    
+    def build_tree(self, prefix=""):
+        """
+        将索引条目构建为嵌套字典
+        
+        Args:
+            prefix: 只取该子目录（相对于工作区根目录）下的条目
+        
+        Returns:
+            dict: 名称 -> 子目录字典，或文件的 (文件模式, 大小)
+        """
+        root = {}
+        directories = {"": root}
+        prefix_bytes = os.fsencode(prefix.replace(os.sep, '/')) + b'/' if prefix else b''
+        
+        for path, mode, size in self.read_entries():
+            if prefix_bytes:
+                if not path.startswith(prefix_bytes):
+                    continue
+                path = path[len(prefix_bytes):]
+            path = os.fsdecode(path)
+            
+            dir_name, _, name = path.rpartition('/')
+            directory = directories.get(dir_name)
+            if directory is None:
+                directory = root
+                for part in dir_name.split('/'):
+                    child = directory.get(part)
+                    if not isinstance(child, dict):
+                        child = directory[part] = {}
+                    directory = child
+                directories[dir_name] = directory
+            directory[name] = (mode, size)
+        
+        return root
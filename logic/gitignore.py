@@ -0,0 +1,264 @@
+"""
+.gitignore 规则解析与匹配
+"""
+
+import os
+import re
+
+SEP = re.escape(os.sep)
+NOT_SEP = f'[^{SEP}]'
+
+# 字符集中支持的POSIX字符类
+POSIX_CLASSES = {
+    'alnum': 'a-zA-Z0-9',
+    'alpha': 'a-zA-Z',
+    'digit': '0-9',
+    'lower': 'a-z',
+    'upper': 'A-Z',
+    'space': r'\s',
+    'xdigit': '0-9a-fA-F',
+}
+
+def parse_gitignore(content):
+    """解析.gitignore内容，返回有效的模式行（去掉注释、空行和未转义的行尾空格）"""
+    patterns = []
+    for line in content.splitlines():
+        if not line or line.startswith('#'):
+            continue
+        stripped = line.rstrip(' ')
+        if stripped != line and stripped.endswith('\\'):
+            # "\ " 转义的行尾空格保留
+            stripped += ' '
+        if stripped:
+            patterns.append(stripped)
+    return patterns
+
+def translate_gitignore(pattern):
+    """
+    将一条.gitignore模式转换为正则表达式
+    
+    Returns:
+        tuple: (正则源码, 是否否定, 是否只匹配目录, 是否按路径匹配)，空模式返回None。
+        不含/的模式只匹配文件名，其余模式匹配相对于.gitignore所在目录的路径
+    """
+    negate = pattern.startswith('!')
+    if negate:
+        pattern = pattern[1:]
+    
+    dir_only = pattern.endswith('/')
+    if dir_only:
+        pattern = pattern[:-1]
+    
+    anchored = '/' in pattern
+    if pattern.startswith('/'):
+        pattern = pattern[1:]
+    if not pattern:
+        return None
+    
+    # 按/拆分处理 **：开头匹配任意层目录，结尾匹配目录下的所有内容，中间匹配零或多层目录
+    segments = pattern.split('/')
+    # 连续的 ** 等价于一个
+    segments = [segment for i, segment in enumerate(segments)
+                if segment != '**' or i == 0 or segments[i - 1] != '**']
+    regex = ''
+    need_sep = False
+    for i, segment in enumerate(segments):
+        if segment == '**':
+            if i == len(segments) - 1:
+                regex += f'{SEP}.*' if i else '.*'
+            else:
+                regex += f'{SEP}(?:.*{SEP})?' if i else f'(?:.*{SEP})?'
+            need_sep = False
+            continue
+        if need_sep:
+            regex += SEP
+        regex += _translate_segment(segment)
+        need_sep = True
+    
+    return regex, negate, dir_only, anchored
+
+def _translate_segment(segment):
+    """转换路径中的一段（*和?不匹配路径分隔符）"""
+    result = []
+    i, n = 0, len(segment)
+    while i < n:
+        c = segment[i]
+        i += 1
+        if c == '\\' and i < n:
+            result.append(re.escape(segment[i]))
+            i += 1
+        elif c == '*':
+            # 段内连续的*等价于一个
+            if not result or result[-1] != f'{NOT_SEP}*':
+                result.append(f'{NOT_SEP}*')
+        elif c == '?':
+            result.append(NOT_SEP)
+        elif c == '[':
+            end = _find_bracket_end(segment, i)
+            if end < 0:
+                result.append(re.escape(c))
+            else:
+                result.append(_translate_bracket(segment[i:end]))
+                i = end + 1
+        else:
+            result.append(re.escape(c))
+    return ''.join(result)
+
+def _find_bracket_end(segment, start):
+    """查找字符集的结束位置，未闭合时返回-1"""
+    j = start
+    if j < len(segment) and segment[j] in '!^':
+        j += 1
+    if j < len(segment) and segment[j] == ']':
+        j += 1
+    while j < len(segment) and segment[j] != ']':
+        if segment.startswith('[:', j):
+            close = segment.find(':]', j + 2)
+            if close >= 0:
+                j = close + 2
+                continue
+        if segment[j] == '\\':
+            j += 1
+        j += 1
+    return j if j < len(segment) else -1
+
+def _translate_bracket(body):
+    """转换字符集内容（不含方括号），支持 !/^ 取反、区间和POSIX字符类"""
+    negate = body[:1] in ('!', '^')
+    if negate:
+        body = body[1:]
+    
+    items = []
+    k = 0
+    while k < len(body):
+        if body.startswith('[:', k):
+            close = body.find(':]', k + 2)
+            if close >= 0:
+                items.append(POSIX_CLASSES.get(body[k + 2:close], ''))
+                k = close + 2
+                continue
+        
+        c = body[k]
+        if c == '\\' and k + 1 < len(body):
+            k += 1
+            c = body[k]
+        if k + 2 < len(body) and body[k + 1] == '-':
+            end = body[k + 2]
+            if c <= end:
+                items.append(f'{re.escape(c)}-{re.escape(end)}')
+            k += 3
+            continue
+        items.append(re.escape(c))
+        k += 1
+    
+    chars = ''.join(items)
+    if negate:
+        return f'[^{chars}{SEP}]'
+    return f'[{chars}]' if chars else '(?!)'
+
+class GitignoreRules:
+    """
+    单个.gitignore文件编译后的规则集
+    
+    规则按类型合并为组合正则：文件名规则匹配条目名称，路径规则匹配相对路径；
+    只匹配目录的规则只用于目录。组合正则中规则按倒序排列，
+    第一个匹配的分支即为文件中最后一条命中的规则（最后命中者生效）。
+    """
+    
+    def __init__(self, patterns, signature=None):
+        self.patterns = []  # 有效的模式行
+        self.negated = []  # 每条规则是否为否定规则
+        self.signature = signature  # 来源文件的 (mtime_ns, 大小)，用于缓存校验
+        
+        name_rules = {True: [], False: []}
+        path_rules = {True: [], False: []}
+        for pattern in patterns:
+            translated = translate_gitignore(pattern)
+            if translated is None:
+                continue
+            regex, negate, dir_only, anchored = translated
+            try:
+                re.compile(regex)
+            except re.error:
+                print(f"忽略无效的.gitignore规则: {pattern}")
+                continue
+            
+            index = len(self.patterns)
+            self.patterns.append(pattern)
+            self.negated.append(negate)
+            rules = path_rules if anchored else name_rules
+            rules[True].append((index, regex))
+            if not dir_only:
+                rules[False].append((index, regex))
+        
+        # 按是否目录分别编译：(文件名正则, 文件名规则序号, 路径正则, 路径规则序号)
+        self._compiled = {
+            is_directory: self._compile(name_rules[is_directory]) + self._compile(path_rules[is_directory])
+            for is_directory in (True, False)
+        }
+    
+    def _compile(self, rules):
+        """将规则倒序合并为一个正则，每条规则一个捕获组"""
+        if not rules:
+            return None, []
+        rules = rules[::-1]
+        regex = re.compile('(?s:' + '|'.join(f'({source})' for _, source in rules) + ')')
+        return regex, [index for index, _ in rules]
+    
+    def match(self, rel_path, name, is_directory):
+        """
+        匹配条目
+        
+        Args:
+            rel_path: 相对于.gitignore所在目录的路径
+            name: 条目名称
+            is_directory: 是否为目录
+        
+        Returns:
+            bool: 最后命中的规则为普通规则时返回True（忽略），为否定规则时返回False；
+                没有规则命中时返回None
+        """
+        name_regex, name_indexes, path_regex, path_indexes = self._compiled[is_directory]
+        best = -1
+        if name_regex is not None:
+            match = name_regex.fullmatch(name)
+            if match:
+                best = name_indexes[match.lastindex - 1]
+        if path_regex is not None:
+            match = path_regex.fullmatch(rel_path)
+            if match:
+                best = max(best, path_indexes[match.lastindex - 1])
+        
+        if best < 0:
+            return None
+        return not self.negated[best]
+
+class GitignoreMatcher:
+    """
+    某个目录下生效的.gitignore规则链
+    
+    每个含.gitignore的目录创建一个匹配器并链接到上级目录的匹配器，
+    没有.gitignore的目录直接沿用上级的匹配器，不重复解析。
+    匹配时从最深的规则集开始，第一个有规则命中的规则集决定结果。
+    """
+    
+    def __init__(self, rules, base_dir="", parent=None):
+        self.rules = rules
+        self.base_dir = base_dir  # 规则所在目录相对于工程根目录的路径
+        self.parent = parent
+        self._offset = len(base_dir) + 1 if base_dir else 0
+        
+        # 规则链标识，规则文件变化时随之变化（用于增量扫描缓存校验）
+        parent_token = parent.token if parent else ""
+        self.token = f"{parent_token}|{base_dir}:{rules.signature}"
+    
+    def is_ignored(self, rel_path, is_directory):
+        """判断相对于工程根目录的路径是否被忽略"""
+        name = rel_path[rel_path.rfind(os.sep) + 1:]
+        matcher = self
+        while matcher is not None:
+            result = matcher.rules.match(rel_path[matcher._offset:], name, is_directory)
+            if result is not None:
+                return result
+            matcher = matcher.parent
+        return False
@@ -0,0 +1,77 @@
+"""
+包含条件（白名单）匹配
+"""
+
+import re
+from logic.gitignore import SEP, translate_gitignore
+
+class IncludeMatcher:
+    """
+    编译后的包含条件，语法与.gitignore相同（不支持否定模式）
+    
+    不含/的模式匹配任意层级的名称，含/的模式匹配相对于工程根目录的路径；
+    模式匹配到目录时包含该目录下的所有内容。
+    
+    对于含/的模式，还根据其前几级路径静态判断目录下是否可能存在匹配，
+    例如 services/*/api/ 只可能出现在 services 和 services/* 下，其余目录在扫描时直接跳过。
+    """
+    
+    def __init__(self, patterns=()):
+        self.patterns = []  # 有效的模式
+        self.match_anywhere = False  # 存在不含/的模式时，任意目录下都可能有匹配
+        
+        included = []  # 条目本身或其上级目录匹配
+        directories = []  # 目录本身匹配（含只匹配目录的模式）
+        prefixes = []  # 含/的模式的前几级路径
+        for pattern in patterns:
+            pattern = pattern.strip()
+            if pattern.startswith('!'):
+                print(f"包含条件不支持否定模式，已忽略: {pattern}")
+                continue
+            translated = translate_gitignore(pattern) if pattern else None
+            if translated is None:
+                continue
+            regex, _, dir_only, anchored = translated
+            try:
+                re.compile(regex)
+            except re.error:
+                print(f"忽略无效的包含条件: {pattern}")
+                continue
+            
+            self.patterns.append(pattern)
+            lead = '' if anchored else f'(?:.*{SEP})?'
+            included.append(f'{lead}{regex}{SEP}.*' if dir_only else f'{lead}{regex}(?:{SEP}.*)?')
+            directories.append(f'{lead}{regex}(?:{SEP}.*)?')
+            
+            if not anchored:
+                self.match_anywhere = True
+                continue
+            segments = pattern.strip('/').split('/')
+            for i in range(1, len(segments)):
+                prefixes.append(translate_gitignore('/' + '/'.join(segments[:i]))[0])
+        
+        self._included_regex = self._compile(included)
+        self._directory_regex = self._compile(directories)
+        self._prefix_regex = self._compile(prefixes)
+    
+    def _compile(self, alternatives):
+        """合并为一个组合正则，没有模式时返回None"""
+        if not alternatives:
+            return None
+        return re.compile('(?s:' + '|'.join(f'(?:{source})' for source in alternatives) + ')')
+    
+    def includes(self, rel_path, is_directory):
+        """
+        判断扫描到的条目是否保留
+        
+        文件只在本身或上级目录匹配时保留；目录只要其下可能存在匹配就保留（需要继续扫描）。
+        """
+        if not is_directory:
+            return self._included_regex is not None and self._included_regex.fullmatch(rel_path) is not None
+        if self.match_anywhere or self.matches_directory(rel_path):
+            return True
+        return self._prefix_regex is not None and self._prefix_regex.fullmatch(rel_path) is not None
+    
+    def matches_directory(self, rel_dir):
+        """目录本身（或其上级目录）是否匹配，匹配时其下所有内容都被包含"""
+        return self._directory_regex is not None and self._directory_regex.fullmatch(rel_dir) is not None
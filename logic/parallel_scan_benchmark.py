@@ -0,0 +1,122 @@
+"""
+多线程并行扫描的加速比
+
+在临时目录中创建合成目录树（或使用指定目录），分别以顺序扫描和不同线程数（workers）扫描，
+每项执行多次取最短时间，给出相对顺序扫描的加速比，并检查结果与顺序扫描完全一致。
+本地磁盘在缓存命中时列目录主要消耗CPU，线程受GIL限制，加速有限；
+--latency 为每次列目录附加固定的等待时间，模拟网络文件系统或冷缓存下以I/O等待为主的情况。
+多进程分片扫描（processes）在子进程中列目录，不附加等待，只在等待为0时给出。
+
+用法:
+    python -m logic.parallel_scan_benchmark
+    python -m logic.parallel_scan_benchmark --workers 1 4 16 64 --latency 0 5
+    python -m logic.parallel_scan_benchmark --path /mnt/nfs/project --latency 0
+"""
+
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+from logic.file_processor import FileProcessor
+
+class LatencyFileProcessor(FileProcessor):
+    """每次列目录前等待固定时间的处理器（模拟I/O延迟，等待期间释放GIL）"""
+    
+    def __init__(self, latency):
+        super().__init__()
+        self.latency = latency
+    
+    def _list_directory(self, current_path, base_path, follow_symlinks=True):
+        if self.latency:
+            time.sleep(self.latency)
+        return super()._list_directory(current_path, base_path, follow_symlinks)
+
+def create_tree(base, depth, fanout, files):
+    """在base下创建每级fanout个子目录、每个目录files个文件的目录树"""
+    level = [base]
+    for d in range(depth + 1):
+        next_level = []
+        for directory in level:
+            for i in range(files):
+                with open(os.path.join(directory, f"file_{i}.py"), 'w') as f:
+                    f.write('x' * i)
+            if d < depth:
+                for i in range(fanout):
+                    path = os.path.join(directory, f"dir_{i}")
+                    os.mkdir(path)
+                    next_level.append(path)
+        level = next_level
+
+def tree_signature(root):
+    """文件树的先序遍历签名，用于检查并行扫描结果与顺序扫描一致"""
+    return [(node.path, node.is_directory, node.size) for node, _ in root.walk()]
+
+def best_scan(path, latency, repeat, **options):
+    """
+    扫描repeat次
+    
+    Returns:
+        tuple: (最短耗时秒数, 根节点)
+    """
+    best = None
+    root = None
+    for _ in range(repeat):
+        processor = LatencyFileProcessor(latency)
+        start = time.perf_counter()
+        root = processor.scan_directory(path, [], False, **options)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, root
+
+def run(path, workers_list, latency, repeat, processes):
+    """以各线程数扫描并打印结果"""
+    serial, serial_root = best_scan(path, latency, repeat)
+    expected = tree_signature(serial_root)
+    print(f"列目录附加等待 {latency * 1000:.1f} ms，{serial_root.node_count} 个节点"
+          f"（{serial_root.dir_count} 个目录）")
+    print(f"  {'顺序扫描':<14} {serial:8.3f}s")
+    
+    rows = [(f"workers={workers}", {'workers': workers}) for workers in workers_list if workers > 1]
+    if not latency and processes > 1:
+        rows.append((f"processes={processes}", {'processes': processes}))
+    for label, options in rows:
+        elapsed, root = best_scan(path, latency, repeat, **options)
+        same = "一致" if tree_signature(root) == expected else "不一致"
+        print(f"  {label:<14} {elapsed:8.3f}s  加速 {serial / elapsed:5.2f}x  结果{same}")
+
+def parse_args(argv=None):
+    """解析命令行参数"""
+    parser = argparse.ArgumentParser(prog="python -m logic.parallel_scan_benchmark",
+                                     description="测量多线程并行扫描相对顺序扫描的加速比")
+    parser.add_argument('--path', help="扫描实际目录（默认在临时目录中创建合成目录树）")
+    parser.add_argument('--depth', type=int, default=3, help="合成目录树的层数")
+    parser.add_argument('--fanout', type=int, default=8, help="合成目录树每级的子目录数")
+    parser.add_argument('--files', type=int, default=20, help="合成目录树每个目录的文件数")
+    parser.add_argument('--workers', type=int, nargs='+', default=[2, 4, 8, 16, 32], help="线程数，可指定多个")
+    parser.add_argument('--latency', type=float, nargs='+', default=[0.0, 2.0],
+                        help="每次列目录附加的等待毫秒数，可指定多个")
+    parser.add_argument('--processes', type=int, default=os.cpu_count() or 1,
+                        help="多进程分片扫描的进程数，1表示跳过")
+    parser.add_argument('--repeat', type=int, default=3, help="每项的执行次数")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    """命令行入口"""
+    args = parse_args(argv)
+    base = None if args.path else tempfile.mkdtemp(prefix="parallel_scan_")
+    path = args.path or os.path.join(base, "project")
+    try:
+        if base:
+            os.mkdir(path)
+            create_tree(path, args.depth, args.fanout, args.files)
+        for latency in args.latency:
+            run(os.path.abspath(path), args.workers, latency / 1000, args.repeat, args.processes)
+    finally:
+        if base:
+            shutil.rmtree(base)
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
\ No newline at end of file
@@ -0,0 +1,122 @@
+"""
+路径列表批量过滤的内存占用与吞吐量
+
+在子进程中运行 python -m logic.path_filter_cli，当前进程边生成合成路径边写入其标准输入（不落盘），
+输出丢弃，通过 os.wait4 取得子进程的峰值常驻内存（ru_maxrss）。
+输入路径数成倍增加时，流式过滤的峰值内存应基本不变；作为对照，
+另以一次读入全部路径再调用 FilterEngine.filter_file_list 的方式过滤同样的输入。
+依赖 os.wait4，仅支持类Unix系统。
+
+用法:
+    python -m logic.path_filter_benchmark
+    python -m logic.path_filter_benchmark --paths 100000 1000000 5000000 -0
+    python -m logic.path_filter_benchmark --no-compare
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import time
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BASE_PATH = "/bench/project"
+PATTERNS = ["*.pyc", "node_modules/", "__pycache__/"]
+
+# 对照：一次读入全部路径后过滤
+IN_MEMORY_SCRIPT = """
+import os, sys
+from logic.filter_engine import FilterEngine
+base_path, separator, patterns = sys.argv[1], b'\\0' if sys.argv[2] == 'nul' else b'\\n', sys.argv[3:]
+filter_engine = FilterEngine()
+filter_engine.set_filter_patterns(patterns)
+paths = [os.fsdecode(path) for path in sys.stdin.buffer.read().split(separator) if path]
+kept = filter_engine.filter_file_list(paths, base_path)
+sys.stdout.buffer.write(b''.join(os.fsencode(path) + separator for path in kept))
+"""
+
+def generate_paths(count, separator, block_size=10000):
+    """按块产出合成路径（字节串），约1/7位于node_modules下，约1/11为.pyc文件"""
+    block = []
+    for i in range(count):
+        if i % 7 == 0:
+            path = f"{BASE_PATH}/web/node_modules/pkg_{i % 389}/lib/index_{i}.js"
+        elif i % 11 == 0:
+            path = f"{BASE_PATH}/pkg_{i % 97}/__pycache__/mod_{i}.cpython-311.pyc"
+        else:
+            path = f"{BASE_PATH}/pkg_{i % 97}/mod_{i % 1013}/file_{i}.py"
+        block.append(path.encode())
+        if len(block) >= block_size:
+            yield separator.join(block) + separator
+            block = []
+    if block:
+        yield separator.join(block) + separator
+
+def run_child(command, count, separator):
+    """
+    运行子进程并写入count个路径
+    
+    Returns:
+        tuple: (耗时秒数, 峰值常驻内存字节数)
+    """
+    start = time.perf_counter()
+    process = subprocess.Popen(command, stdin=subprocess.PIPE, stdout=subprocess.DEVNULL, cwd=REPO_ROOT)
+    try:
+        for block in generate_paths(count, separator):
+            process.stdin.write(block)
+        process.stdin.close()
+    except BrokenPipeError:
+        pass
+    _, status, usage = os.wait4(process.pid, 0)
+    process.returncode = os.waitstatus_to_exitcode(status)
+    elapsed = time.perf_counter() - start
+    if process.returncode != 0:
+        raise RuntimeError(f"子进程退出码 {process.returncode}: {' '.join(command)}")
+    # Linux上ru_maxrss以KB为单位，macOS上以字节为单位
+    max_rss = usage.ru_maxrss if sys.platform == 'darwin' else usage.ru_maxrss * 1024
+    return elapsed, max_rss
+
+def streaming_command(null):
+    """流式过滤（命令行工具）的子进程命令"""
+    command = [sys.executable, "-m", "logic.path_filter_cli", "-b", BASE_PATH]
+    for pattern in PATTERNS:
+        command += ["-e", pattern]
+    if null:
+        command.append("-0")
+    return command
+
+def in_memory_command(null):
+    """一次读入全部路径的对照子进程命令"""
+    return [sys.executable, "-c", IN_MEMORY_SCRIPT, BASE_PATH, "nul" if null else "newline"] + PATTERNS
+
+def parse_args(argv=None):
+    """解析命令行参数"""
+    parser = argparse.ArgumentParser(prog="python -m logic.path_filter_benchmark",
+                                     description="测量批量路径过滤在不同输入规模下的峰值内存和吞吐量")
+    parser.add_argument('--paths', type=int, nargs='+', default=[100000, 500000, 2000000],
+                        help="输入路径数，可指定多个")
+    parser.add_argument('-0', '--null', action='store_true', help="路径以NUL分隔")
+    parser.add_argument('--no-compare', action='store_true', help="不运行一次读入全部路径的对照")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    """命令行入口"""
+    args = parse_args(argv)
+    if not hasattr(os, 'wait4'):
+        print("当前系统不支持 os.wait4，无法测量子进程的峰值内存")
+        return 1
+    
+    separator = b'\0' if args.null else b'\n'
+    print(f"过滤条件: {' '.join(PATTERNS)}，分隔符: {'NUL' if args.null else '换行'}")
+    for count in args.paths:
+        elapsed, max_rss = run_child(streaming_command(args.null), count, separator)
+        line = (f"  {count:>10} 个路径  流式 {max_rss / 1e6:7.1f} MB {elapsed:7.2f}s "
+                f"({count / elapsed / 1e6:.2f} M路径/秒)")
+        if not args.no_compare:
+            elapsed, max_rss = run_child(in_memory_command(args.null), count, separator)
+            line += f"  一次读入 {max_rss / 1e6:7.1f} MB {elapsed:7.2f}s"
+        print(line)
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
\ No newline at end of file
@@ -0,0 +1,131 @@
+"""
+路径列表批量过滤命令行工具
+
+从文件或标准输入读取以换行或NUL分隔的路径（如 find -print0 的输出），
+按过滤条件分批过滤后输出未被排除的路径，内存占用与输入大小无关。
+
+用法:
+    find . -print0 | python -m logic.path_filter_cli -0 -e "*.pyc" -e "node_modules/"
+    python -m logic.path_filter_cli -f patterns.txt paths.txt > kept.txt
+"""
+
+import argparse
+import os
+import sys
+from logic.filter_engine import FilterEngine
+from utils.utils import Utils
+
+CHUNK_SIZE = 1 << 20  # 每次读取的字节数，每块中的完整路径作为一批
+
+def read_path_batches(stream, separator=b'\n', chunk_size=CHUNK_SIZE):
+    """
+    按块读取以分隔符分隔的路径，逐批产出
+    
+    Args:
+        stream: 二进制输入流
+        separator: 路径分隔符
+        chunk_size: 每次读取的字节数
+    
+    Yields:
+        list: 一个块中的完整路径（字节串），跨块的路径留到下一批
+    """
+    pending = b''
+    while True:
+        chunk = stream.read(chunk_size)
+        if not chunk:
+            break
+        chunk = pending + chunk
+        end = chunk.rfind(separator)
+        if end < 0:
+            pending = chunk
+            continue
+        pending = chunk[end + 1:]
+        yield [path for path in chunk[:end].split(separator) if path]
+    
+    if pending:
+        yield [pending]
+
+def load_patterns(file_path):
+    """读取过滤条件文件（每行一个，忽略注释和空行）"""
+    patterns = []
+    for line in Utils.read_file_content(file_path).splitlines():
+        line = line.strip()
+        if line and not line.startswith('#'):
+            patterns.append(line)
+    return patterns
+
+def filter_stream(filter_engine, input_stream, output_stream, base_path, separator=b'\n',
+                  chunk_size=CHUNK_SIZE):
+    """
+    过滤输入流中的路径并写入输出流，输出使用与输入相同的分隔符
+    
+    Returns:
+        tuple: (读取的路径数, 输出的路径数)
+    """
+    total = 0
+    kept = 0
+    for batch in read_path_batches(input_stream, separator, chunk_size):
+        # 按文件系统编码解码，无法解码的字节原样保留，输出时可还原
+        paths = filter_engine.filter_path_batch([os.fsdecode(path) for path in batch], base_path)
+        total += len(batch)
+        kept += len(paths)
+        if paths:
+            output_stream.write(separator.join(os.fsencode(path) for path in paths) + separator)
+    output_stream.flush()
+    return total, kept
+
+def parse_args(argv=None):
+    """解析命令行参数"""
+    parser = argparse.ArgumentParser(
+        prog="python -m logic.path_filter_cli",
+        description="按过滤条件批量过滤路径列表，输出未被排除的路径"
+    )
+    parser.add_argument('input', nargs='?', default='-', help="路径列表文件，默认从标准输入读取")
+    parser.add_argument('-0', '--null', action='store_true', help="路径以NUL分隔（如 find -print0 的输出）")
+    parser.add_argument('-e', '--exclude', action='append', default=[], metavar='PATTERN',
+                        help="过滤条件，可重复指定")
+    parser.add_argument('-f', '--exclude-from', action='append', default=[], metavar='FILE',
+                        help="从文件读取过滤条件（每行一个）")
+    parser.add_argument('-i', '--include', action='append', default=[], metavar='PATTERN',
+                        help="包含条件（语法同.gitignore），只输出匹配的路径，可重复指定")
+    parser.add_argument('-b', '--base', default=os.curdir, help="计算相对路径的基准目录，默认为当前目录")
+    parser.add_argument('--gitignore', action='store_true', help="同时应用基准目录下各级.gitignore的规则")
+    parser.add_argument('-s', '--stats', action='store_true', help="结束后在标准错误输出中打印统计信息")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    """命令行入口"""
+    args = parse_args(argv)
+    
+    patterns = list(args.exclude)
+    for file_path in args.exclude_from:
+        if not os.path.isfile(file_path):
+            print(f"过滤条件文件不存在: {file_path}", file=sys.stderr)
+            return 2
+        patterns.extend(load_patterns(file_path))
+    
+    filter_engine = FilterEngine()
+    filter_engine.set_filter_patterns(patterns)
+    filter_engine.set_include_patterns(args.include)
+    if args.gitignore:
+        filter_engine.set_gitignore_root(os.path.abspath(args.base))
+    
+    separator = b'\0' if args.null else b'\n'
+    input_stream = sys.stdin.buffer if args.input == '-' else open(args.input, 'rb')
+    try:
+        total, kept = filter_stream(filter_engine, input_stream, sys.stdout.buffer, args.base, separator)
+    except BrokenPipeError:
+        # 下游提前关闭（如 | head），将标准输出重定向到空设备，避免退出时再次报错
+        devnull = os.open(os.devnull, os.O_WRONLY)
+        os.dup2(devnull, sys.stdout.fileno())
+        return 1
+    finally:
+        if input_stream is not sys.stdin.buffer:
+            input_stream.close()
+    
+    if args.stats:
+        print(f"读取 {total} 个路径，输出 {kept} 个，排除 {total - kept} 个", file=sys.stderr)
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
\ No newline at end of file
@@ -0,0 +1,221 @@
+"""
+过滤模式编译与匹配
+"""
+
+import os
+import re
+
+# fnmatch匹配前会对模式和路径调用normcase（Windows下转为小写并将/转为\）
+SEP = os.path.normcase('/')
+NEEDS_NORMCASE = os.path.normcase('Aa/') != 'Aa/'
+GLOB_CHARS = frozenset('*?[')
+
+def translate_glob(pattern):
+    """
+    将通配模式转换为正则表达式源码（不含锚定），语义与fnmatch.fnmatch一致
+    
+    fnmatch.translate的输出格式随Python版本变化（命名组、原子组），
+    不便拼接为组合正则，因此在这里按相同规则自行转换。
+    """
+    result = []
+    i, n = 0, len(pattern)
+    while i < n:
+        c = pattern[i]
+        i += 1
+        if c == '*':
+            # 连续的*等价于一个
+            if not result or result[-1] != '.*':
+                result.append('.*')
+        elif c == '?':
+            result.append('.')
+        elif c == '[':
+            j = i
+            if j < n and pattern[j] == '!':
+                j += 1
+            if j < n and pattern[j] == ']':
+                j += 1
+            while j < n and pattern[j] != ']':
+                j += 1
+            if j >= n:
+                result.append('\\[')
+                continue
+            
+            result.append(_translate_bracket(pattern, i, j))
+            i = j + 1
+        else:
+            result.append(re.escape(c))
+    return ''.join(result)
+
+def _translate_bracket(pattern, i, j):
+    """转换字符集 pattern[i:j]（不含方括号）"""
+    stuff = pattern[i:j]
+    if '-' not in stuff:
+        stuff = stuff.replace('\\', r'\\')
+    else:
+        # 按区间拆分，去掉空区间（如z-a，在正则中非法）
+        chunks = []
+        k = i + 2 if pattern[i] == '!' else i + 1
+        while True:
+            k = pattern.find('-', k, j)
+            if k < 0:
+                break
+            chunks.append(pattern[i:k])
+            i = k + 1
+            k = k + 3
+        chunk = pattern[i:j]
+        if chunk:
+            chunks.append(chunk)
+        else:
+            chunks[-1] += '-'
+        for k in range(len(chunks) - 1, 0, -1):
+            if chunks[k - 1][-1] > chunks[k][0]:
+                chunks[k - 1] = chunks[k - 1][:-1] + chunks[k][1:]
+                del chunks[k]
+        stuff = '-'.join(s.replace('\\', r'\\').replace('-', r'\-') for s in chunks)
+    
+    # 转义正则的集合运算符
+    stuff = re.sub(r'([&~|])', r'\\\1', stuff)
+    if not stuff:
+        return '(?!)'
+    if stuff == '!':
+        return '.'
+    if stuff[0] == '!':
+        stuff = '^' + stuff[1:]
+    elif stuff[0] in ('^', '['):
+        stuff = '\\' + stuff
+    return f'[{stuff}]'
+
+class PatternMatcher:
+    """
+    编译后的过滤模式集合
+    
+    匹配语义与逐条调用fnmatch完全一致：以/开头的模式只匹配整个相对路径；
+    其余模式依次尝试匹配文件名、相对路径、"*/模式"和"*/模式/*"；
+    以!开头的模式在不匹配时排除；结尾的/被忽略。
+    
+    模式只在构造时解析一次，并按类型建立索引：不含通配符的文件名放入集合，
+    "*.扩展名"按扩展名放入集合，其余模式合并为少量组合正则。
+    """
+    
+    def __init__(self, patterns=()):
+        self.names = set()  # 字面文件名
+        self.extensions = set()  # "*.ext" 模式的 ".ext"
+        self.negated = []  # 否定模式，各自编译为只含一条模式的匹配器
+        self._unanchored = []
+        self._anchored = []
+        
+        for pattern in patterns:
+            pattern = pattern.strip()
+            if not pattern:
+                continue
+            if pattern.startswith('!'):
+                matcher = PatternMatcher()
+                matcher._add(pattern[1:])
+                matcher._compile()
+                self.negated.append(matcher)
+            else:
+                self._add(pattern)
+        self._compile()
+    
+    def matches(self, rel_path, filename=None, check_ancestors=True):
+        """
+        判断路径是否应被排除
+        
+        Args:
+            rel_path: 相对于工程根目录的路径
+            filename: 文件名，默认为相对路径的最后一级
+            check_ancestors: 是否检查"*/模式/*"（模式匹配路径中间某一级）。
+                扫描时祖先目录都已通过过滤，该检查必然不成立，可以跳过
+        """
+        if NEEDS_NORMCASE:
+            rel_path = os.path.normcase(rel_path)
+            if filename is not None:
+                filename = os.path.normcase(filename)
+        
+        # 最常见的字面文件名和扩展名直接查集合
+        last = rel_path[rel_path.rfind(SEP) + 1:]
+        if last in self.names:
+            return True
+        extensions = self.extensions
+        if extensions:
+            dot = last.find('.')
+            while dot >= 0:
+                if last[dot:] in extensions:
+                    return True
+                dot = last.find('.', dot + 1)
+        
+        if self._tail_regex is not None and self._tail_regex.fullmatch(rel_path):
+            return True
+        if self._anchored_regex is not None and self._anchored_regex.fullmatch(rel_path):
+            return True
+        if filename is not None and filename != last and (
+                self._match_name(filename) or
+                self._name_regex is not None and self._name_regex.fullmatch(filename)):
+            return True
+        if check_ancestors and self._match_middle(rel_path):
+            return True
+        
+        for matcher in self.negated:
+            if not matcher.matches(rel_path, filename):
+                return True
+        return False
+    
+    def _add(self, pattern):
+        """解析一条肯定模式并归入对应索引"""
+        if pattern.endswith('/'):
+            pattern = pattern[:-1]
+        
+        if pattern.startswith('/'):
+            self._anchored.append(translate_glob(os.path.normcase(pattern[1:])))
+            return
+        
+        pattern = os.path.normcase(pattern)
+        if pattern and SEP not in pattern:
+            if not GLOB_CHARS.intersection(pattern):
+                self.names.add(pattern)
+                return
+            if pattern.startswith('*.') and not GLOB_CHARS.intersection(pattern[1:]):
+                self.extensions.add(pattern[1:])
+                return
+        self._unanchored.append(translate_glob(pattern))
+    
+    def _compile(self):
+        """将非索引模式合并为组合正则"""
+        sep = re.escape(SEP)
+        self._tail_regex = self._middle_regex = self._name_regex = self._anchored_regex = None
+        
+        if self._unanchored:
+            alternatives = '|'.join(self._unanchored)
+            # 匹配整个相对路径或"*/模式"
+            self._tail_regex = re.compile(f'(?s:(?:.*{sep})?(?:{alternatives}))')
+            # 匹配"*/模式/*"
+            self._middle_regex = re.compile(f'(?s:.*{sep}(?:{alternatives}){sep}.*)')
+            self._name_regex = re.compile(f'(?s:{alternatives})')
+        if self._anchored:
+            self._anchored_regex = re.compile(f"(?s:{'|'.join(self._anchored)})")
+    
+    def _match_name(self, name):
+        """文件名（或路径中的一级）是否匹配字面文件名或扩展名"""
+        if name in self.names:
+            return True
+        if self.extensions:
+            dot = name.find('.')
+            while dot >= 0:
+                if name[dot:] in self.extensions:
+                    return True
+                dot = name.find('.', dot + 1)
+        return False
+    
+    def _match_middle(self, rel_path):
+        """匹配"*/模式/*"：模式匹配路径中除首尾以外的某一段"""
+        if SEP not in rel_path:
+            return False
+        if self.names or self.extensions:
+            parts = rel_path.split(SEP)[1:-1]
+            if not self.names.isdisjoint(parts):
+                return True
+            if self.extensions:
+                for part in parts:
+                    if '.' in part and self._match_name(part):
+                        return True
+        return self._middle_regex is not None and self._middle_regex.fullmatch(rel_path) is not None
@@ -0,0 +1,134 @@
+"""
+过滤模式匹配的吞吐量对比
+
+对比原先逐条解析模式、每条最多调用四次fnmatch的实现与编译后的PatternMatcher：
+完整检查（含"*/模式/*"）、扫描时的逐级检查（check_ancestors=False），
+以及FilterEngine.filter_path_batch对绝对路径的批量过滤（含计算相对路径）。
+每项执行多次取最短时间，以每秒百万路径计；各实现的排除数应相同。
+
+用法:
+    python -m logic.pattern_matcher_benchmark
+    python -m logic.pattern_matcher_benchmark --paths 1000000 --extra-patterns 50
+    python -m logic.pattern_matcher_benchmark --path /path/to/project
+"""
+
+import argparse
+import fnmatch
+import os
+import sys
+import time
+from logic.filter_engine import FilterEngine
+from logic.pattern_matcher import PatternMatcher
+
+BASE_PATH = "/bench/project"
+EXTENSIONS = ('.py', '.js', '.pyc', '.md', '.c', '.h', '.log', '.min.js', '')
+
+def legacy_match(pattern, rel_path, filename):
+    """原先的单条模式匹配（每次调用都重新解析模式）"""
+    pattern = pattern.strip()
+    if not pattern:
+        return False
+    negate = pattern.startswith('!')
+    if negate:
+        pattern = pattern[1:]
+    if pattern.endswith('/'):
+        pattern = pattern[:-1]
+    
+    if pattern.startswith('/'):
+        matched = fnmatch.fnmatch(rel_path, pattern[1:])
+    else:
+        matched = (fnmatch.fnmatch(filename, pattern) or fnmatch.fnmatch(rel_path, pattern)
+                   or fnmatch.fnmatch(rel_path, f"*/{pattern}") or fnmatch.fnmatch(rel_path, f"*/{pattern}/*"))
+    return not matched if negate else matched
+
+def generate_paths(count):
+    """生成合成工程的相对路径，部分位于node_modules、__pycache__、build等会被排除的目录下"""
+    paths = []
+    for i in range(count):
+        ext = EXTENSIONS[i % len(EXTENSIONS)]
+        if i % 13 == 0:
+            paths.append(f"web/node_modules/pkg_{i % 389}/lib/index_{i}{ext}")
+        elif i % 17 == 0:
+            paths.append(f"pkg_{i % 97}/__pycache__/mod_{i}{ext}")
+        elif i % 19 == 0:
+            paths.append(f"build/out_{i % 31}/file_{i}{ext}")
+        else:
+            paths.append(f"src/pkg_{i % 97}/mod_{i % 1013}/file_{i}{ext}")
+    return paths
+
+def read_paths(root):
+    """列出实际目录下所有条目的相对路径"""
+    paths = []
+    for directory, dirnames, filenames in os.walk(root):
+        rel_dir = os.path.relpath(directory, root)
+        for name in dirnames + filenames:
+            paths.append(name if rel_dir == os.curdir else os.path.join(rel_dir, name))
+    return paths
+
+def extra_patterns(count):
+    """附加的通配模式，用于观察模式数增加时的吞吐量"""
+    return [f"*_{i}_tmp*" if i % 3 == 0 else f"/generated_{i}/" if i % 3 == 1 else f"cache_{i}/*.bin"
+            for i in range(count)]
+
+def best_rate(function, count, repeat):
+    """执行repeat次，返回 (最快一次的每秒百万路径数, 函数返回值)"""
+    best = None
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return count / best / 1e6, result
+
+def run(paths, patterns, repeat, legacy_limit):
+    """执行对比并打印结果"""
+    matcher = PatternMatcher(patterns)
+    filter_engine = FilterEngine()
+    filter_engine.set_filter_patterns(patterns)
+    absolute_paths = [f"{BASE_PATH}/{rel_path}" for rel_path in paths]
+    basename = os.path.basename
+    
+    legacy_paths = paths[:legacy_limit]
+    rows = [
+        ("原实现（逐条fnmatch）", len(legacy_paths),
+         lambda: sum(1 for rel_path in legacy_paths
+                     if any(legacy_match(pattern, rel_path, basename(rel_path)) for pattern in patterns))),
+        ("PatternMatcher（完整检查）", len(legacy_paths),
+         lambda: sum(1 for rel_path in legacy_paths if matcher.matches(rel_path, basename(rel_path)))),
+        ("PatternMatcher（完整检查）", len(paths),
+         lambda: sum(1 for rel_path in paths if matcher.matches(rel_path, basename(rel_path)))),
+        ("PatternMatcher（扫描逐级）", len(paths),
+         lambda: sum(1 for rel_path in paths if matcher.matches(rel_path, check_ancestors=False))),
+        ("filter_path_batch（绝对路径）", len(paths),
+         lambda: len(paths) - len(filter_engine.filter_path_batch(absolute_paths, BASE_PATH))),
+    ]
+    
+    print(f"{len(paths)} 个路径，{len(patterns)} 条过滤模式")
+    for label, count, function in rows:
+        rate, excluded = best_rate(function, count, repeat)
+        print(f"  {label:<28} {count:>9} 个路径  {rate:8.2f} M路径/秒  排除 {excluded}")
+
+def parse_args(argv=None):
+    """解析命令行参数"""
+    parser = argparse.ArgumentParser(prog="python -m logic.pattern_matcher_benchmark",
+                                     description="对比原先逐条fnmatch与编译后PatternMatcher的匹配吞吐量")
+    parser.add_argument('--path', help="使用实际目录的条目（默认生成合成路径）")
+    parser.add_argument('--paths', type=int, default=500000, help="合成路径数")
+    parser.add_argument('--extra-patterns', type=int, default=0,
+                        help="在常见忽略模式之外附加的通配模式数")
+    parser.add_argument('--legacy-limit', type=int, default=50000,
+                        help="原实现较慢，只对前若干个路径计时（同时给出PatternMatcher在同一子集上的结果）")
+    parser.add_argument('--repeat', type=int, default=3, help="每项的执行次数")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    """命令行入口"""
+    args = parse_args(argv)
+    paths = read_paths(os.path.abspath(args.path)) if args.path else generate_paths(args.paths)
+    patterns = FilterEngine().get_common_ignore_patterns() + extra_patterns(args.extra_patterns)
+    run(paths, patterns, args.repeat, args.legacy_limit)
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
\ No newline at end of file
@@ -0,0 +1,117 @@
+"""
+增量扫描缓存
+"""
+
+import os
+import json
+import hashlib
+import time
+from utils.utils import Utils
+from utils.path_utils import PathUtils
+
+class ScanCache:
+    """
+    按工程根目录持久化的扫描缓存
+    
+    记录每个目录的mtime/inode以及过滤后的子项名称和类型。重新扫描时，
+    mtime和inode均未变化的目录直接复用缓存的列表，不再列目录和执行过滤。
+    过滤条件变化时整个缓存失效；启用.gitignore时，目录生效的规则文件变化时该目录的缓存失效。
+    
+    目录mtime只反映直接子项的增删改名，不反映文件内容的修改，
+    因此缓存中不保存文件大小，复用列表时由调用方重新获取。
+    """
+    
+    VERSION = 3
+    
+    # mtime距扫描开始不足该秒数的目录不写入缓存（同一时间粒度内的修改无法被mtime区分）
+    RACY_WINDOW = 2.0
+    
+    def __init__(self, project_path, cache_dir="runtime/scan_cache"):
+        self.project_path = PathUtils.normalize_path(project_path)
+        digest = hashlib.sha1(self.project_path.encode('utf-8', 'surrogateescape')).hexdigest()
+        self.cache_file = PathUtils.join_path(cache_dir, f"{digest}.json")
+        self.fingerprint = ""
+        self.previous_entries = {}  # 上次扫描的缓存
+        self.current_entries = {}  # 本次扫描访问到的目录
+        self.hits = 0
+        self.misses = 0
+        self.scan_start_ns = 0
+    
+    @staticmethod
+    def make_fingerprint(filter_patterns, follow_symlinks=True, use_gitignore=False, include_patterns=()):
+        """根据过滤条件和包含条件生成缓存指纹"""
+        content = json.dumps(
+            [ScanCache.VERSION, list(filter_patterns), follow_symlinks, use_gitignore, list(include_patterns)],
+            ensure_ascii=False
+        )
+        return hashlib.sha1(content.encode('utf-8', 'surrogateescape')).hexdigest()
+    
+    def load(self, fingerprint):
+        """加载缓存，指纹不匹配时丢弃旧缓存"""
+        self.fingerprint = fingerprint
+        self.current_entries = {}
+        self.hits = 0
+        self.misses = 0
+        self.scan_start_ns = time.time_ns()
+        
+        data = Utils.read_json_file(self.cache_file) if os.path.exists(self.cache_file) else {}
+        if data.get('fingerprint') == fingerprint and data.get('project_path') == self.project_path:
+            self.previous_entries = data.get('directories', {})
+        else:
+            self.previous_entries = {}
+    
+    def save(self, merge=False):
+        """
+        保存本次扫描的缓存
+        
+        Args:
+            merge: 本次扫描未访问到全部目录时（限制深度、中止、分片扫描）为True，
+                保留未访问目录的旧缓存（复用前仍按mtime校验）；否则未访问到的目录随之清除
+        """
+        directories = self.current_entries
+        if merge:
+            directories = dict(self.previous_entries)
+            directories.update(self.current_entries)
+        data = {
+            'project_path': self.project_path,
+            'fingerprint': self.fingerprint,
+            'directories': directories
+        }
+        return Utils.write_file_content(self.cache_file, json.dumps(data, ensure_ascii=False))
+    
+    def lookup(self, dir_path, dir_stat, token=""):
+        """
+        查找目录的缓存列表
+        
+        Args:
+            dir_path: 目录路径
+            dir_stat: 目录的stat结果
+            token: 目录生效的.gitignore规则标识
+        
+        Returns:
+            list: 缓存的 [名称, 是否目录, 是否继续深入] 列表，未命中时返回None
+        """
+        key = self._make_key(dir_path)
+        entry = self.previous_entries.get(key)
+        if (entry and entry[0] == dir_stat.st_mtime_ns and entry[1] == dir_stat.st_ino
+                and entry[3] == token):
+            self.current_entries[key] = entry
+            self.hits += 1
+            return entry[2]
+        
+        self.misses += 1
+        return None
+    
+    def store(self, dir_path, dir_stat, children, token=""):
+        """记录目录的过滤后子项列表"""
+        if dir_stat.st_mtime_ns >= self.scan_start_ns - int(self.RACY_WINDOW * 1e9):
+            return
+        self.current_entries[self._make_key(dir_path)] = [
+            dir_stat.st_mtime_ns, dir_stat.st_ino, children, token
+        ]
+    
+    def _make_key(self, dir_path):
+        """目录相对于工程根目录的键"""
+        if dir_path == self.project_path:
+            return "."
+        return dir_path[len(self.project_path):].lstrip(os.sep)
@@ -0,0 +1,442 @@
+"""
+工程快照（二进制格式）
+"""
+
+import os
+import sys
+import json
+import mmap
+import struct
+import zlib
+from array import array
+from bisect import bisect_left
+from collections.abc import MutableMapping
+from data.project_model import ProjectModel
+from data.tree_store import TreeStore
+from utils.utils import Utils
+
+SNAPSHOT_MAGIC = b'PRJSNAP\0'
+SNAPSHOT_VERSION = 1
+
+# 头部标志位
+SNAPSHOT_CHECKSUM = 1  # 头部之后的内容附带CRC32校验
+
+# 魔数、版本、标志位、元数据长度、节点数、名称表长度、描述数、描述文本长度、CRC32
+HEADER = struct.Struct('<8sHHIQQQQI4x')
+
+ALIGNMENT = 8
+
+# 头部之后依次存放的各段：(段名, 数组类型, 元素个数所在的头部字段)；
+# 节点各列与TreeStore相同，描述按节点序号排序，起止位置由相邻的偏移确定
+SECTIONS = (
+    ('meta', 'B', 'meta_length'),
+    ('parent', 'i', 'node_count'),
+    ('first_child', 'i', 'node_count'),
+    ('next_sibling', 'i', 'node_count'),
+    ('name_offset', 'Q', 'node_count'),
+    ('size', 'q', 'node_count'),
+    ('flags', 'B', 'node_count'),
+    ('description_node', 'i', 'description_count'),
+    ('description_offset', 'Q', 'description_count'),
+    ('names', 'B', 'names_length'),
+    ('description_text', 'B', 'description_length'),
+)
+
+def section_layout(header):
+    """
+    计算各段在文件中的位置（每段按8字节对齐）
+    
+    Args:
+        header: 头部字段字典
+    
+    Returns:
+        dict: 段名 -> (起始偏移, 数组类型, 元素个数)，以及 'end' -> 文件总长度
+    """
+    layout = {}
+    offset = HEADER.size
+    for name, typecode, count_field in SECTIONS:
+        count = header[count_field]
+        layout[name] = (offset, typecode, count)
+        offset += count * array(typecode).itemsize
+        offset += -offset % ALIGNMENT
+    layout['end'] = offset
+    return layout
+
+def read_header(data):
+    """
+    解析并校验头部
+    
+    Returns:
+        dict: 头部字段
+    
+    Raises:
+        ValueError: 不是快照文件或版本不受支持
+    """
+    if len(data) < HEADER.size:
+        raise ValueError("快照文件不完整")
+    (magic, version, flags, meta_length, node_count, names_length,
+     description_count, description_length, checksum) = HEADER.unpack_from(data)
+    if magic != SNAPSHOT_MAGIC:
+        raise ValueError("不是工程快照文件")
+    if version != SNAPSHOT_VERSION:
+        raise ValueError(f"不支持的快照版本: {version}")
+    return {
+        'version': version,
+        'flags': flags,
+        'meta_length': meta_length,
+        'node_count': node_count,
+        'names_length': names_length,
+        'description_count': description_count,
+        'description_length': description_length,
+        'checksum': checksum
+    }
+
+def parse_snapshot(data, verify=True):
+    """
+    校验快照内容（字节串或内存映射）并计算各段位置
+    
+    Returns:
+        tuple: (头部字段, 各段位置)，见 read_header 和 section_layout
+    
+    Raises:
+        ValueError: 文件格式错误、版本不受支持或校验失败
+    """
+    header = read_header(data)
+    layout = section_layout(header)
+    if len(data) < layout['end']:
+        raise ValueError("快照文件不完整")
+    if verify and header['flags'] & SNAPSHOT_CHECKSUM:
+        if zlib.crc32(memoryview(data)[HEADER.size:layout['end']]) != header['checksum']:
+            raise ValueError("快照校验失败，文件可能已损坏")
+    return header, layout
+
+class ProjectSnapshot:
+    """
+    工程快照的保存与恢复
+    
+    快照以紧凑的二进制格式保存整个工程模型：头部、JSON元数据（工程路径和扫描设置）、
+    定长节点记录（按列存放：父节点、第一个子节点、下一个兄弟、名称偏移、大小、标志位）、
+    描述索引以及名称和描述的字符串表。各列为小端序的原始数组，读取时每列只需一次复制，
+    不必重新扫描目录或解析JSON；也可以直接映射到内存中按偏移访问。
+    """
+    
+    def save(self, project_model, file_path, checksum=True):
+        """
+        保存工程快照
+        
+        Args:
+            project_model: 工程数据模型
+            file_path: 快照文件路径
+            checksum: 是否附带CRC32校验
+        
+        Returns:
+            tuple: (文件路径, 消息)，失败时文件路径为None
+        """
+        try:
+            if not project_model.root_node:
+                return None, "没有可保存的文件树"
+            
+            store = project_model.tree_store or TreeStore.from_tree(project_model.root_node)
+            meta = json.dumps({
+                'project_path': project_model.project_path,
+                'root_path': store.root_path,
+                'filter_conditions': project_model.filter_conditions,
+                'include_conditions': project_model.include_conditions,
+                'use_gitignore': project_model.use_gitignore,
+                'lazy_load': project_model.lazy_load,
+                'compact': project_model.tree_store is not None,
+                'saved_at': Utils.format_datetime()
+            }, ensure_ascii=False).encode('utf-8', 'surrogateescape')
+            
+            description_nodes = sorted(store.descriptions)
+            description_text = bytearray()
+            description_offset = array('Q')
+            for index in description_nodes:
+                description_offset.append(len(description_text))
+                description_text += store.descriptions[index].encode('utf-8', 'surrogateescape')
+            
+            sections = {
+                'meta': meta,
+                'parent': store.parent,
+                'first_child': store.first_child,
+                'next_sibling': store.next_sibling,
+                'name_offset': store.name_offset,
+                'size': store.size,
+                'flags': store.flags,
+                'description_node': array('i', description_nodes),
+                'description_offset': description_offset,
+                'names': store.names,
+                'description_text': description_text
+            }
+            header = {
+                'flags': SNAPSHOT_CHECKSUM if checksum else 0,
+                'meta_length': len(meta),
+                'node_count': len(store),
+                'names_length': len(store.names),
+                'description_count': len(description_nodes),
+                'description_length': len(description_text),
+            }
+            
+            # 先写入临时文件，完成后替换，避免中途失败留下损坏的快照
+            os.makedirs(os.path.dirname(os.path.abspath(file_path)), exist_ok=True)
+            temp_path = file_path + ".tmp"
+            crc = 0
+            with open(temp_path, 'wb') as f:
+                f.write(bytes(HEADER.size))
+                for name, _, _ in SECTIONS:
+                    data = self._to_little_endian(sections[name])
+                    padding = bytes(-len(data) % ALIGNMENT)
+                    f.write(data)
+                    f.write(padding)
+                    if checksum:
+                        crc = zlib.crc32(padding, zlib.crc32(data, crc))
+                f.seek(0)
+                f.write(HEADER.pack(SNAPSHOT_MAGIC, SNAPSHOT_VERSION, header['flags'], header['meta_length'],
+                                    header['node_count'], header['names_length'], header['description_count'],
+                                    header['description_length'], crc))
+            os.replace(temp_path, file_path)
+            return file_path, "快照保存成功"
+        
+        except Exception as e:
+            return None, f"快照保存失败: {str(e)}"
+    
+    def load(self, file_path, verify=True):
+        """
+        读取工程快照
+        
+        Args:
+            file_path: 快照文件路径
+            verify: 快照附带校验时是否校验
+        
+        Returns:
+            tuple: (元数据字典, TreeStore)
+        
+        Raises:
+            ValueError: 文件格式错误、版本不受支持或校验失败
+        """
+        with open(file_path, 'rb') as f:
+            data = f.read()
+        
+        _, layout = parse_snapshot(data, verify)
+        view = memoryview(data)
+        sections = {}
+        for name, _, _ in SECTIONS:
+            offset, typecode, count = layout[name]
+            column = array(typecode)
+            column.frombytes(view[offset:offset + count * column.itemsize])
+            if sys.byteorder != 'little' and column.itemsize > 1:
+                column.byteswap()
+            sections[name] = column
+        
+        meta = json.loads(sections['meta'].tobytes().decode('utf-8', 'surrogateescape'))
+        store = TreeStore(meta['root_path'])
+        for name in ('parent', 'first_child', 'next_sibling', 'name_offset', 'size', 'flags'):
+            setattr(store, name, sections[name])
+        store.names = bytearray(sections['names'])
+        
+        text = sections['description_text'].tobytes()
+        offsets = sections['description_offset']
+        nodes = sections['description_node']
+        for i, index in enumerate(nodes):
+            end = offsets[i + 1] if i + 1 < len(offsets) else len(text)
+            store.descriptions[index] = text[offsets[i]:end].decode('utf-8', 'surrogateescape')
+        return meta, store
+    
+    def restore(self, project_model, file_path, file_processor=None, verify=True, mapped=False):
+        """
+        从快照恢复工程模型（扫描设置、文件树和描述）
+        
+        保存时为紧凑存储的工程恢复为紧凑存储，否则还原为TreeNode文件树。
+        提供file_processor时按快照中的扫描设置配置其过滤引擎（之后的实时同步使用相同规则），
+        按需加载的工程再为未加载的目录重新挂接按需加载函数。
+        mapped为True时紧凑存储直接使用快照文件的内存映射（只读，见 MappedSnapshot）。
+        
+        Returns:
+            dict: 快照元数据
+        
+        Raises:
+            ValueError: 快照无效
+        """
+        snapshot = None
+        if mapped:
+            snapshot = MappedSnapshot(file_path, verify)
+            meta, store = snapshot.meta, snapshot.store
+        else:
+            meta, store = self.load(file_path, verify)
+        project_model.set_project_path(meta['project_path'])
+        project_model.filter_conditions = meta['filter_conditions']
+        project_model.include_conditions = meta['include_conditions']
+        project_model.set_use_gitignore(meta['use_gitignore'])
+        project_model.set_lazy_load(meta['lazy_load'])
+        
+        loader = None
+        if file_processor is not None:
+            try:
+                if meta['lazy_load'] and not meta['compact']:
+                    loader = file_processor.create_lazy_loader(meta['project_path'], meta['filter_conditions'],
+                                                               meta['use_gitignore'], meta['include_conditions'])
+                else:
+                    file_processor.configure_filters(meta['project_path'], meta['filter_conditions'],
+                                                     meta['use_gitignore'], meta['include_conditions'])
+            except ValueError as e:
+                # 工程目录已不存在，未加载的目录只能标记为未完整扫描
+                print(f"无法恢复扫描设置: {str(e)}")
+        
+        if meta['compact']:
+            project_model.set_tree_store(store)
+            return meta
+        
+        project_model.set_root_node(store.to_tree(loader=loader))
+        if snapshot is not None:
+            # 已还原为TreeNode，不再需要映射
+            snapshot.close()
+        return meta
+    
+    def _to_little_endian(self, column):
+        """数组按小端序转换为字节视图（长度为字节数）"""
+        if isinstance(column, array) and column.itemsize > 1 and sys.byteorder != 'little':
+            column = array(column.typecode, column)
+            column.byteswap()
+        return memoryview(column).cast('B')
+
+class MappedDescriptions(MutableMapping):
+    """
+    内存映射快照中的描述（节点序号 -> 描述），按序号二分查找，访问时才解码
+    
+    修改只记录在内存中，不写回快照文件。
+    """
+    
+    def __init__(self, nodes, offsets, text):
+        self._nodes = nodes  # 按序号排序的节点序号
+        self._offsets = offsets  # 各描述在文本中的起始偏移
+        self._text = text  # 描述文本（UTF-8）
+        self._changes = {}  # 节点序号 -> 修改后的描述，删除时为None
+    
+    def __getitem__(self, index):
+        if index in self._changes:
+            description = self._changes[index]
+            if description is None:
+                raise KeyError(index)
+            return description
+        
+        i = bisect_left(self._nodes, index)
+        if i == len(self._nodes) or self._nodes[i] != index:
+            raise KeyError(index)
+        end = self._offsets[i + 1] if i + 1 < len(self._offsets) else len(self._text)
+        return str(self._text[self._offsets[i]:end], 'utf-8', 'surrogateescape')
+    
+    def __setitem__(self, index, description):
+        self._changes[index] = description
+    
+    def __delitem__(self, index):
+        self[index]  # 不存在时抛出KeyError
+        self._changes[index] = None
+    
+    def __iter__(self):
+        for index in self._nodes:
+            if index not in self._changes:
+                yield index
+        for index, description in self._changes.items():
+            if description is not None:
+                yield index
+    
+    def __len__(self):
+        return sum(1 for _ in self)
+
+class MappedTreeStore(TreeStore):
+    """
+    直接以快照文件的内存映射为各列的只读TreeStore
+    
+    各列是映射上的memoryview，导航、统计和导出按序号直接读取映射，
+    不复制数据，也不创建节点对象；不能追加节点。
+    """
+    
+    def __init__(self, root_path, columns):
+        self.root_path = root_path
+        for name in ('parent', 'name_offset', 'flags', 'size', 'first_child', 'next_sibling', 'names'):
+            setattr(self, name, columns[name])
+        self.descriptions = MappedDescriptions(columns['description_node'], columns['description_offset'],
+                                               columns['description_text'])
+        self._heights = None
+    
+    def append(self, parent, name, is_directory=False, size=0, previous_sibling=-1):
+        raise TypeError("内存映射的快照是只读的")
+    
+    def count_files(self, index, end):
+        """序号区间 [index, end) 中的文件数（文件没有任何标志位）"""
+        return self.flags[index:end].tobytes().count(0)
+
+class MappedSnapshot:
+    """
+    以只读内存映射打开的工程快照
+    
+    打开时只解析头部和元数据，节点数据由操作系统按需分页读入；同一快照被多个进程
+    打开时共用页缓存。适用于只读的查看和导出，通过 store / root() 访问文件树。
+    用法:
+        with MappedSnapshot("project.snap") as snapshot:
+            Exporter().export_to_markdown(snapshot.to_project_model(), "structure.md")
+    """
+    
+    def __init__(self, file_path, verify=False):
+        """
+        Args:
+            file_path: 快照文件路径
+            verify: 是否校验CRC32（需要读取整个文件）
+        
+        Raises:
+            ValueError: 文件格式错误、版本不受支持、校验失败，或平台不是小端序
+        """
+        if sys.byteorder != 'little':
+            raise ValueError("内存映射快照只支持小端序平台，请使用 ProjectSnapshot.load")
+        
+        self.file_path = file_path
+        with open(file_path, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._views = []
+        try:
+            _, layout = parse_snapshot(self._mmap, verify)
+            view = self._view(memoryview(self._mmap))
+            columns = {}
+            for name, _, _ in SECTIONS:
+                offset, typecode, count = layout[name]
+                columns[name] = self._view(view[offset:offset + count * array(typecode).itemsize].cast(typecode))
+        except Exception:
+            self.close()
+            raise
+        
+        self.meta = json.loads(str(columns['meta'], 'utf-8', 'surrogateescape'))
+        self.store = MappedTreeStore(self.meta['root_path'], columns)
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+    
+    def root(self):
+        """根节点视图"""
+        return self.store.root()
+    
+    def to_project_model(self):
+        """创建以映射为文件树的工程模型（紧凑存储，供导出等只读操作使用）"""
+        project_model = ProjectModel()
+        project_model.set_project_path(self.meta['project_path'])
+        project_model.filter_conditions = self.meta['filter_conditions']
+        project_model.include_conditions = self.meta['include_conditions']
+        project_model.set_use_gitignore(self.meta['use_gitignore'])
+        project_model.set_tree_store(self.store)
+        return project_model
+    
+    def close(self):
+        """释放映射（之后不能再访问store和节点视图）"""
+        for view in reversed(self._views):
+            view.release()
+        self._views = []
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+    
+    def _view(self, view):
+        """记录创建的memoryview，关闭映射前需先释放"""
+        self._views.append(view)
+        return view
\ No newline at end of file
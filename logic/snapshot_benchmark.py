@@ -0,0 +1,128 @@
+"""
+工程快照的加载性能对比
+
+在同一个工程上对比：重新扫描目录、从快照恢复（TreeNode文件树 / 紧凑存储 / 内存映射）
+以及解析JSON导出文件。每项执行多次取最短时间。
+默认在临时目录中生成合成工程，也可以指定实际目录。
+
+用法:
+    python -m logic.snapshot_benchmark
+    python -m logic.snapshot_benchmark --directories 400 --files 100
+    python -m logic.snapshot_benchmark --path /path/to/project
+"""
+
+import argparse
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+from data.project_model import ProjectModel
+from logic.exporter import Exporter
+from logic.file_processor import FileProcessor
+from logic.snapshot import MappedSnapshot, ProjectSnapshot
+
+EXTENSIONS = ('.py', '.js', '.c', '.h', '.md', '')
+
+def generate_project(base, directories, files):
+    """生成两级目录的合成工程，每个目录下有files个文件"""
+    for d in range(directories):
+        directory = os.path.join(base, f"pkg_{d // 20}", f"mod_{d}")
+        os.makedirs(directory)
+        for i in range(files):
+            with open(os.path.join(directory, f"file_{i}{EXTENSIONS[i % len(EXTENSIONS)]}"), 'w') as f:
+                f.write('x' * (i % 7))
+
+def best_time(function, repeat):
+    """执行repeat次，返回最短耗时"""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+def rescan(project_path):
+    """重新扫描并建立索引"""
+    project_model = ProjectModel()
+    project_model.set_project_path(project_path)
+    project_model.set_root_node(FileProcessor().scan_directory(project_path, [], False))
+    return project_model
+
+def rescan_compact(project_path):
+    """重新扫描为紧凑存储"""
+    return FileProcessor().scan_to_store(project_path)
+
+def restore_tree(snapshot_path):
+    """从快照恢复为TreeNode文件树（含索引）"""
+    ProjectSnapshot().restore(ProjectModel(), snapshot_path)
+
+def load_store(snapshot_path):
+    """从快照读取为紧凑存储"""
+    ProjectSnapshot().load(snapshot_path)
+
+def open_mapped(snapshot_path):
+    """以内存映射打开快照并读取根节点"""
+    with MappedSnapshot(snapshot_path) as snapshot:
+        snapshot.root()
+
+def parse_json(json_path):
+    """解析JSON导出文件"""
+    with open(json_path, 'r', encoding='utf-8') as f:
+        json.load(f)
+
+def run(project_path, work_dir, repeat):
+    """执行对比并打印结果"""
+    project_model = rescan(project_path)
+    root = project_model.root_node
+    for index, (node, _) in enumerate(root.walk()):
+        if index % 50 == 0:
+            node.description = f"描述 {index}"
+    
+    snapshot_path = os.path.join(work_dir, "project.snap")
+    json_path = os.path.join(work_dir, "project.json")
+    ProjectSnapshot().save(project_model, snapshot_path)
+    Exporter().export_to_json(project_model, json_path)
+    
+    print(f"工程: {project_path}（{root.node_count} 个节点）")
+    print(f"  快照 {os.path.getsize(snapshot_path) / 1e6:.1f} MB, JSON {os.path.getsize(json_path) / 1e6:.1f} MB")
+    rows = [
+        ("重新扫描（TreeNode+索引）", lambda: rescan(project_path)),
+        ("重新扫描（紧凑存储）", lambda: rescan_compact(project_path)),
+        ("快照恢复（TreeNode+索引）", lambda: restore_tree(snapshot_path)),
+        ("快照读取（紧凑存储）", lambda: load_store(snapshot_path)),
+        ("快照内存映射", lambda: open_mapped(snapshot_path)),
+        ("解析JSON导出", lambda: parse_json(json_path)),
+    ]
+    for label, function in rows:
+        print(f"  {label:<20} {best_time(function, repeat):.4f}s")
+
+def parse_args(argv=None):
+    """解析命令行参数"""
+    parser = argparse.ArgumentParser(prog="python -m logic.snapshot_benchmark",
+                                     description="对比快照加载、重新扫描和解析JSON导出的耗时")
+    parser.add_argument('--path', help="使用实际目录（默认在临时目录中生成合成工程）")
+    parser.add_argument('--directories', type=int, default=200, help="合成工程的目录数")
+    parser.add_argument('--files', type=int, default=100, help="合成工程每个目录的文件数")
+    parser.add_argument('--repeat', type=int, default=3, help="每项的执行次数")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    """命令行入口"""
+    args = parse_args(argv)
+    work_dir = tempfile.mkdtemp(prefix="snapshot_benchmark_")
+    try:
+        if args.path:
+            project_path = os.path.abspath(args.path)
+        else:
+            project_path = os.path.join(work_dir, "project")
+            generate_project(project_path, args.directories, args.files)
+        run(project_path, work_dir, args.repeat)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
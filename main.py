@@ -20,6 +20,9 @@ from ui.config_view import ConfigView
 from ui.project_view import ProjectView
 from data.project_model import ProjectModel
 from logic.file_processor import FileProcessor
+from logic.annotation_store import AnnotationStore
+from logic.snapshot import ProjectSnapshot
+from utils.path_utils import PathUtils
 
 
 class ProjectAnalyzerApp:
@@ -90,22 +93,44 @@ class ProjectAnalyzerApp:
         self.current_view = ConfigView(
             self.root,
             on_start_scan=self.start_project_scan,
-            on_back_to_main=self.show_main_view
+            on_back_to_main=self.show_main_view,
+            on_open_snapshot=self.open_snapshot
         )
     
     def show_project_view(self):
         """显示工程运维界面"""
+        self.open_annotation_store()
         self.current_view = ProjectView(
             self.root,
             self.project_model,
-            on_back_to_config=self.show_config_view
+            on_back_to_config=self.show_config_view,
+            file_processor=self.file_processor
         )
     
-    def start_project_scan(self, project_path, filter_conditions, use_gitignore):
+    def open_annotation_store(self):
+        """打开当前工程的描述和标签存储（同一工程重新扫描时复用），并应用到新的文件树"""
+        store = self.project_model.annotation_store
+        if store is None or store.project_path != PathUtils.normalize_path(self.project_model.project_path):
+            if store is not None:
+                store.close()
+            store = AnnotationStore(self.project_model.project_path)
+        self.project_model.set_annotation_store(store)
+    
+    def start_project_scan(self, project_path, filter_conditions, use_gitignore, lazy=False,
+                           source='filesystem', collect_filter_stats=False, include_conditions=None,
+                           compact=False):
         """开始项目扫描"""
+        include_conditions = include_conditions or []
+        if lazy:
+            self.start_lazy_project(project_path, filter_conditions, use_gitignore, collect_filter_stats,
+                                    include_conditions, source)
+            return
+        
         try:
-            # 显示进度对话框
-            progress_dialog = ProgressDialog(self.root, "正在扫描项目...")
+            # 显示进度对话框（可取消扫描）
+            cancel_event = threading.Event()
+            progress_dialog = ProgressDialog(self.root, "正在扫描项目...", on_cancel=cancel_event.set,
+                                             preview=not compact)
             
             # 在后台线程中执行扫描
             def scan_task():
@@ -114,12 +139,41 @@ class ProjectAnalyzerApp:
                     self.project_model.set_project_path(project_path)
                     self.project_model.filter_conditions = filter_conditions
                     self.project_model.set_use_gitignore(use_gitignore)
+                    self.project_model.include_conditions = include_conditions
+                    self.project_model.set_lazy_load(False)
+                    
+                    # 扫描进度：按批次交给主线程插入预览树（避免频繁刷新界面）
+                    def on_batch(batch):
+                        self.root.after(0, lambda: progress_dialog.add_batch(batch))
+                    
+                    if compact:
+                        # 超大工程：扫描为列式存储，不创建节点对象
+                        tree_store = self.file_processor.scan_to_store(
+                            project_path,
+                            filter_conditions,
+                            use_gitignore,
+                            cancel_event=cancel_event,
+                            on_progress=lambda count: self.root.after(
+                                0, lambda: progress_dialog.update_progress(count)),
+                            include_patterns=include_conditions,
+                            source=source,
+                            collect_filter_stats=collect_filter_stats
+                        )
+                        self.project_model.set_tree_store(tree_store)
+                        self.root.after(0, lambda: self.on_scan_completed(progress_dialog))
+                        return
                     
                     # 扫描目录
                     root_node = self.file_processor.scan_directory(
                         project_path, 
                         filter_conditions, 
-                        use_gitignore
+                        use_gitignore,
+                        on_batch=on_batch,
+                        use_cache=True,
+                        cancel_event=cancel_event,
+                        source=source,
+                        collect_filter_stats=collect_filter_stats,
+                        include_patterns=include_conditions
                     )
                     
                     self.project_model.set_root_node(root_node)
@@ -139,6 +193,57 @@ class ProjectAnalyzerApp:
         except Exception as e:
             messagebox.showerror("错误", f"启动扫描失败: {str(e)}")
     
+    def start_lazy_project(self, project_path, filter_conditions, use_gitignore, collect_filter_stats=False,
+                           include_conditions=None, source='filesystem'):
+        """以按需加载模式打开项目：只创建根节点，展开目录时才读取子目录"""
+        try:
+            self.project_model.set_project_path(project_path)
+            self.project_model.filter_conditions = filter_conditions
+            self.project_model.set_use_gitignore(use_gitignore)
+            self.project_model.include_conditions = include_conditions or []
+            self.project_model.set_lazy_load(True)
+            
+            root_node = self.file_processor.scan_directory(
+                project_path,
+                filter_conditions,
+                use_gitignore,
+                lazy=True,
+                source=source,
+                collect_filter_stats=collect_filter_stats,
+                include_patterns=include_conditions
+            )
+            self.project_model.set_root_node(root_node)
+            
+            self.show_project_view()
+            
+        except Exception as e:
+            messagebox.showerror("扫描失败", f"扫描项目时出现错误:\n{str(e)}")
+    
+    def open_snapshot(self, file_path):
+        """从快照恢复工程，不重新扫描目录"""
+        progress_dialog = ProgressDialog(self.root, "正在打开快照...")
+        
+        def load_task():
+            try:
+                ProjectSnapshot().restore(self.project_model, file_path, self.file_processor)
+                self.root.after(0, lambda: self.on_snapshot_opened(progress_dialog))
+            except Exception as e:
+                self.root.after(0, lambda: self.on_snapshot_error(progress_dialog, str(e)))
+        
+        thread = threading.Thread(target=load_task)
+        thread.daemon = True
+        thread.start()
+    
+    def on_snapshot_opened(self, progress_dialog):
+        """快照打开完成回调"""
+        progress_dialog.close()
+        self.show_project_view()
+    
+    def on_snapshot_error(self, progress_dialog, error_message):
+        """快照打开出错回调"""
+        progress_dialog.close()
+        messagebox.showerror("打开快照失败", f"打开快照时出现错误:\n{error_message}")
+    
     def on_scan_completed(self, progress_dialog):
         """扫描完成回调"""
         try:
@@ -146,7 +251,12 @@ class ProjectAnalyzerApp:
             
             # 显示扫描结果统计
             stats = self.file_processor.get_file_statistics(self.project_model.root_node)
-            message = f"扫描完成！\n\n统计信息:\n"
+            if self.file_processor.scan_stop_reason == 'cancelled':
+                message = "扫描已取消，以下为部分结果。\n\n统计信息:\n"
+            elif self.file_processor.scan_stop_reason:
+                message = "扫描已达到限制，以下为部分结果。\n\n统计信息:\n"
+            else:
+                message = f"扫描完成！\n\n统计信息:\n"
             message += f"- 目录: {stats['total_directories']} 个\n"
             message += f"- 文件: {stats['total_files']} 个\n"
             message += f"- 总大小: {self.format_file_size(stats['total_size'])}\n\n"
@@ -179,6 +289,8 @@ class ProjectAnalyzerApp:
     def on_closing(self):
         """处理窗口关闭事件"""
         if messagebox.askokcancel("退出", "确定要退出工程结构分析工具吗？"):
+            if self.project_model.annotation_store is not None:
+                self.project_model.annotation_store.close()
             self.root.destroy()
     
     def run(self):
@@ -195,11 +307,20 @@ class ProjectAnalyzerApp:
 class ProgressDialog:
     """进度对话框"""
     
-    def __init__(self, parent, message="正在处理..."):
+    PREVIEW_LIMIT = 5000  # 扫描预览最多显示的条目数，超出后只更新计数
+    
+    def __init__(self, parent, message="正在处理...", on_cancel=None, preview=False):
+        self.on_cancel = on_cancel
+        self.cancelled = False
+        self.preview = None  # 扫描预览树，随扫描产出的批次逐步填充
+        self.preview_items = {}  # 节点 -> 预览项ID
+        self.directory_count = 0
+        self.file_count = 0
+        self.width, self.height = (560, 420) if preview else (300, 150)
         self.dialog = tk.Toplevel(parent)
         self.dialog.title("请稍候")
-        self.dialog.geometry("300x100")
-        self.dialog.resizable(False, False)
+        self.dialog.geometry(f"{self.width}x{self.height}")
+        self.dialog.resizable(preview, preview)
         
         # 设置模态
         self.dialog.transient(parent)
@@ -209,10 +330,10 @@ class ProgressDialog:
         self.center_dialog(parent)
         
         # 创建界面
-        self.setup_ui(message)
+        self.setup_ui(message, preview)
         
-        # 禁用关闭按钮
-        self.dialog.protocol("WM_DELETE_WINDOW", lambda: None)
+        # 关闭按钮等同于取消；不可取消时禁用关闭按钮
+        self.dialog.protocol("WM_DELETE_WINDOW", self.cancel if on_cancel else (lambda: None))
     
     def center_dialog(self, parent):
         """居中显示对话框"""
@@ -225,8 +346,8 @@ class ProgressDialog:
         parent_height = parent.winfo_height()
         
         # 获取对话框大小
-        dialog_width = 300
-        dialog_height = 100
+        dialog_width = self.width
+        dialog_height = self.height
         
         # 计算居中位置
         x = parent_x + (parent_width - dialog_width) // 2
@@ -234,7 +355,7 @@ class ProgressDialog:
         
         self.dialog.geometry(f"{dialog_width}x{dialog_height}+{x}+{y}")
     
-    def setup_ui(self, message):
+    def setup_ui(self, message, preview=False):
         """设置对话框界面"""
         # 主框架
         main_frame = tk.ttk.Frame(self.dialog, padding="20")
@@ -244,10 +365,79 @@ class ProgressDialog:
         label = tk.ttk.Label(main_frame, text=message, font=("Arial", 10))
         label.pack(pady=(0, 10))
         
+        # 进度标签
+        self.status_label = tk.ttk.Label(main_frame, text="", font=("Arial", 9))
+        self.status_label.pack()
+        
         # 进度条
         self.progress = tk.ttk.Progressbar(main_frame, mode='indeterminate')
         self.progress.pack(fill=tk.X, pady=(0, 10))
         self.progress.start(10)
+        
+        # 取消按钮
+        if self.on_cancel:
+            self.cancel_button = tk.ttk.Button(main_frame, text="取消", command=self.cancel)
+            self.cancel_button.pack(side=tk.BOTTOM)
+        
+        # 扫描预览树
+        if preview:
+            preview_frame = tk.ttk.Frame(main_frame)
+            preview_frame.pack(fill=tk.BOTH, expand=True, pady=(0, 10))
+            self.preview = tk.ttk.Treeview(preview_frame, show='tree')
+            scrollbar = tk.ttk.Scrollbar(preview_frame, orient=tk.VERTICAL, command=self.preview.yview)
+            self.preview.configure(yscrollcommand=scrollbar.set)
+            scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+            self.preview.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+    
+    def cancel(self):
+        """请求取消当前操作"""
+        if not self.on_cancel:
+            return
+        self.on_cancel()
+        self.cancelled = True
+        try:
+            self.status_label.config(text="正在取消...")
+            self.cancel_button.config(state=tk.DISABLED)
+        except tk.TclError:
+            pass
+    
+    def update_progress(self, count):
+        """更新已发现的条目数"""
+        try:
+            self.status_label.config(text=f"已发现 {count} 个条目")
+        except tk.TclError:
+            pass
+    
+    def add_batch(self, batch):
+        """
+        将扫描产出的一批 (父节点, 节点) 插入预览树，并更新已发现的目录和文件数
+        
+        扫描线程仍在修改文件树，这里只读取创建后不再变化的名称和类型，不访问子节点列表。
+        """
+        try:
+            for parent, node in batch:
+                if node.is_directory:
+                    self.directory_count += 1
+                else:
+                    self.file_count += 1
+                if self.preview is None or len(self.preview_items) >= self.PREVIEW_LIMIT:
+                    continue
+                
+                parent_id = self.preview_items.get(parent) if parent is not None else ''
+                if parent_id is None:
+                    # 父节点超出预览上限而未显示
+                    continue
+                icon = "📁" if node.is_directory else "📄"
+                item_id = self.preview.insert(parent_id, 'end', text=f"{icon} {node.name}", open=parent is None)
+                self.preview_items[node] = item_id
+            
+            if not self.cancelled:
+                status = f"已发现目录 {self.directory_count} 个，文件 {self.file_count} 个"
+                if len(self.preview_items) >= self.PREVIEW_LIMIT:
+                    status += f"（预览仅显示前 {self.PREVIEW_LIMIT} 个）"
+                self.status_label.config(text=status)
+        except tk.TclError:
+            pass
     
     def close(self):
         """关闭对话框"""
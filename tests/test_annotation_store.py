@@ -0,0 +1,111 @@
+"""
+描述与标签持久化存储的测试
+"""
+
+import os
+from data.project_model import ProjectModel
+from logic.annotation_store import AnnotationStore
+from logic.file_processor import FileProcessor
+
+def _open_store(tmp_path, project_path="/project"):
+    return AnnotationStore(project_path, store_dir=str(tmp_path / "annotations"))
+
+def _path(*parts):
+    return os.sep.join(parts)
+
+def test_prefix_query_excludes_sibling_with_same_prefix(tmp_path):
+    store = _open_store(tmp_path)
+    for rel_path in ["logi", "logic", _path("logic", "a.py"), _path("logic", "sub", "b.py"),
+                     "logic-bak", _path("logic-bak", "a.py"), "logic2", "main.py"]:
+        store.set_description(rel_path, f"描述 {rel_path}")
+        store.set_tags(rel_path, ["服务层"])
+    
+    expected = ["logic", _path("logic", "a.py"), _path("logic", "sub", "b.py")]
+    assert sorted(store.get_descriptions("logic")) == expected
+    assert sorted(store.get_tags("logic")) == expected
+    assert store.find_tagged("服务层", "logic") == expected
+    assert len(store.get_descriptions()) == 8
+    store.close()
+
+def test_direct_query_returns_only_directory_and_children(tmp_path):
+    store = _open_store(tmp_path)
+    for rel_path in ["", "logic", _path("logic", "a.py"), _path("logic", "sub"),
+                     _path("logic", "sub", "b.py"), "logic-bak", _path("logic-bak", "a.py")]:
+        store.set_description(rel_path, "x")
+    
+    assert sorted(store.get_descriptions("logic", direct=True)) == [
+        "logic", _path("logic", "a.py"), _path("logic", "sub")]
+    assert sorted(store.get_descriptions("", direct=True)) == ["", "logic", "logic-bak"]
+    store.close()
+
+def test_set_delete_and_flush(tmp_path):
+    store = _open_store(tmp_path)
+    store.set_description("a.py", "第一版")
+    store.set_description("b.py", "待删除")
+    store.set_tags("a.py", ["服务层", "服务层", "单一职责"])
+    assert store.has_pending()
+    assert store.flush() == 3
+    assert not store.has_pending()
+    assert store.flush() == 0
+    
+    store.set_description("a.py", "第二版")
+    store.set_description("b.py", "")
+    store.set_tags("a.py", ["单一职责"])
+    # 读取前先写入排队的修改
+    assert store.get_descriptions() == {"a.py": "第二版"}
+    assert store.get_tags() == {"a.py": ["单一职责"]}
+    
+    store.set_tags("a.py", [])
+    store.close()
+    
+    reopened = _open_store(tmp_path)
+    assert reopened.get_descriptions() == {"a.py": "第二版"}
+    assert reopened.get_tags() == {}
+    reopened.close()
+
+def test_lazy_project_reads_only_loaded_directories(tmp_path, monkeypatch):
+    project = tmp_path / "project"
+    (project / "a" / "b").mkdir(parents=True)
+    (project / "a" / "x.txt").write_text("x")
+    (project / "a" / "b" / "y.txt").write_text("y")
+    (project / "top.txt").write_text("t")
+    
+    store = _open_store(tmp_path, str(project))
+    descriptions = {"top.txt": "顶层", "a": "目录a", _path("a", "x.txt"): "文件x",
+                    _path("a", "b", "y.txt"): "文件y"}
+    for rel_path, description in descriptions.items():
+        store.set_description(rel_path, description)
+        store.set_tags(rel_path, [description])
+    store.flush()
+    
+    reads = []
+    read_descriptions = store.get_descriptions
+    
+    def recording_get_descriptions(prefix="", direct=False):
+        result = read_descriptions(prefix, direct)
+        reads.extend(result)
+        return result
+    monkeypatch.setattr(store, "get_descriptions", recording_get_descriptions)
+    
+    model = ProjectModel()
+    model.set_project_path(str(project))
+    model.set_lazy_load(True)
+    model.set_root_node(FileProcessor().scan_directory(str(project), [], False, lazy=True))
+    model.set_annotation_store(store)
+    
+    a = model.find_node("a")
+    assert model.find_node("top.txt").description == "顶层"
+    assert a.description == "目录a"
+    assert not a.is_loaded()
+    assert sorted(reads) == ["a", "top.txt"]
+    assert model.load_tags() == {"a": ["目录a"], "top.txt": ["顶层"]}
+    
+    # 展开目录a时只读取a的直接子条目
+    reads.clear()
+    assert model.apply_descriptions(a) == 2
+    assert model.find_node(_path("a", "x.txt")).description == "文件x"
+    assert not model.find_node(_path("a", "b")).is_loaded()
+    assert sorted(reads) == ["a", _path("a", "x.txt")]
+    assert model.load_tags(a) == {"a": ["目录a"], _path("a", "x.txt"): ["文件x"]}
+    assert model.get_tags(_path("a", "b", "y.txt")) == ["文件y"]
+    store.close()
\ No newline at end of file
@@ -0,0 +1,78 @@
+"""
+导出功能的测试
+"""
+
+import json
+import pytest
+from data.project_model import ProjectModel
+from logic.exporter import Exporter
+from logic.file_processor import FileProcessor
+
+@pytest.fixture
+def project(tmp_path):
+    """含描述和非ASCII文件名的小工程"""
+    root = tmp_path / "project"
+    (root / "src" / "中文").mkdir(parents=True)
+    (root / "src" / "main.py").write_text("print(1)\n")
+    (root / "src" / "中文" / "说明.md").write_text("# 说明\n")
+    (root / 'quote"name.txt').write_text("x")
+    return root
+
+def make_model(project, include_conditions=()):
+    """扫描工程并创建项目模型"""
+    model = ProjectModel()
+    model.set_project_path(str(project))
+    model.filter_conditions = ["*.pyc"]
+    model.include_conditions = list(include_conditions)
+    model.set_root_node(FileProcessor().scan_directory(
+        str(project), model.filter_conditions, False, include_patterns=model.include_conditions))
+    return model
+
+def export_json(model, tmp_path):
+    """导出JSON并读回"""
+    output_path, message = Exporter().export_to_json(model, str(tmp_path / "export.json"))
+    assert output_path, message
+    with open(output_path, encoding='utf-8') as f:
+        return json.load(f)
+
+def test_json_export_without_include_conditions_keeps_schema(project, tmp_path):
+    model = make_model(project)
+    model.root_node.children[0].description = '源码 "目录"\n第二行'
+    data = export_json(model, tmp_path)
+    
+    assert list(data) == ['export_time', 'project_info', 'structure']
+    assert data['project_info'] == {
+        'project_path': str(project),
+        'filter_conditions': ["*.pyc"],
+        'use_gitignore': False,
+    }
+    assert data['structure'] == model.root_node.to_dict()
+
+def test_json_export_with_include_conditions(project, tmp_path):
+    model = make_model(project, ["*.md"])
+    data = export_json(model, tmp_path)
+    
+    assert data['project_info']['include_conditions'] == ["*.md"]
+    assert data['structure'] == model.root_node.to_dict()
+    assert not (tmp_path / "export.json.tmp").exists()
+
+def test_model_to_dict_include_conditions(project):
+    assert 'include_conditions' not in make_model(project).to_dict()
+    assert make_model(project, ["*.md"]).to_dict()['include_conditions'] == ["*.md"]
+
+
+def test_markdown_stats_match_lazily_loaded_body(project, tmp_path):
+    model = ProjectModel()
+    model.set_project_path(str(project))
+    model.set_lazy_load(True)
+    model.set_root_node(FileProcessor().scan_directory(str(project), [], False, lazy=True))
+    
+    output_path, message = Exporter().export_to_markdown(model, str(tmp_path / "export.md"))
+    assert output_path, message
+    with open(output_path, encoding='utf-8') as f:
+        content = f.read()
+    
+    body = content.split("## 目录结构", 1)[1]
+    directories, files = body.count("📁"), body.count("📄")
+    assert (directories, files) == (3, 3)
+    assert f"- **统计**: 目录 {directories} 个，文件 {files} 个" in content
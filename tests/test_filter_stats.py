@@ -0,0 +1,94 @@
+"""
+过滤模式统计的测试：顺序、多线程和多进程分片扫描得到的各模式统计相同，
+且排除的条目数和大小包含被排除目录下的全部内容
+"""
+
+import os
+import random
+import pytest
+from logic.file_processor import FileProcessor
+from logic.pattern_matcher import PatternMatcher
+
+MODES = {
+    'serial': {},
+    'threads': {'workers': 4},
+    'processes': {'processes': 2},
+}
+
+DIRECTORY_NAMES = ['src', 'node_modules', 'build', 'pkg', '__pycache__']
+FILE_NAMES = ['main.py', 'a.pyc', 'index.js', 'b.log', 'README', 'c.min.js']
+PATTERNS = ['*.pyc', 'node_modules/', '/build', '*.log', '__pycache__/', 'src/*.js']
+
+def random_tree(rng, base, max_depth=4):
+    """在base下随机生成目录树"""
+    os.makedirs(base)
+    stack = [(base, 0)]
+    while stack:
+        directory, depth = stack.pop()
+        for _ in range(rng.randint(1, 5)):
+            if depth < max_depth and rng.random() < 0.45:
+                path = os.path.join(directory, rng.choice(DIRECTORY_NAMES))
+                if not os.path.exists(path):
+                    os.mkdir(path)
+                    stack.append((path, depth + 1))
+            else:
+                path = os.path.join(directory, rng.choice(FILE_NAMES))
+                if not os.path.exists(path):
+                    with open(path, 'w') as f:
+                        f.write('x' * rng.randint(0, 100))
+
+def reference_pruned(base, patterns):
+    """按第一个命中的模式累计被排除的条目数和大小（被排除目录下的全部内容都计入）"""
+    matchers = [(pattern, PatternMatcher([pattern])) for pattern in patterns]
+    totals = {pattern: [0, 0] for pattern in patterns}
+    for directory, dirnames, filenames in os.walk(base):
+        rel_dir = os.path.relpath(directory, base)
+        for name in dirnames + filenames:
+            path = os.path.join(directory, name)
+            rel_path = name if rel_dir == os.curdir else os.path.join(rel_dir, name)
+            hit = next((pattern for pattern, matcher in matchers
+                        if matcher.matches(rel_path, check_ancestors=False)), None)
+            if hit is None:
+                continue
+            if name in dirnames:
+                dirnames.remove(name)
+                entries, size = 1, 0
+                for sub_directory, sub_dirnames, sub_filenames in os.walk(path):
+                    entries += len(sub_dirnames) + len(sub_filenames)
+                    size += sum(os.path.getsize(os.path.join(sub_directory, filename))
+                                for filename in sub_filenames)
+            else:
+                entries, size = 1, os.path.getsize(path)
+            totals[hit][0] += entries
+            totals[hit][1] += size
+    return totals
+
+def pattern_stats(base, patterns, mode):
+    """扫描并返回各模式的统计（去掉耗时）"""
+    processor = FileProcessor()
+    processor.scan_directory(base, patterns, False, collect_filter_stats=True, **MODES[mode])
+    stats = processor.filter_engine.get_pattern_stats()
+    for item in stats:
+        assert item['time'] >= 0
+        del item['time']
+    return stats
+
+@pytest.mark.parametrize('mode', MODES)
+@pytest.mark.parametrize('seed', range(4))
+def test_stats_match_across_scan_modes(tmp_path, mode, seed):
+    rng = random.Random(seed)
+    for case in range(5):
+        base = str(tmp_path / f"case_{case}")
+        random_tree(rng, base)
+        patterns = rng.sample(PATTERNS, rng.randint(1, len(PATTERNS)))
+        
+        stats = pattern_stats(base, patterns, mode)
+        assert stats == pattern_stats(base, patterns, 'serial')
+        assert [item['pattern'] for item in stats] == patterns
+        
+        reference = reference_pruned(base, patterns)
+        assert {item['pattern']: [item['pruned_entries'], item['pruned_bytes']] for item in stats} == reference
+        # 排在前面的模式已命中时不再匹配后面的模式
+        evaluations = [item['evaluations'] for item in stats]
+        assert evaluations == sorted(evaluations, reverse=True)
+        assert all(evaluations[i] - evaluations[i + 1] == stats[i]['hits'] for i in range(len(stats) - 1))
\ No newline at end of file
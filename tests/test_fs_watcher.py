@@ -0,0 +1,165 @@
+"""
+文件系统监听器的测试
+"""
+
+import errno
+import shutil
+import threading
+from logic.file_processor import FileProcessor
+from logic.fs_watcher import FileSystemWatcher, PollingBackend
+
+def _start_lazy(project):
+    """按需加载模式扫描，只加载根目录"""
+    processor = FileProcessor()
+    root = processor.scan_directory(str(project), [], False, lazy=True)
+    watcher = FileSystemWatcher(processor, root, on_changes=lambda paths: None)
+    watcher.backend = PollingBackend()
+    for node, _ in root.walk(loaded_only=True):
+        if node.is_directory:
+            watcher.backend.add(node.path)
+    return root, watcher
+
+def test_removing_unloaded_directory_does_not_load_it(tmp_path, capsys):
+    project = tmp_path / "project"
+    (project / "sub" / "deeper").mkdir(parents=True)
+    (project / "sub" / "a.txt").write_text("a")
+    (project / "b.txt").write_text("b")
+    
+    root, watcher = _start_lazy(project)
+    assert [child.name for child in root.children] == ["b.txt", "sub"]
+    sub = root.children[1]
+    assert not sub.is_loaded()
+    
+    shutil.rmtree(project / "sub")
+    changes = watcher.apply({root.path})
+    
+    assert [(action, node.name) for action, _, node in changes] == [("removed", "sub")]
+    assert [child.name for child in root.children] == ["b.txt"]
+    assert "扫描目录时出错" not in capsys.readouterr().out
+
+def test_added_files_are_synced(tmp_path):
+    project = tmp_path / "project"
+    project.mkdir()
+    (project / "a.txt").write_text("a")
+    
+    root, watcher = _start_lazy(project)
+    assert [child.name for child in root.children] == ["a.txt"]
+    
+    (project / "b.txt").write_text("bb")
+    changes = watcher.apply({root.path})
+    
+    assert [(action, node.name, node.size) for action, _, node in changes] == [("added", "b.txt", 2)]
+
+
+def test_watch_directory_registers_lazily_loaded_directory(tmp_path):
+    project = tmp_path / "project"
+    (project / "sub").mkdir(parents=True)
+    (project / "sub" / "a.txt").write_text("a")
+    
+    root, watcher = _start_lazy(project)
+    sub = root.children[0]
+    assert str(project / "sub") not in watcher.backend.paths()
+    
+    watcher.watch_directory(sub)
+    assert [child.name for child in sub.children] == ["a.txt"]
+    
+    (project / "sub" / "b.txt").write_text("b")
+    dirty = watcher.backend.poll(0)
+    assert dirty == {str(project / "sub")}
+    changes = watcher.apply(dirty)
+    assert [(action, node.name) for action, _, node in changes] == [("added", "b.txt")]
+
+def test_new_directory_is_loaded_lazily(tmp_path):
+    project = tmp_path / "project"
+    project.mkdir()
+    root, watcher = _start_lazy(project)
+    assert not root.children
+    watcher.lazy = True
+    
+    (project / "new" / "deep").mkdir(parents=True)
+    (project / "new" / "deep" / "c.txt").write_text("c")
+    changes = watcher.apply({root.path})
+    
+    new = changes[0][2]
+    assert [(action, node.name) for action, _, node in changes] == [("added", "new")]
+    assert not new.is_loaded()
+    assert watcher.backend.paths() == [root.path]
+    
+    # 加载时先监听再列目录，子目录同样按需加载
+    deep = new.children[0]
+    assert deep.name == "deep" and not deep.is_loaded()
+    assert sorted(watcher.backend.paths()) == [root.path, str(project / "new")]
+    assert [child.name for child in deep.children] == ["c.txt"]
+    assert str(project / "new" / "deep") in watcher.backend.paths()
+
+class LimitedBackend:
+    """模拟监听数有上限的inotify后端：poll阻塞直到关闭，关闭后poll抛出ValueError"""
+    
+    def __init__(self, limit):
+        self.limit = limit
+        self.watched = set()
+        self.polling = threading.Event()
+        self.closed = threading.Event()
+        self.closed_by = None
+    
+    def add(self, path):
+        if len(self.watched) >= self.limit:
+            raise OSError(errno.ENOSPC, "No space left on device", path)
+        self.watched.add(path)
+    
+    def remove(self, path):
+        self.watched.discard(path)
+    
+    def paths(self):
+        return list(self.watched)
+    
+    def poll(self, timeout):
+        if self.closed.is_set():
+            raise ValueError("closed")
+        self.polling.set()
+        self.closed.wait(timeout)
+        if self.closed.is_set() and self.closed_by is not threading.current_thread():
+            raise ValueError("closed")
+        return set()
+    
+    def close(self):
+        self.closed_by = threading.current_thread()
+        self.closed.set()
+
+def test_switch_to_polling_keeps_watcher_thread_running(tmp_path):
+    project = tmp_path / "project"
+    project.mkdir()
+    (project / "a.txt").write_text("a")
+    
+    processor = FileProcessor()
+    root = processor.scan_directory(str(project), [], False)
+    received = []
+    changed = threading.Event()
+    
+    def on_changes(paths):
+        received.append(set(paths))
+        changed.set()
+    
+    watcher = FileSystemWatcher(processor, root, on_changes, interval=0.05, max_delay=0.2)
+    limited = LimitedBackend(limit=1)
+    watcher._create_backend = lambda: limited
+    watcher.start()
+    try:
+        assert limited.polling.wait(2)
+        
+        # 主线程中新增目录触发监听数上限，监听线程此时正阻塞在旧后端的poll中
+        (project / "sub").mkdir()
+        changes = watcher.apply({root.path})
+        assert [(action, node.name) for action, _, node in changes] == [("added", "sub")]
+        assert watcher.is_polling()
+        assert sorted(watcher.backend.paths()) == [root.path, str(project / "sub")]
+        
+        # 旧后端由监听线程关闭，监听线程继续使用轮询后端
+        assert limited.closed.wait(2)
+        assert limited.closed_by is watcher._thread
+        (project / "sub" / "b.txt").write_text("b")
+        assert changed.wait(2)
+        assert watcher._thread.is_alive()
+        assert str(project / "sub") in set().union(*received)
+    finally:
+        watcher.stop()
\ No newline at end of file
@@ -0,0 +1,134 @@
+"""
+git索引解析器的测试：与 git ls-files 的结果对比
+"""
+
+import os
+import random
+import shutil
+import subprocess
+import pytest
+from logic.file_processor import FileProcessor
+from logic.git_index import GitIndex
+
+pytestmark = pytest.mark.skipif(shutil.which('git') is None, reason="需要git")
+
+def git(root, *args, check=True):
+    """在仓库中执行git命令，返回标准输出"""
+    command = ['git', '-c', 'user.name=test', '-c', 'user.email=test@example.com', '-c', 'core.excludesFile=',
+               '-C', str(root), *args]
+    return subprocess.run(command, capture_output=True, check=check).stdout
+
+def ls_files(root, *args):
+    """git ls-files 的路径列表"""
+    return [os.fsdecode(path) for path in git(root, 'ls-files', '-z', *args).split(b'\0') if path]
+
+def scanned_files(root, use_gitignore=False, **scan_options):
+    """扫描得到的文件（相对路径，使用/分隔）"""
+    tree = FileProcessor().scan_directory(str(root), [], use_gitignore, **scan_options)
+    return sorted(os.path.relpath(node.path, root).replace(os.sep, '/')
+                  for node, _ in tree.walk() if not node.is_directory)
+
+@pytest.fixture(params=[('sha1', 2), ('sha1', 3), ('sha1', 4), ('sha256', 4)],
+                ids=['sha1-v2', 'sha1-v3', 'sha1-v4', 'sha256-v4'])
+def repo(request, tmp_path):
+    """包含嵌套目录、非ASCII文件名、强制添加的忽略文件和intent-to-add条目的仓库"""
+    object_format, version = request.param
+    root = tmp_path / "repo"
+    root.mkdir()
+    git(root, 'init', '-q', f'--object-format={object_format}')
+    
+    rng = random.Random(version)
+    for i in range(200):
+        parts = [rng.choice(['a', 'b', 'dd', '中文', 'e e']) for _ in range(rng.randint(0, 4))]
+        path = root.joinpath(*parts, f"f{i}" + rng.choice(['.py', '.txt', '.log', '']))
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text('x' * rng.randint(0, 50))
+    (root / ".gitignore").write_text("*.log\n")
+    git(root, 'add', '-A')
+    (root / "forced.log").write_text("forced")
+    git(root, 'add', '-f', 'forced.log')
+    if version >= 3:
+        # intent-to-add条目使用扩展标志，版本2的索引会被git自动升级为版本3
+        (root / "ita.txt").write_text("intent")
+        git(root, 'add', '-N', 'ita.txt')
+    git(root, 'update-index', '--index-version', str(version))
+    
+    # 未跟踪的文件，其中一部分被忽略
+    for i in range(20):
+        path = root / rng.choice(['a', 'b', 'new', 'new/x']) / f"u{i}{rng.choice(['.py', '.log'])}"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.touch()
+    return root, version
+
+def test_entries_match_ls_files(repo):
+    root, version = repo
+    index, prefix = GitIndex.open(str(root))
+    entries = index.read_entries()
+    
+    assert index.version == version
+    assert prefix == ""
+    assert [os.fsdecode(path) for path, _, _ in entries] == ls_files(root)
+    
+    modes = {}
+    for line in git(root, 'ls-files', '-s', '-z').split(b'\0'):
+        if line:
+            info, _, path = line.partition(b'\t')
+            modes[path] = int(info.split()[0], 8)
+    for path, mode, size in entries:
+        assert mode == modes[path]
+        if path != b'ita.txt':
+            assert size == os.path.getsize(os.path.join(root, os.fsdecode(path)))
+
+def test_git_source_scan(repo):
+    root, _ = repo
+    assert scanned_files(root, source='git') == ls_files(root)
+    assert scanned_files(root, True, source='git', include_untracked=True) == \
+        sorted(ls_files(root, '--cached', '--others', '--exclude-standard'))
+    
+    # 工程目录为仓库的子目录
+    sub = root / "a"
+    assert scanned_files(sub, source='git') == ls_files(sub)
+
+def test_git_source_lazy_scan(repo):
+    root, _ = repo
+    tree = FileProcessor().scan_directory(str(root), [], False, lazy=True, source='git')
+    files = sorted(os.path.relpath(node.path, root).replace(os.sep, '/')
+                   for node, _ in tree.walk() if not node.is_directory)
+    assert files == ls_files(root)
+
+def test_merge_conflict_stages_are_merged(tmp_path):
+    root = tmp_path / "repo"
+    root.mkdir()
+    git(root, 'init', '-q')
+    (root / "c.txt").write_text("1\n")
+    git(root, 'add', '-A')
+    git(root, 'commit', '-qm', '1')
+    git(root, 'checkout', '-qb', 'other')
+    (root / "c.txt").write_text("2\n")
+    git(root, 'commit', '-qam', '2')
+    git(root, 'checkout', '-q', '-')
+    (root / "c.txt").write_text("3\n")
+    git(root, 'commit', '-qam', '3')
+    git(root, 'merge', 'other', check=False)
+    
+    assert len(git(root, 'ls-files', '-s').splitlines()) == 3
+    index, _ = GitIndex.open(str(root))
+    assert [path for path, _, _ in index.read_entries()] == [b'c.txt']
+
+def test_invalid_index_raises(tmp_path):
+    root = tmp_path / "repo"
+    root.mkdir()
+    git(root, 'init', '-q')
+    with pytest.raises(ValueError):
+        GitIndex.open(str(root))
+    
+    (root / ".git" / "index").write_bytes(b'NOTDIRC' + bytes(20))
+    index, _ = GitIndex.open(str(root))
+    with pytest.raises(ValueError):
+        index.read_entries()
+
+def test_outside_repository_raises(tmp_path):
+    if GitIndex.find_repository(str(tmp_path))[0] is not None:
+        pytest.skip("临时目录位于git仓库中")
+    with pytest.raises(ValueError):
+        GitIndex.open(str(tmp_path))
@@ -0,0 +1,96 @@
+"""
+.gitignore语义的测试：与 git ls-files 的结果对比
+"""
+
+import os
+import random
+import shutil
+import subprocess
+import pytest
+from logic.file_processor import FileProcessor
+
+pytestmark = pytest.mark.skipif(shutil.which('git') is None, reason="需要git")
+
+RULE_POOL = [
+    '*.log', '!keep.log', 'build/', '/build', 'a/', 'b', 'docs/**', '**/tmp', 'a/**/c.txt', '!a/x', 'x*',
+    '!x1', '*.[ch]', '[!a]*.md', 'c?.txt', '/a/b/', '**/b/c.txt', '!*.md', 'd/', '\\!bang', 'sub/*.txt',
+    '*.txt', '!important.txt', '**', '!a/', 'e/**/', 'foo\\ ', 'a/b', '*/c.txt', '[[:digit:]]*', '# comment',
+    'a/**/**/c.txt',
+]
+NAMES = [
+    'a', 'b', 'c.txt', 'd', 'x1', 'x2', 'keep.log', 'z.log', 'tmp', 'build', 'important.txt', 'e', 'r.md',
+    'q.c', 'c1.txt', '1n', '!bang', 'foo ',
+]
+
+def git_untracked_files(root):
+    """git认为未被忽略的未跟踪文件（不读取用户的全局忽略文件）"""
+    output = subprocess.run(
+        ['git', '-c', 'core.excludesFile=', '-C', str(root), 'ls-files', '-z', '--others', '--exclude-standard'],
+        capture_output=True, check=True).stdout.decode('utf-8', 'surrogateescape')
+    return {path.replace('/', os.sep) for path in output.split('\0') if path}
+
+def scanned_files(root, **scan_options):
+    """启用.gitignore扫描得到的文件"""
+    tree = FileProcessor().scan_directory(str(root), ['.git/'], True, **scan_options)
+    return {os.path.relpath(node.path, root) for node, _ in tree.walk() if not node.is_directory}
+
+def init_repo(root):
+    """创建空仓库"""
+    subprocess.run(['git', 'init', '-q', str(root)], check=True)
+
+def make_random_tree(rng, directory, depth=0):
+    """随机生成目录和空文件"""
+    for name in rng.sample(NAMES, rng.randint(1, 5)):
+        path = os.path.join(directory, name)
+        if depth < 3 and rng.random() < 0.5:
+            os.makedirs(path, exist_ok=True)
+            make_random_tree(rng, path, depth + 1)
+        elif not os.path.exists(path):
+            open(path, 'w').close()
+
+@pytest.mark.parametrize('seed', range(40))
+def test_random_rules_match_git(tmp_path, seed):
+    rng = random.Random(seed)
+    root = tmp_path / "repo"
+    init_repo(root)
+    make_random_tree(rng, str(root))
+    
+    directories = sorted(path for path, _, _ in os.walk(root) if '.git' not in path.split(os.sep))
+    for directory in rng.sample(directories, min(len(directories), rng.randint(1, 3))):
+        with open(os.path.join(directory, '.gitignore'), 'w') as f:
+            f.write('\n'.join(rng.sample(RULE_POOL, rng.randint(1, 5))) + '\n')
+    if rng.random() < 0.3:
+        with open(root / ".git" / "info" / "exclude", 'a') as f:
+            f.write(rng.choice(RULE_POOL) + '\n')
+    
+    assert scanned_files(root) == git_untracked_files(root)
+
+@pytest.fixture
+def nested_repo(tmp_path):
+    """含多级.gitignore（子目录规则覆盖父目录规则）的仓库"""
+    root = tmp_path / "repo"
+    init_repo(root)
+    for directory in ['a/b/c', 'a/x', 'k/l', 'm']:
+        (root / directory).mkdir(parents=True)
+    for path in ['a/b/c/1.txt', 'a/b/2.log', 'a/x/3.txt', 'k/l/4.txt', 'k/5.md', 'm/6.txt', '7.txt', '8.log']:
+        (root / path).touch()
+    (root / ".gitignore").write_text("*.log\n")
+    (root / "a" / ".gitignore").write_text("!2.log\nx/\n")
+    (root / "k" / ".gitignore").write_text("*.txt\n")
+    return root
+
+@pytest.mark.parametrize('scan_options', [
+    {},
+    {'workers': 3},
+    {'processes': 2, 'shard_depth': 2},
+], ids=['serial', 'threads', 'processes'])
+def test_nested_rules_in_every_scan_mode(nested_repo, scan_options):
+    expected = git_untracked_files(nested_repo)
+    assert os.path.join('a', 'b', '2.log') in expected
+    assert os.path.join('k', 'l', '4.txt') not in expected
+    assert scanned_files(nested_repo, **scan_options) == expected
+
+def test_nested_rules_in_lazy_mode(nested_repo):
+    tree = FileProcessor().scan_directory(str(nested_repo), ['.git/'], True, lazy=True)
+    files = {os.path.relpath(node.path, nested_repo) for node, _ in tree.walk() if not node.is_directory}
+    assert files == git_untracked_files(nested_repo)
@@ -0,0 +1,121 @@
+"""
+包含条件剪枝的测试：在随机生成的目录树上，与逐条目暴力判断的参考实现对比
+
+参考实现按.gitignore语义逐段匹配每个条目及其上级目录，不做任何剪枝；
+扫描结果应恰好是匹配的条目、匹配目录下的全部内容，以及通往它们的各级目录。
+"""
+
+import fnmatch
+import os
+import random
+import pytest
+from logic.file_processor import FileProcessor
+
+MODES = {
+    'serial': {},
+    'threads': {'workers': 3},
+    'processes': {'processes': 2},
+}
+
+DIRECTORY_NAMES = ['a', 'b', 'src', 'api']
+FILE_NAMES = ['x.c', 'y.p', 'a.c', 'b.p', 'api', 'src.c']
+PATTERN_POOL = [
+    '*.c', '*.p', 'a', 'b/', 'api/', '/src', '/a/b', 'src/*/api/', '**/*.c', 'a/**/x.c',
+    '/*/api', 'src/**', '?.p', 'x.*', '/b/', 'a*', '**/api/**', 'b/**/', '/a/*.p',
+]
+SEGMENTS = ['a', 'b', 'src', 'api', '*', '?', '**', '*.c', 'x.*']
+
+def random_tree(rng, base, max_depth=3):
+    """在base下随机生成目录树"""
+    os.makedirs(base)
+    stack = [(base, 0)]
+    while stack:
+        directory, depth = stack.pop()
+        for _ in range(rng.randint(0, 4)):
+            if depth < max_depth and rng.random() < 0.45:
+                path = os.path.join(directory, rng.choice(DIRECTORY_NAMES))
+                if not os.path.exists(path):
+                    os.mkdir(path)
+                    stack.append((path, depth + 1))
+            else:
+                path = os.path.join(directory, rng.choice(FILE_NAMES))
+                if not os.path.exists(path):
+                    with open(path, 'w') as f:
+                        f.write('x')
+
+def random_patterns(rng):
+    """从常见模式中选取，夹杂随机拼接的模式"""
+    patterns = []
+    for _ in range(rng.randint(1, 3)):
+        if rng.random() < 0.6:
+            patterns.append(rng.choice(PATTERN_POOL))
+        else:
+            pattern = '/'.join(rng.choice(SEGMENTS) for _ in range(rng.randint(1, 3)))
+            if rng.random() < 0.3:
+                pattern = '/' + pattern
+            if rng.random() < 0.3:
+                pattern += '/'
+            patterns.append(pattern)
+    return patterns
+
+def match_segments(pattern_segments, path_segments):
+    """逐段匹配：**在末尾时匹配一层或多层，其余位置匹配零或多层"""
+    if not pattern_segments:
+        return not path_segments
+    head, rest = pattern_segments[0], pattern_segments[1:]
+    if head == '**':
+        if not rest:
+            return len(path_segments) >= 1
+        return any(match_segments(rest, path_segments[k:]) for k in range(len(path_segments) + 1))
+    return (bool(path_segments) and fnmatch.fnmatchcase(path_segments[0], head)
+            and match_segments(rest, path_segments[1:]))
+
+def reference_matches(pattern, segments, is_directory):
+    """条目（按路径段）是否被一条包含条件直接匹配"""
+    dir_only = pattern.endswith('/')
+    pattern = pattern.rstrip('/')
+    if dir_only and not is_directory:
+        return False
+    if '/' not in pattern:
+        return fnmatch.fnmatchcase(segments[-1], pattern)
+    return match_segments(pattern.lstrip('/').split('/'), segments)
+
+def reference_result(base, patterns):
+    """暴力计算扫描应保留的相对路径集合"""
+    entries = {}
+    for directory, dirnames, filenames in os.walk(base):
+        rel_dir = os.path.relpath(directory, base)
+        prefix = [] if rel_dir == os.curdir else rel_dir.split(os.sep)
+        for name in dirnames:
+            entries[tuple(prefix + [name])] = True
+        for name in filenames:
+            entries[tuple(prefix + [name])] = False
+    
+    def matched(segments, is_directory):
+        return any(reference_matches(pattern, list(segments), is_directory) for pattern in patterns)
+    
+    kept = set()
+    for segments, is_directory in entries.items():
+        # 条目本身匹配，或任一上级目录匹配（其下所有内容都被包含）
+        if matched(segments, is_directory) or any(matched(segments[:i], True) for i in range(1, len(segments))):
+            kept.add(segments)
+            # 通往保留条目的各级目录
+            kept.update(segments[:i] for i in range(1, len(segments)))
+    return {os.sep.join(segments) for segments in kept}
+
+def scanned_paths(root_node):
+    """扫描结果的相对路径集合（不含根节点）"""
+    prefix = root_node.path.rstrip(os.sep) + os.sep
+    return {node.path[len(prefix):] for node, _ in root_node.walk() if node is not root_node}
+
+@pytest.mark.parametrize('mode', MODES)
+@pytest.mark.parametrize('seed', range(4))
+def test_include_pruning_matches_reference(tmp_path, mode, seed):
+    rng = random.Random(seed)
+    for case in range(50):
+        base = str(tmp_path / f"case_{case}")
+        random_tree(rng, base)
+        patterns = random_patterns(rng)
+        
+        root = FileProcessor().scan_directory(base, [], False, include_patterns=patterns, **MODES[mode])
+        assert scanned_paths(root) == reference_result(base, patterns), patterns
\ No newline at end of file
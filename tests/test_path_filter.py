@@ -0,0 +1,91 @@
+"""
+批量路径过滤的测试：filter_path_batch 与逐个调用 should_exclude 的结果对比，
+以及命令行工具在换行和NUL分隔模式下（路径跨读取块）的输出
+"""
+
+import io
+import os
+import random
+import pytest
+from logic.filter_engine import FilterEngine
+from logic.path_filter_cli import filter_stream
+
+SEGMENTS = ['a', 'b', 'c.d', 'x.pyc', 'node_modules', 'build', 'y.log', 'ü', 'z\udcff', '.', '..']
+PATTERN_POOL = ['*.pyc', 'node_modules/', '/a', 'a/b', 'b', '!*.log', 'c.*', '/build/', '*', 'x*', '__pycache__/']
+
+@pytest.fixture
+def base(tmp_path, monkeypatch):
+    """含部分真实目录和.gitignore的基准目录，当前目录为其上级目录"""
+    root = tmp_path / "base"
+    for directory in ["a/b", "c.d", "node_modules/pkg", "build"]:
+        (root / directory).mkdir(parents=True)
+    (root / "a" / "y.log").write_text("log")
+    (root / ".gitignore").write_text("*.log\nbuild/\n")
+    (root / "a" / ".gitignore").write_text("!y.log\nb\n")
+    monkeypatch.chdir(tmp_path)
+    return root
+
+def random_path(rng, base):
+    """随机路径：基准目录下的绝对路径、相对于当前目录的路径、基准目录之外的路径，夹杂.和..以及多余的分隔符"""
+    rel_path = '/'.join(rng.choice(SEGMENTS) for _ in range(rng.randint(1, 4)))
+    if rng.random() < 0.1:
+        rel_path += '/'
+    if rng.random() < 0.1:
+        rel_path = rel_path.replace('/', '//', 1)
+    kind = rng.random()
+    if kind < 0.5:
+        return os.path.join(str(base), rel_path)
+    if kind < 0.8:
+        return os.path.join("base", rel_path)
+    if kind < 0.9:
+        return rel_path
+    return os.path.join(str(base.parent), "other", rel_path)
+
+def make_engine(rng, base, mode):
+    """按模式配置过滤引擎：只有过滤条件（快速路径）、包含条件、.gitignore、统计"""
+    filter_engine = FilterEngine()
+    filter_engine.set_filter_patterns(rng.sample(PATTERN_POOL, rng.randint(0, 3)))
+    if mode == 'include':
+        filter_engine.set_include_patterns(rng.sample(['a/', '*.log', '/c.d', 'b'], rng.randint(1, 2)))
+    elif mode == 'gitignore':
+        filter_engine.set_gitignore_root(str(base))
+    elif mode == 'stats':
+        filter_engine.set_collect_stats(True)
+    return filter_engine
+
+@pytest.mark.parametrize('mode', ['patterns', 'include', 'gitignore', 'stats'])
+@pytest.mark.parametrize('seed', range(4))
+def test_batch_matches_should_exclude(base, mode, seed):
+    rng = random.Random(seed)
+    for _ in range(50):
+        filter_engine = make_engine(rng, base, mode)
+        base_path = rng.choice([str(base), "base", "base/", str(base) + "/."])
+        paths = [random_path(rng, base) for _ in range(40)]
+        
+        expected = [path for path in paths if not filter_engine.should_exclude(path, base_path)]
+        assert filter_engine.filter_path_batch(paths, base_path) == expected
+        assert [path for batch in filter_engine.iter_filter_paths(iter(paths), base_path, batch_size=7)
+                for path in batch] == expected
+
+@pytest.mark.parametrize('separator', [b'\n', b'\0'], ids=['newline', 'nul'])
+@pytest.mark.parametrize('seed', range(4))
+def test_stream_matches_should_exclude(base, separator, seed):
+    rng = random.Random(seed)
+    for _ in range(20):
+        filter_engine = make_engine(rng, base, rng.choice(['patterns', 'include', 'gitignore']))
+        paths = [random_path(rng, base) for _ in range(rng.randint(0, 60))]
+        if separator == b'\0':
+            # NUL分隔时路径中可以含有换行
+            paths += [os.path.join(str(base), "a", "line\nbreak.pyc"), os.path.join(str(base), "new\nline")]
+        data = b''.join(os.fsencode(path) + separator for path in paths)
+        if data and rng.random() < 0.3:
+            # 最后一个路径后没有分隔符
+            data = data[:-1]
+        
+        output = io.BytesIO()
+        total, kept = filter_stream(filter_engine, io.BytesIO(data), output, str(base), separator,
+                                    chunk_size=rng.randint(1, 64))
+        
+        expected = [path for path in paths if not filter_engine.should_exclude(path, str(base))]
+        assert (total, kept) == (len(paths), len(expected))
+        assert output.getvalue() == b''.join(os.fsencode(path) + separator for path in expected)
\ No newline at end of file
@@ -0,0 +1,164 @@
+"""
+路径索引的测试：随机增删、移动（含改名）节点和加载按需目录后，
+以及实时同步应用磁盘上的改名和移动后，索引查询与重建的索引一致
+"""
+
+import os
+import random
+import pytest
+from data.path_index import PathIndex
+from data.tree_node import TreeNode
+from logic.file_processor import FileProcessor
+from logic.fs_watcher import FileSystemWatcher, PollingBackend
+
+NAMES = ['a', 'b', 'src', 'main.py', 'x.txt', '数据', 'a.b']
+
+def unused_name(rng, directory):
+    """目录中尚未使用的名称"""
+    used = {child.name for child in directory._children}
+    candidates = [name for name in NAMES if name not in used]
+    return rng.choice(candidates) if candidates else f"n{len(used)}"
+
+def random_subtree(rng, name, depth=0):
+    """随机生成未挂接的节点，目录的子节点可能按需加载"""
+    node = TreeNode(name, None, is_directory=depth < 3 and rng.random() < 0.5)
+    if not node.is_directory:
+        return node
+    children = []
+    for _ in range(rng.randint(0, 3)):
+        child = random_subtree(rng, rng.choice(NAMES), depth + 1)
+        if child.name not in {existing.name for existing in children}:
+            children.append(child)
+    
+    def load(directory):
+        for child in children:
+            directory.add_child(child)
+    
+    if rng.random() < 0.3:
+        node.loader = load
+    else:
+        load(node)
+    return node
+
+def loaded_paths(root):
+    """已加载节点的相对路径（由各级名称拼接，不经过索引） -> 节点"""
+    paths = {}
+    stack = [("", root)]
+    while stack:
+        rel_path, node = stack.pop()
+        paths[rel_path] = node
+        prefix = rel_path + os.sep if rel_path else ""
+        stack.extend((prefix + child.name, child) for child in node._children)
+    return paths
+
+def check_index(index, root, gone):
+    """索引的查询结果与重建的索引一致，已移除的路径查不到"""
+    rebuilt = PathIndex()
+    rebuilt.build(root)
+    expected = loaded_paths(root)
+    for rel_path, node in expected.items():
+        assert index.get(rel_path) is node, rel_path
+        assert rebuilt.get(rel_path) is node, rel_path
+        assert index.relative_path(node) == rebuilt.relative_path(node) == rel_path
+        assert index.find(node.path) is node
+    for rel_path in gone - set(expected):
+        assert index.get(rel_path) is None and rebuilt.get(rel_path) is None, rel_path
+    # 前缀查询（取部分路径的前半段，名称可以不完整）
+    for rel_path in list(expected)[:5]:
+        prefix = rel_path[:len(rel_path) // 2]
+        assert sorted(index.iter_prefix(prefix)) == sorted(rebuilt.iter_prefix(prefix)), prefix
+    assert len(index) <= len(expected)
+
+@pytest.mark.parametrize('seed', range(4))
+def test_add_remove_move_match_rebuilt_index(tmp_path, seed):
+    rng = random.Random(seed)
+    for _ in range(10):
+        root = random_subtree(rng, "root")
+        root.is_directory, root.loader = True, None
+        root._path = str(tmp_path / "root")
+        index = PathIndex()
+        index.build(root)
+        gone = set()
+        
+        for _ in range(40):
+            nodes = list(loaded_paths(root).values())
+            directories = [node for node in nodes if node.is_directory and node.is_loaded()]
+            operation = rng.choice(['add', 'remove', 'move', 'load', 'get'])
+            
+            if operation == 'add':
+                parent = rng.choice(directories)
+                node = random_subtree(rng, unused_name(rng, parent))
+                parent.add_child(node)
+                index.add(node)
+            elif operation in ('remove', 'move') and len(nodes) > 1:
+                node = rng.choice(nodes[1:])
+                subtree = loaded_paths(node)
+                old_path = index.relative_path(node)
+                gone.update(os.path.join(old_path, rel_path) if rel_path else old_path for rel_path in subtree)
+                # 实时同步先从父节点移除再更新索引，两种顺序都应可行
+                if rng.random() < 0.5:
+                    node.parent.remove_child(node)
+                    index.remove(node)
+                else:
+                    index.remove(node)
+                    node.parent.remove_child(node)
+                if operation == 'move':
+                    targets = [directory for directory in directories
+                               if directory not in subtree.values()]
+                    parent = rng.choice(targets)
+                    if rng.random() < 0.5 or node.name in {child.name for child in parent._children}:
+                        node.name = unused_name(rng, parent)
+                    parent.add_child(node)
+                    index.add(node)
+            elif operation == 'load':
+                unloaded = [node for node in nodes if not node.is_loaded()]
+                if unloaded:
+                    rng.choice(unloaded).children
+            else:
+                index.get(rng.choice(list(loaded_paths(root))))
+            
+            if rng.random() < 0.3:
+                check_index(index, root, gone)
+        check_index(index, root, gone)
+
+@pytest.fixture
+def project(tmp_path):
+    """含嵌套目录的小工程"""
+    root = tmp_path / "project"
+    (root / "src" / "pkg" / "deep").mkdir(parents=True)
+    (root / "docs").mkdir()
+    (root / "src" / "main.py").write_text("main")
+    (root / "src" / "pkg" / "mod.py").write_text("mod")
+    (root / "src" / "pkg" / "deep" / "x.txt").write_text("x")
+    (root / "docs" / "readme.md").write_text("readme")
+    return root
+
+@pytest.mark.parametrize('lazy', [False, True])
+def test_live_sync_renames_match_rebuilt_index(project, lazy):
+    processor = FileProcessor()
+    root = processor.scan_directory(str(project), [], False, lazy=lazy)
+    if lazy:
+        # 只加载部分目录
+        root.children[1].children
+    index = PathIndex()
+    index.build(root)
+    watcher = FileSystemWatcher(processor, root, on_changes=lambda paths: None, path_index=index, lazy=lazy)
+    watcher.backend = PollingBackend()
+    gone = set()
+    
+    renames = [
+        ("src/main.py", "src/app.py"),  # 文件改名
+        ("src/pkg", "src/package"),  # 目录改名
+        ("src/package/deep", "docs/deep"),  # 目录移动到另一个目录
+        ("docs/readme.md", "readme.md"),  # 文件移动到上级目录
+        ("docs", "src/docs"),  # 含已移动子目录的目录移动到同级目录之下
+    ]
+    for old, new in renames:
+        old, new = old.replace('/', os.sep), new.replace('/', os.sep)
+        gone.update(rel_path for rel_path in loaded_paths(root)
+                    if rel_path == old or rel_path.startswith(old + os.sep))
+        os.rename(project / old, project / new)
+        watcher.apply({os.path.dirname(str(project / old)), os.path.dirname(str(project / new))})
+        
+        assert index.get(new) is not None
+        check_index(index, root, gone)
\ No newline at end of file
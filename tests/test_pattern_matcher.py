@@ -0,0 +1,100 @@
+"""
+过滤模式匹配器的测试：与逐条调用fnmatch的原始实现对比
+"""
+
+import fnmatch
+import os
+import random
+import re
+import pytest
+from logic.pattern_matcher import PatternMatcher, translate_glob
+
+PATTERN_CHARS = 'ab.c/*?[]!-^\\ '
+PATTERN_POOL = [
+    'a', 'b', '*.c', '*.a.b', 'a/b', '/a', '/a/*', 'a*b', '*', '?', '[ab]', '!a', '!*.c', '!/a',
+    'b/', '.c', '*.', 'a.', '[!a]*', '!!a', '/', '!', '//', ' a ', '*b*', 'a/*', '*/b',
+]
+
+def reference_match(pattern, rel_path, filename):
+    """原先逐条调用fnmatch的匹配实现"""
+    pattern = pattern.strip()
+    if not pattern:
+        return False
+    negate = pattern.startswith('!')
+    if negate:
+        pattern = pattern[1:]
+    if pattern.endswith('/'):
+        pattern = pattern[:-1]
+    
+    if pattern.startswith('/'):
+        matched = fnmatch.fnmatch(rel_path, pattern[1:])
+    else:
+        matched = (fnmatch.fnmatch(filename, pattern) or fnmatch.fnmatch(rel_path, pattern)
+                   or fnmatch.fnmatch(rel_path, f"*/{pattern}") or fnmatch.fnmatch(rel_path, f"*/{pattern}/*"))
+    return not matched if negate else matched
+
+def random_patterns(rng, count):
+    """从常见模式中选取，夹杂随机生成的模式"""
+    return [rng.choice(PATTERN_POOL) if rng.random() < 0.7
+            else ''.join(rng.choice(PATTERN_CHARS) for _ in range(rng.randint(0, 5)))
+            for _ in range(count)]
+
+def random_path(rng):
+    """随机相对路径"""
+    return os.sep.join(''.join(rng.choice('abc.') for _ in range(rng.randint(1, 4)))
+                       for _ in range(rng.randint(1, 4)))
+
+@pytest.mark.parametrize('seed', range(4))
+def test_translate_glob_matches_fnmatch(seed):
+    rng = random.Random(seed)
+    for _ in range(5000):
+        pattern = ''.join(rng.choice(PATTERN_CHARS) for _ in range(rng.randint(0, 7)))
+        name = ''.join(rng.choice('ab.c/-!^]\\') for _ in range(rng.randint(0, 6)))
+        try:
+            expected = fnmatch.fnmatchcase(name, pattern)
+        except re.error:
+            continue
+        assert (re.fullmatch('(?s:' + translate_glob(pattern) + ')', name) is not None) == expected, (pattern, name)
+
+@pytest.mark.parametrize('seed', range(4))
+def test_matcher_matches_reference(seed):
+    rng = random.Random(seed)
+    for _ in range(1000):
+        patterns = random_patterns(rng, rng.randint(0, 4))
+        try:
+            matcher = PatternMatcher(patterns)
+            for _ in range(10):
+                rel_path = random_path(rng)
+                filename = rng.choice(['a', 'x.c', 'b']) if rng.random() < 0.1 else os.path.basename(rel_path)
+                expected = any(reference_match(pattern, rel_path, filename) for pattern in patterns)
+                assert matcher.matches(rel_path, filename) == expected, (patterns, rel_path, filename)
+        except re.error:
+            continue
+
+@pytest.mark.parametrize('seed', range(4))
+def test_scan_mode_prunes_like_full_check(seed):
+    """扫描时逐级过滤（跳过祖先检查）与对每一级做完整检查的结果一致"""
+    rng = random.Random(seed)
+    for _ in range(300):
+        patterns = [rng.choice(PATTERN_POOL) for _ in range(rng.randint(1, 4))]
+        matcher = PatternMatcher(patterns)
+        for rel_path in {random_path(rng) for _ in range(20)}:
+            parts = rel_path.split(os.sep)
+            prefixes = [os.sep.join(parts[:i]) for i in range(1, len(parts) + 1)]
+            full = any(reference_match(pattern, prefix, os.path.basename(prefix))
+                       for prefix in prefixes for pattern in patterns)
+            fast = any(matcher.matches(prefix, check_ancestors=False) for prefix in prefixes)
+            assert full == fast, (patterns, rel_path)
+
+@pytest.mark.parametrize('patterns, rel_path, expected', [
+    (['*.pyc'], os.path.join('pkg', 'mod.pyc'), True),
+    (['__pycache__/'], os.path.join('pkg', '__pycache__'), True),
+    (['/build'], 'build', True),
+    (['/build'], os.path.join('src', 'build'), False),
+    (['node_modules'], os.path.join('web', 'node_modules', 'x', 'y.js'), True),
+    (['!*.py'], 'readme.md', True),
+    (['!*.py'], 'main.py', False),
+    ([], 'main.py', False),
+])
+def test_common_patterns(patterns, rel_path, expected):
+    assert PatternMatcher(patterns).matches(rel_path) == expected
@@ -0,0 +1,115 @@
+"""
+增量扫描缓存的测试
+"""
+
+import glob
+import json
+import os
+import shutil
+import subprocess
+import time
+import pytest
+from logic.file_processor import FileProcessor
+
+PAST_NS = (int(time.time()) - 3600) * 10**9
+
+def _scan_sizes(project_path):
+    """使用增量缓存扫描，返回 文件名 -> 大小"""
+    root = FileProcessor().scan_directory(str(project_path), [], False, use_cache=True)
+    return {node.name: node.size for node, _ in root.walk() if not node.is_directory}
+
+def _age_directory(path):
+    """把目录mtime调到扫描缓存的竞态窗口之前（固定值，重复调用不改变mtime），使其列表可以被缓存"""
+    os.utime(path, ns=(PAST_NS, PAST_NS))
+
+def test_cached_listing_restats_file_sizes(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    project = tmp_path / "project"
+    project.mkdir()
+    (project / "sub").mkdir()
+    (project / "a.txt").write_bytes(b"abc")
+    (project / "sub" / "b.txt").write_bytes(b"x")
+    _age_directory(project / "sub")
+    _age_directory(project)
+    
+    assert _scan_sizes(project) == {"a.txt": 3, "b.txt": 1}
+    assert os.listdir(tmp_path / "runtime" / "scan_cache")
+    
+    # 修改文件内容不改变目录mtime，缓存的列表会被复用
+    (project / "a.txt").write_bytes(b"a" * 1000)
+    (project / "sub" / "b.txt").write_bytes(b"y" * 20)
+    _age_directory(project / "sub")
+    _age_directory(project)
+    
+    assert _scan_sizes(project) == {"a.txt": 1000, "b.txt": 20}
+
+def test_cached_listing_picks_up_new_files(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    project = tmp_path / "project"
+    project.mkdir()
+    (project / "a.txt").write_bytes(b"abc")
+    _age_directory(project)
+    
+    assert _scan_sizes(project) == {"a.txt": 3}
+    
+    (project / "b.txt").write_bytes(b"12345")
+    
+    assert _scan_sizes(project) == {"a.txt": 3, "b.txt": 5}
+
+
+def _cached_directories(tmp_path):
+    """缓存文件中记录的目录键"""
+    files = glob.glob(str(tmp_path / "runtime" / "scan_cache" / "*.json"))
+    if not files:
+        return set()
+    assert len(files) == 1
+    with open(files[0], encoding='utf-8') as f:
+        return set(json.load(f)['directories'])
+
+@pytest.fixture
+def cached_project(tmp_path, monkeypatch):
+    """6个目录的工程，已完整扫描一次并写入缓存"""
+    monkeypatch.chdir(tmp_path)
+    project = tmp_path / "project"
+    for directory in ["a/b", "a/c", "d/e"]:
+        (project / directory).mkdir(parents=True)
+    for directory in ["a/b", "a/c", "d/e", "a"]:
+        (project / directory / "f.txt").write_text("x")
+    for path, _, _ in os.walk(project, topdown=False):
+        _age_directory(path)
+    
+    FileProcessor().scan_directory(str(project), [], False, use_cache=True)
+    assert len(_cached_directories(tmp_path)) == 6
+    return project
+
+@pytest.mark.parametrize('scan_options', [
+    {'lazy': True},
+    {'max_depth': 1},
+    {'processes': 2},
+    {'max_nodes': 4},
+], ids=['lazy', 'max_depth', 'sharded', 'max_nodes'])
+def test_partial_scan_keeps_cached_directories(cached_project, tmp_path, scan_options):
+    before = _cached_directories(tmp_path)
+    FileProcessor().scan_directory(str(cached_project), [], False, use_cache=True, **scan_options)
+    assert _cached_directories(tmp_path) == before
+
+@pytest.mark.skipif(shutil.which('git') is None, reason="需要git")
+def test_git_source_scan_keeps_cached_directories(cached_project, tmp_path):
+    subprocess.run(['git', 'init', '-q', str(cached_project)], check=True)
+    subprocess.run(['git', '-C', str(cached_project), 'add', '-A'], check=True)
+    _age_directory(cached_project)
+    
+    # git init 修改了工程根目录，重新完整扫描一次
+    FileProcessor().scan_directory(str(cached_project), ['.git/'], False, use_cache=True)
+    before = _cached_directories(tmp_path)
+    assert len(before) == 6
+    
+    FileProcessor().scan_directory(str(cached_project), ['.git/'], False, use_cache=True, source='git')
+    assert _cached_directories(tmp_path) == before
+
+def test_full_scan_drops_removed_directories(cached_project, tmp_path):
+    shutil.rmtree(cached_project / "d")
+    _age_directory(cached_project)
+    
+    FileProcessor().scan_directory(str(cached_project), [], False, use_cache=True)
+    assert _cached_directories(tmp_path) == {".", "a", os.path.join("a", "b"), os.path.join("a", "c")}
\ No newline at end of file
@@ -0,0 +1,110 @@
+"""
+扫描中止与限制的测试
+
+取消、节点数上限、时间上限和深度上限下，检查中止原因、节点数，
+以及 truncated 标记恰好落在未完整列出的目录上：未标记的目录子节点与磁盘一致，
+标记的目录子节点是磁盘上的一部分（或尚未列出）。
+"""
+
+import os
+import threading
+import time
+import pytest
+from logic.file_processor import FileProcessor
+
+MODES = {
+    'serial': {},
+    'threads': {'workers': 4},
+    'processes': {'processes': 2},
+}
+
+@pytest.fixture
+def project(tmp_path):
+    """4个目录，每个含5个文件和一个子目录（3个文件和一个空目录）"""
+    root = tmp_path / "project"
+    for d in range(4):
+        directory = root / f"dir_{d}"
+        (directory / "sub" / "empty").mkdir(parents=True)
+        for i in range(5):
+            (directory / f"file_{i}.txt").write_text("x" * i)
+        for i in range(3):
+            (directory / "sub" / f"inner_{i}.txt").write_text("y")
+    return root
+
+FULL_COUNT = 1 + 4 * (1 + 5 + 1 + 3 + 1)
+
+def scan(project, **options):
+    """扫描并返回 (处理器, 根节点)"""
+    processor = FileProcessor()
+    root = processor.scan_directory(str(project), [], False, batch_size=3, **options)
+    return processor, root
+
+def check_truncation(root):
+    """检查每个目录的truncated标记与其子节点是否完整一致，返回被标记的目录"""
+    truncated = []
+    for node, _ in root.walk():
+        if not node.is_directory:
+            continue
+        names = [child.name for child in node.children]
+        on_disk = sorted(os.listdir(node.path))
+        assert set(names) <= set(on_disk), node.path
+        if node.truncated:
+            truncated.append(node)
+            # 已列出的目录一定缺少条目；完全没有列出的目录可以为空
+            assert names != on_disk or not names, node.path
+        else:
+            assert names == on_disk, node.path
+    return truncated
+
+@pytest.mark.parametrize("mode", MODES)
+def test_full_scan_has_no_truncated_directories(project, mode):
+    processor, root = scan(project, **MODES[mode])
+    assert processor.scan_stop_reason is None
+    assert root.node_count == FULL_COUNT
+    assert check_truncation(root) == []
+
+@pytest.mark.parametrize("mode", MODES)
+def test_cancel(project, mode):
+    cancel_event = threading.Event()
+    processor, root = scan(project, cancel_event=cancel_event,
+                           on_batch=lambda batch: cancel_event.set(), **MODES[mode])
+    assert processor.scan_stop_reason == 'cancelled'
+    assert root.node_count < FULL_COUNT
+    assert check_truncation(root)
+
+@pytest.mark.parametrize("mode", MODES)
+@pytest.mark.parametrize("max_nodes", [1, 2, 7, 20, FULL_COUNT - 1])
+def test_max_nodes(project, mode, max_nodes):
+    processor, root = scan(project, max_nodes=max_nodes, **MODES[mode])
+    assert processor.scan_stop_reason == 'max_nodes'
+    assert root.node_count == max_nodes
+    assert check_truncation(root)
+
+@pytest.mark.parametrize("mode", MODES)
+def test_max_nodes_not_reached(project, mode):
+    processor, root = scan(project, max_nodes=FULL_COUNT + 1, **MODES[mode])
+    assert processor.scan_stop_reason is None
+    assert root.node_count == FULL_COUNT
+    assert check_truncation(root) == []
+
+@pytest.mark.parametrize("mode", MODES)
+def test_max_time(project, mode):
+    # 第一批产出后等待超过时间上限，之后的第一个节点触发中止
+    processor, root = scan(project, max_time=0.01, on_batch=lambda batch: time.sleep(0.05),
+                           **MODES[mode])
+    assert processor.scan_stop_reason == 'max_time'
+    assert root.node_count < FULL_COUNT
+    assert check_truncation(root)
+
+@pytest.mark.parametrize("mode", MODES)
+@pytest.mark.parametrize("max_depth", [0, 1, 2, 3])
+def test_max_depth(project, mode, max_depth):
+    processor, root = scan(project, max_depth=max_depth, **MODES[mode])
+    assert processor.scan_stop_reason is None
+    
+    truncated = check_truncation(root)
+    # 恰好位于max_depth的目录被标记且没有列出，更浅的目录都完整
+    at_limit = [node for node, depth in root.walk() if node.is_directory and depth == max_depth]
+    assert truncated == at_limit
+    assert all(not node.children for node in truncated)
+    assert all(depth <= max_depth for _, depth in root.walk())
\ No newline at end of file
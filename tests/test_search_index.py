@@ -0,0 +1,64 @@
+"""
+名称搜索索引的测试
+"""
+
+import os
+from data.search_index import SearchIndex, rank_nodes
+from data.tree_node import TreeNode
+from logic.file_processor import FileProcessor
+
+def build_tree(files_per_directory=40, directories=3):
+    """每个目录下有若干同名和不同名的文件"""
+    root = TreeNode("root", os.path.join(os.sep, "project", "root"), is_directory=True)
+    for d in range(directories):
+        directory = TreeNode(f"pkg_{d}", None, is_directory=True)
+        root.add_child(directory)
+        directory.add_child(TreeNode("__init__.py", None))
+        for i in range(files_per_directory):
+            directory.add_child(TreeNode(f"module_{i}.py", None))
+    return root
+
+def test_unlimited_search_with_index_returns_every_match():
+    root = build_tree()
+    index = SearchIndex()
+    index.build(root)
+    processor = FileProcessor()
+    
+    expected = processor.search_in_tree(root, "module", limit=None)
+    assert len(expected) == 120
+    results = processor.search_in_tree(root, "module", limit=None, search_index=index)
+    assert len(results) == 120
+    assert set(results) == set(expected)
+    
+    assert len(processor.search_in_tree(root, "module", limit=10, search_index=index)) == 10
+    assert len(index.search("module")) == 50
+
+def test_unlimited_path_search_returns_every_match():
+    root = build_tree()
+    index = SearchIndex()
+    index.build(root)
+    query = "pkg_1" + os.sep + "mod"
+    results = index.search(query, None)
+    assert len(results) == 40
+    assert all(node.parent.name == "pkg_1" for node in results)
+
+def test_unlimited_search_covers_directories_loaded_after_build():
+    source = build_tree()
+    root = TreeNode("root", source.path, is_directory=True)
+    
+    def load_children(node):
+        for child in source.children:
+            copy = TreeNode(child.name, None, is_directory=True)
+            node.add_child(copy)
+            for leaf in child.children:
+                copy.add_child(TreeNode(leaf.name, None))
+    
+    root.loader = load_children
+    index = SearchIndex()
+    index.build(root)
+    assert len(index) == 1
+    
+    root.children  # 展开根目录
+    results = index.search("module", None)
+    assert len(results) == 120
+    assert set(results) == set(rank_nodes((node for node, _ in root.walk()), "module", None))
@@ -0,0 +1,184 @@
+"""
+工程快照的测试
+"""
+
+import os
+import pytest
+from data.project_model import ProjectModel
+from logic.file_processor import FileProcessor
+from logic.fs_watcher import FileSystemWatcher, PollingBackend
+from logic.snapshot import HEADER, MappedSnapshot, ProjectSnapshot
+
+COLUMNS = ('parent', 'first_child', 'next_sibling', 'name_offset', 'size', 'flags')
+
+@pytest.fixture
+def project(tmp_path):
+    """含嵌套目录、非ASCII名称和不同大小文件的工程"""
+    root = tmp_path / "project"
+    for directory in ["src/core", "src/中文", "docs", "empty"]:
+        (root / directory).mkdir(parents=True)
+    for i, path in enumerate(["src/core/a.py", "src/core/b.py", "src/中文/说明.md", "docs/readme.md", "setup.py"]):
+        (root / path).write_bytes(b"x" * (i * 10))
+    return root
+
+def tree_signature(root):
+    """文件树中各节点的名称、层级、类型、大小、描述和子树汇总"""
+    return [(node.name, depth, node.is_directory, node.size, node.description, node.truncated,
+             node.total_size, node.file_count, node.dir_count,
+             dict(node.ext_counts) if node.ext_counts is not None else None, node.height)
+            for node, depth in root.walk(loaded_only=True)]
+
+def make_model(project, **scan_options):
+    """扫描工程，并为部分节点填写描述"""
+    model = ProjectModel()
+    model.set_project_path(str(project))
+    model.filter_conditions = ["*.pyc"]
+    model.set_lazy_load(scan_options.get('lazy', False))
+    root = FileProcessor().scan_directory(str(project), model.filter_conditions, False, **scan_options)
+    model.set_root_node(root)
+    for index, (node, _) in enumerate(root.walk(loaded_only=True)):
+        if index % 2:
+            node.description = f"描述 {node.name}\n第二行"
+    return model
+
+def save(model, path):
+    """保存快照"""
+    saved_path, message = ProjectSnapshot().save(model, str(path))
+    assert saved_path, message
+    return str(path)
+
+def test_tree_round_trip(project, tmp_path):
+    model = make_model(project)
+    snapshot_path = save(model, tmp_path / "project.snap")
+    
+    restored = ProjectModel()
+    meta = ProjectSnapshot().restore(restored, snapshot_path)
+    
+    assert meta['project_path'] == str(project)
+    assert restored.project_path == str(project)
+    assert restored.filter_conditions == ["*.pyc"]
+    assert restored.root_node.path == model.root_node.path
+    assert tree_signature(restored.root_node) == tree_signature(model.root_node)
+    assert restored.find_node(os.path.join("src", "中文", "说明.md")) is not None
+
+def test_compact_round_trip(project, tmp_path):
+    store = FileProcessor().scan_to_store(str(project))
+    store.descriptions[1] = "紧凑存储的描述"
+    model = ProjectModel()
+    model.set_project_path(str(project))
+    model.set_tree_store(store)
+    snapshot_path = save(model, tmp_path / "compact.snap")
+    
+    restored = ProjectModel()
+    ProjectSnapshot().restore(restored, snapshot_path)
+    
+    assert restored.tree_store is not None
+    for column in COLUMNS:
+        assert getattr(restored.tree_store, column) == getattr(store, column)
+    assert restored.tree_store.names == store.names
+    assert restored.tree_store.descriptions == store.descriptions
+
+def test_lazy_round_trip_reattaches_loaders(project, tmp_path):
+    model = make_model(project, lazy=True)
+    model.root_node.children  # 只加载根目录
+    snapshot_path = save(model, tmp_path / "lazy.snap")
+    
+    restored = ProjectModel()
+    ProjectSnapshot().restore(restored, snapshot_path, FileProcessor())
+    
+    assert tree_signature(restored.root_node) == tree_signature(model.root_node)
+    src = next(child for child in restored.root_node.children if child.name == "src")
+    assert not src.is_loaded()
+    assert [child.name for child in src.children] == ["core", "中文"]
+
+def test_corrupted_snapshot_fails_checksum(project, tmp_path):
+    snapshot_path = save(make_model(project), tmp_path / "project.snap")
+    with open(snapshot_path, 'rb') as f:
+        data = bytearray(f.read())
+    data[HEADER.size + 3] ^= 0x01
+    with open(snapshot_path, 'wb') as f:
+        f.write(data)
+    
+    with pytest.raises(ValueError):
+        ProjectSnapshot().load(snapshot_path)
+    with pytest.raises(ValueError):
+        MappedSnapshot(snapshot_path, verify=True)
+    # 不校验时仍可读取
+    ProjectSnapshot().load(snapshot_path, verify=False)
+
+@pytest.mark.parametrize('corrupt', [
+    lambda data: data[:HEADER.size - 1],
+    lambda data: data[:-8],
+    lambda data: b'NOTSNAP\0' + data[8:],
+    lambda data: data[:8] + (99).to_bytes(2, 'little') + data[10:],
+], ids=['short-header', 'truncated', 'magic', 'version'])
+def test_invalid_snapshot_is_rejected(project, tmp_path, corrupt):
+    snapshot_path = save(make_model(project), tmp_path / "project.snap")
+    with open(snapshot_path, 'rb') as f:
+        data = f.read()
+    with open(snapshot_path, 'wb') as f:
+        f.write(corrupt(data))
+    
+    with pytest.raises(ValueError):
+        ProjectSnapshot().load(snapshot_path, verify=False)
+
+def test_snapshot_without_checksum(project, tmp_path):
+    model = make_model(project)
+    snapshot_path = str(tmp_path / "project.snap")
+    ProjectSnapshot().save(model, snapshot_path, checksum=False)
+    
+    restored = ProjectModel()
+    ProjectSnapshot().restore(restored, snapshot_path)
+    assert tree_signature(restored.root_node) == tree_signature(model.root_node)
+
+def test_mapped_snapshot_matches_loaded_store(project, tmp_path):
+    snapshot_path = save(make_model(project), tmp_path / "project.snap")
+    meta, store = ProjectSnapshot().load(snapshot_path)
+    
+    with MappedSnapshot(snapshot_path, verify=True) as snapshot:
+        assert snapshot.meta == meta
+        for column in COLUMNS:
+            assert list(getattr(snapshot.store, column)) == list(getattr(store, column))
+        assert dict(snapshot.store.descriptions) == store.descriptions
+        assert tree_signature(snapshot.store.to_tree()) == tree_signature(store.to_tree())
+        
+        model = snapshot.to_project_model()
+        assert model.project_path == str(project)
+    
+    restored = ProjectModel()
+    ProjectSnapshot().restore(restored, snapshot_path, mapped=True)
+    assert tree_signature(restored.root_node) == tree_signature(store.to_tree())
+
+
+@pytest.mark.parametrize('lazy', [False, True], ids=['full', 'lazy'])
+def test_restored_filters_apply_to_live_sync(project, tmp_path, lazy):
+    for directory in [".git/objects", "node_modules/pkg", "build"]:
+        (project / directory).mkdir(parents=True)
+        (project / directory / "file.txt").write_text("x")
+    (project / ".gitignore").write_text("build/\n")
+    
+    model = ProjectModel()
+    model.set_project_path(str(project))
+    model.filter_conditions = [".git/", "node_modules/"]
+    model.set_use_gitignore(True)
+    model.set_lazy_load(lazy)
+    model.set_root_node(FileProcessor().scan_directory(str(project), model.filter_conditions, True, lazy=lazy))
+    model.root_node.children  # 按需加载模式下先加载根目录
+    snapshot_path = save(model, tmp_path / "project.snap")
+    
+    # 恢复时使用未扫描过的处理器（过滤引擎为空）
+    processor = FileProcessor()
+    restored = ProjectModel()
+    ProjectSnapshot().restore(restored, snapshot_path, processor)
+    root = restored.root_node
+    
+    watcher = FileSystemWatcher(processor, root, on_changes=lambda paths: None,
+                                path_index=restored.path_index, search_index=restored.search_index)
+    watcher.backend = PollingBackend()
+    (project / "new.txt").write_text("new")
+    changes = watcher.apply({root.path})
+    
+    assert [(action, node.name) for action, _, node in changes] == [("added", "new.txt")]
+    names = {child.name for child in root.children}
+    assert {".git", "node_modules", "build"}.isdisjoint(names)
+    assert "new.txt" in names
\ No newline at end of file
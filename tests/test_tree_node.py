@@ -0,0 +1,129 @@
+"""
+文件树节点增量汇总的测试
+
+随机增删、移动节点并修改文件大小，将增量维护的汇总（总大小、文件数、目录数、扩展名计数）
+和子树层数与完整重新计算的结果比较。
+"""
+
+import random
+from collections import Counter
+import pytest
+from data.tree_node import TreeNode
+
+EXTENSIONS = ('.py', '.md', '.txt', '')
+
+def recompute(node):
+    """完整遍历子树重新计算汇总和层数"""
+    files = []
+    directories = 0
+    height = 0
+    for current, depth in node.walk():
+        height = max(height, depth + 1)
+        if current.is_directory:
+            directories += 1
+        else:
+            files.append(current)
+    ext_counts = dict(Counter(f.get_extension() for f in files)) if node.is_directory else None
+    return {
+        'total_size': sum(f.size for f in files),
+        'file_count': len(files),
+        'dir_count': directories,
+        'ext_counts': ext_counts,
+        'height': height,
+    }
+
+def maintained(node):
+    """增量维护的汇总和层数"""
+    return {
+        'total_size': node.total_size,
+        'file_count': node.file_count,
+        'dir_count': node.dir_count,
+        'ext_counts': dict(node.ext_counts) if node.ext_counts is not None else None,
+        'height': node.height,
+    }
+
+def check_tree(root):
+    """比较树中每个节点的增量汇总与重新计算的结果"""
+    for node, _ in root.walk():
+        # 先重新计算（按需加载的目录在此时加载），再读取增量汇总
+        expected = recompute(node)
+        assert maintained(node) == expected, node.path
+        assert node.node_count == node.file_count + node.dir_count
+
+def random_node(rng, root, directories_only=False):
+    """随机选取一个节点"""
+    nodes = [node for node, _ in root.walk() if node.is_directory or not directories_only]
+    return rng.choice(nodes)
+
+def is_ancestor(node, other):
+    """node是否为other本身或其祖先"""
+    while other is not None:
+        if other is node:
+            return True
+        other = other.parent
+    return False
+
+@pytest.mark.parametrize("seed", range(8))
+def test_incremental_rollups_match_recomputation(seed):
+    rng = random.Random(seed)
+    root = TreeNode("root", "/project", is_directory=True)
+    detached = []
+    counter = 0
+    
+    for step in range(300):
+        operation = rng.choices(["add_file", "add_dir", "remove", "move", "resize", "reattach"],
+                                weights=[5, 2, 2, 2, 2, 1])[0]
+        if operation in ("add_file", "add_dir"):
+            counter += 1
+            is_directory = operation == "add_dir"
+            name = f"n{counter}" + ("" if is_directory else rng.choice(EXTENSIONS))
+            node = TreeNode(name, None, is_directory=is_directory)
+            if not is_directory:
+                node.size = rng.randrange(1000)
+            random_node(rng, root, directories_only=True).add_child(node)
+        elif operation == "remove":
+            node = random_node(rng, root)
+            if node is not root:
+                node.parent.remove_child(node)
+                detached.append(node)
+        elif operation == "move":
+            node = random_node(rng, root)
+            target = random_node(rng, root, directories_only=True)
+            if node is not root and not is_ancestor(node, target):
+                node.parent.remove_child(node)
+                target.add_child(node)
+        elif operation == "resize":
+            node = random_node(rng, root)
+            if not node.is_directory:
+                node.size = rng.randrange(1000)
+        elif detached:
+            # 移除后的子树重新挂接到树中
+            node = detached.pop(rng.randrange(len(detached)))
+            random_node(rng, root, directories_only=True).add_child(node)
+        
+        # 间隔检查，使层数既有已缓存的也有失效后重新计算的
+        if step % 7 == 0 or rng.random() < 0.2:
+            check_tree(root)
+    
+    check_tree(root)
+    for node in detached:
+        check_tree(node)
+
+def test_rollups_follow_lazy_loading():
+    def load(node):
+        for i in range(3):
+            child = TreeNode(f"f{i}.py", None)
+            child.size = 10
+            node.add_child(child)
+        sub = TreeNode("sub", None, is_directory=True)
+        sub.loader = load if node.name == "root" else None
+        node.add_child(sub)
+    
+    root = TreeNode("root", "/project", is_directory=True)
+    root.loader = load
+    assert maintained(root)['file_count'] == 0
+    
+    # 访问children触发加载，汇总和层数随之更新
+    check_tree(root)
+    assert maintained(root) == {'total_size': 60, 'file_count': 6, 'dir_count': 3,
+                                'ext_counts': {'.py': 6}, 'height': 3}
@@ -0,0 +1,151 @@
+"""
+列式存储扫描的测试：在随机生成的目录树上，scan_to_store 与 scan_directory 的结果对比
+（遍历、to_dict、各目录的统计和导出内容），以及取消、节点数上限和时间上限
+"""
+
+import os
+import random
+import threading
+import time
+import pytest
+from data.project_model import ProjectModel
+from data.tree_store import TreeStore
+from logic.exporter import Exporter
+from logic.file_processor import FileProcessor
+
+DIRECTORY_NAMES = ['src', 'lib', 'node_modules', 'build', 'docs', '数据']
+FILE_NAMES = ['main.py', 'a.pyc', 'README', 'x.min.js', 'b.Log', '说明.md', 'c.tar.gz', '.env']
+PATTERN_POOL = ['*.pyc', 'node_modules/', '/build', '*.log', 'docs/*.md', '.env']
+
+def random_tree(rng, base, max_depth=4):
+    """在base下随机生成目录树，部分目录含.gitignore"""
+    os.makedirs(base)
+    stack = [(base, 0)]
+    while stack:
+        directory, depth = stack.pop()
+        if rng.random() < 0.2:
+            with open(os.path.join(directory, '.gitignore'), 'w') as f:
+                f.write('\n'.join(rng.sample(PATTERN_POOL, 2)) + '\n')
+        for _ in range(rng.randint(0, 5)):
+            if depth < max_depth and rng.random() < 0.4:
+                path = os.path.join(directory, rng.choice(DIRECTORY_NAMES))
+                if not os.path.exists(path):
+                    os.mkdir(path)
+                    stack.append((path, depth + 1))
+            else:
+                path = os.path.join(directory, rng.choice(FILE_NAMES))
+                if not os.path.exists(path):
+                    with open(path, 'w') as f:
+                        f.write('x' * rng.randint(0, 300))
+
+def walk_signature(root):
+    """先序遍历中每个节点的路径、深度、类型、大小和截断标记"""
+    return [(node.path, depth, node.is_directory, node.size, node.truncated) for node, depth in root.walk()]
+
+def stats_signature(root):
+    """每个目录的子树汇总"""
+    return [(node.path, node.total_size, node.file_count, node.dir_count, node.ext_counts,
+             node.height, node.node_count) for node, _ in root.walk() if node.is_directory]
+
+def make_model(base, tree):
+    """以TreeNode文件树或TreeStore创建项目模型"""
+    model = ProjectModel()
+    model.set_project_path(base)
+    if isinstance(tree, TreeStore):
+        model.set_tree_store(tree)
+    else:
+        model.set_root_node(tree)
+    return model
+
+def exports(model, tmp_path):
+    """JSON导出的文件结构、Markdown和Cursor rules内容（去掉导出时间）"""
+    exporter = Exporter()
+    output_path, message = exporter.export_to_json(model, str(tmp_path / "export.json"))
+    assert output_path, message
+    with open(output_path, encoding='utf-8') as f:
+        structure = f.read().split('"structure"', 1)[1]
+    markdown = [line for line in exporter._build_markdown_content(model).splitlines() if '导出时间' not in line]
+    return structure, markdown, exporter._build_cursor_rules_content(model)
+
+@pytest.mark.parametrize('seed', range(4))
+def test_store_matches_tree(tmp_path, seed):
+    rng = random.Random(seed)
+    for case in range(10):
+        base = str(tmp_path / f"case_{case}")
+        random_tree(rng, base)
+        patterns = rng.sample(PATTERN_POOL, rng.randint(0, 2))
+        options = {'use_gitignore': rng.random() < 0.5, 'max_depth': rng.choice([None, None, 1, 2])}
+        
+        processor = FileProcessor()
+        root = processor.scan_directory(base, patterns, **options)
+        store = processor.scan_to_store(base, patterns, **options)
+        view = store.root()
+        
+        assert walk_signature(view) == walk_signature(root)
+        assert view.to_dict() == root.to_dict()
+        assert stats_signature(view) == stats_signature(root)
+        assert exports(make_model(base, store), tmp_path) == exports(make_model(base, root), tmp_path)
+
+@pytest.fixture
+def project(tmp_path):
+    """4个目录，每个含5个文件和一个子目录（3个文件和一个空目录）"""
+    root = tmp_path / "project"
+    for d in range(4):
+        directory = root / f"dir_{d}"
+        (directory / "sub" / "empty").mkdir(parents=True)
+        for i in range(5):
+            (directory / f"file_{i}.txt").write_text("x" * i)
+        for i in range(3):
+            (directory / "sub" / f"inner_{i}.txt").write_text("y")
+    return root
+
+FULL_COUNT = 1 + 4 * (1 + 5 + 1 + 3 + 1)
+
+def check_truncation(store):
+    """检查每个目录的截断标记与其子节点是否完整一致，返回被标记的目录数"""
+    truncated = 0
+    for node, _ in store.root().walk():
+        if not node.is_directory:
+            continue
+        names = [child.name for child in node.children]
+        on_disk = sorted(os.listdir(node.path))
+        if node.truncated:
+            truncated += 1
+            assert names != on_disk or not names, node.path
+            assert set(names) <= set(on_disk), node.path
+        else:
+            assert names == on_disk, node.path
+    return truncated
+
+@pytest.mark.parametrize('max_nodes', [1, 2, 7, 20, FULL_COUNT - 1])
+def test_max_nodes(project, max_nodes):
+    processor = FileProcessor()
+    store = processor.scan_to_store(str(project), max_nodes=max_nodes)
+    assert processor.scan_stop_reason == 'max_nodes'
+    assert len(store) == max_nodes
+    assert check_truncation(store)
+
+def test_max_nodes_not_reached(project):
+    processor = FileProcessor()
+    store = processor.scan_to_store(str(project), max_nodes=FULL_COUNT + 1)
+    assert processor.scan_stop_reason is None
+    assert len(store) == FULL_COUNT
+    assert check_truncation(store) == 0
+
+def test_max_time(project):
+    # 第一次进度回调时等待超过时间上限，之后的第一个节点触发中止
+    processor = FileProcessor()
+    store = processor.scan_to_store(str(project), max_time=0.01, progress_interval=3,
+                                    on_progress=lambda count: time.sleep(0.05))
+    assert processor.scan_stop_reason == 'max_time'
+    assert len(store) < FULL_COUNT
+    assert check_truncation(store)
+
+def test_cancel(project):
+    cancel_event = threading.Event()
+    processor = FileProcessor()
+    store = processor.scan_to_store(str(project), cancel_event=cancel_event, progress_interval=5,
+                                    on_progress=lambda count: cancel_event.set())
+    assert processor.scan_stop_reason == 'cancelled'
+    assert len(store) == 5
+    assert check_truncation(store)
\ No newline at end of file
@@ -5,18 +5,25 @@
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox
 import os
+from logic.filter_engine import FilterEngine
 
 class ConfigView:
     """配置界面类"""
     
-    def __init__(self, root, on_start_scan, on_back_to_main):
+    def __init__(self, root, on_start_scan, on_back_to_main, on_open_snapshot=None):
         self.root = root
         self.on_start_scan = on_start_scan
         self.on_back_to_main = on_back_to_main
+        self.on_open_snapshot = on_open_snapshot
         
         # 配置变量
         self.project_path = tk.StringVar()
         self.use_gitignore = tk.BooleanVar(value=False)
+        self.lazy_load = tk.BooleanVar(value=False)
+        self.use_git_index = tk.BooleanVar(value=False)
+        self.collect_filter_stats = tk.BooleanVar(value=False)
+        self.include_conditions = tk.StringVar()
+        self.compact_store = tk.BooleanVar(value=False)
         self.filter_conditions = []
         
         self.setup_ui()
@@ -78,6 +85,54 @@ class ConfigView:
         )
         self.gitignore_checkbox.grid(row=0, column=0, sticky=tk.W)
         
+        # 按需加载选项
+        self.lazy_checkbox = ttk.Checkbutton(
+            gitignore_frame,
+            text="按需加载（适用于超大目录，展开时才读取子目录）",
+            variable=self.lazy_load
+        )
+        self.lazy_checkbox.grid(row=1, column=0, sticky=tk.W)
+        
+        # git索引选项
+        self.git_index_checkbox = ttk.Checkbutton(
+            gitignore_frame,
+            text="从 git 索引读取（仅列出已跟踪的文件，无需遍历目录）",
+            variable=self.use_git_index
+        )
+        self.git_index_checkbox.grid(row=2, column=0, sticky=tk.W)
+        
+        # 过滤统计选项
+        self.filter_stats_checkbox = ttk.Checkbutton(
+            gitignore_frame,
+            text="统计各过滤条件的匹配开销（扫描较慢，被排除的目录如 node_modules 仍会完整遍历）",
+            variable=self.collect_filter_stats
+        )
+        self.filter_stats_checkbox.grid(row=3, column=0, sticky=tk.W)
+        
+        # 紧凑存储选项
+        self.compact_store_checkbox = ttk.Checkbutton(
+            gitignore_frame,
+            text="紧凑存储（适用于数百万文件的超大工程，不支持实时同步）",
+            variable=self.compact_store
+        )
+        self.compact_store_checkbox.grid(row=4, column=0, sticky=tk.W)
+        
+        row += 1
+        
+        # 包含条件
+        ttk.Label(main_frame, text="包含条件:").grid(row=row, column=0, sticky=(tk.W, tk.N), pady=5)
+        
+        include_frame = ttk.Frame(main_frame)
+        include_frame.grid(row=row, column=1, columnspan=2, sticky=(tk.W, tk.E), pady=5)
+        include_frame.columnconfigure(0, weight=1)
+        
+        self.include_entry = ttk.Entry(include_frame, textvariable=self.include_conditions)
+        self.include_entry.grid(row=0, column=0, sticky=(tk.W, tk.E))
+        
+        include_help_text = "可选，只显示匹配的文件和目录，多个条件用空格分隔（如 **/*.proto services/*/api/）"
+        include_help = ttk.Label(include_frame, text=include_help_text, font=("Arial", 8), foreground="gray")
+        include_help.grid(row=1, column=0, sticky=tk.W, pady=(5, 0))
+        
         row += 1
         
         # 过滤条件
@@ -105,6 +160,11 @@ class ConfigView:
         back_button = ttk.Button(button_frame, text="返回", command=self.on_back_click)
         back_button.grid(row=0, column=0, padx=(0, 10))
         
+        # 打开快照按钮
+        if self.on_open_snapshot:
+            snapshot_button = ttk.Button(button_frame, text="打开快照...", command=self.on_open_snapshot_click)
+            snapshot_button.grid(row=0, column=1, sticky=tk.W)
+        
         # 开始按钮
         self.start_button = ttk.Button(
             button_frame, 
@@ -167,12 +227,14 @@ class ConfigView:
         """处理gitignore选项变化"""
         if self.use_gitignore.get() and self.project_path.get():
             self.load_gitignore_filters()
-        elif not self.use_gitignore.get():
-            # 如果取消勾选，移除gitignore相关的过滤条件
-            self.load_default_filters()
     
     def load_gitignore_filters(self):
-        """加载.gitignore过滤条件"""
+        """
+        检查.gitignore规则
+        
+        规则不再合并到过滤条件中：扫描时按git的语义逐级加载各目录的.gitignore
+        以及.git/info/exclude，这里只报告根目录.gitignore的规则数。
+        """
         project_path = self.project_path.get()
         if not project_path:
             return
@@ -181,30 +243,17 @@ class ConfigView:
         
         if os.path.exists(gitignore_path):
             try:
-                with open(gitignore_path, 'r', encoding='utf-8') as f:
-                    gitignore_content = f.read()
-                
-                # 解析gitignore内容
-                gitignore_patterns = []
-                for line in gitignore_content.splitlines():
-                    line = line.strip()
-                    if line and not line.startswith('#'):
-                        gitignore_patterns.append(line)
-                
-                # 合并默认过滤条件和gitignore条件
-                default_filters = self.get_default_filters()
-                all_filters = default_filters + ["# .gitignore 规则:"] + gitignore_patterns
-                
-                # 更新文本框
-                self.filter_text.delete(1.0, tk.END)
-                self.filter_text.insert(1.0, "\n".join(all_filters))
-                
-                messagebox.showinfo("成功", f"已加载 .gitignore 文件，共 {len(gitignore_patterns)} 条规则")
+                gitignore_patterns = FilterEngine().load_gitignore(project_path)
+                messagebox.showinfo(
+                    "成功",
+                    f"已加载 .gitignore 文件，共 {len(gitignore_patterns)} 条规则\n"
+                    "扫描时还会应用子目录中的 .gitignore 和 .git/info/exclude"
+                )
                 
             except Exception as e:
                 messagebox.showerror("错误", f"读取 .gitignore 文件失败: {str(e)}")
         else:
-            messagebox.showwarning("提示", "在指定目录中未找到 .gitignore 文件")
+            messagebox.showwarning("提示", "在指定目录中未找到 .gitignore 文件，扫描时仍会应用子目录中的 .gitignore")
     
     def load_default_filters(self):
         """加载默认过滤条件"""
@@ -258,6 +307,10 @@ class ConfigView:
         
         return conditions
     
+    def get_include_conditions(self):
+        """获取包含条件列表"""
+        return self.include_conditions.get().split()
+    
     def on_start_click(self):
         """处理开始按钮点击"""
         project_path = self.project_path.get().strip()
@@ -277,10 +330,25 @@ class ConfigView:
         # 获取配置
         filter_conditions = self.get_filter_conditions()
         use_gitignore = self.use_gitignore.get()
+        lazy = self.lazy_load.get()
+        source = 'git' if self.use_git_index.get() else 'filesystem'
+        collect_filter_stats = self.collect_filter_stats.get()
+        include_conditions = self.get_include_conditions()
+        compact = self.compact_store.get()
         
         # 调用回调函数
         if self.on_start_scan:
-            self.on_start_scan(project_path, filter_conditions, use_gitignore)
+            self.on_start_scan(project_path, filter_conditions, use_gitignore, lazy, source,
+                               collect_filter_stats, include_conditions, compact)
+    
+    def on_open_snapshot_click(self):
+        """处理打开快照按钮点击"""
+        file_path = filedialog.askopenfilename(
+            title="打开工程快照",
+            filetypes=[("Project snapshot", "*.snap"), ("All files", "*.*")]
+        )
+        if file_path:
+            self.on_open_snapshot(file_path)
     
     def on_back_click(self):
         """处理返回按钮点击"""
@@ -6,24 +6,38 @@ import tkinter as tk
 from tkinter import ttk, filedialog, messagebox
 import os
 from logic.exporter import Exporter
+from logic.fs_watcher import FileSystemWatcher
+from logic.snapshot import ProjectSnapshot
 from utils.logger import logger
+from utils.utils import Utils
 
 
 class ProjectView:
     """工程运维界面类"""
     
-    def __init__(self, root, project_model, on_back_to_config):
+    def __init__(self, root, project_model, on_back_to_config, file_processor=None):
         self.root = root
         self.project_model = project_model
         self.on_back_to_config = on_back_to_config
+        self.file_processor = file_processor
         self.exporter = Exporter()
         
+        # 文件系统实时同步
+        self.watcher = None
+        self.live_sync = tk.BooleanVar(value=False)
+        
         # 用于存储所有节点的Entry引用
         self.node_entries = {}
         
         # 标签管理
         self.available_tags = ["功能复合", "单一职责", "服务层"]  # 默认标签
-        self.node_tags = {}  # 存储每个节点的标签
+        self.node_tags = {}  # 节点相对路径 -> 标签列表（按路径保存，节点重建后标签仍然有效）
+        self.load_annotations()
+        self.flush_scheduled = False  # 是否已安排延迟保存描述和标签
+        
+        # 搜索
+        self.search_text = tk.StringVar()
+        self.fuzzy_search = tk.BooleanVar(value=False)
         
         logger.info("Initializing project view")
         self.setup_ui()
@@ -58,7 +72,10 @@ class ProjectView:
         content_frame = ttk.Frame(main_frame)
         content_frame.grid(row=2, column=0, sticky=(tk.W, tk.E, tk.N, tk.S), pady=10)
         content_frame.columnconfigure(0, weight=1)
-        content_frame.rowconfigure(0, weight=1)
+        content_frame.rowconfigure(1, weight=1)
+        
+        # 搜索栏
+        self.create_search_bar(content_frame)
         
         # 创建树形视图
         self.create_tree_view(content_frame)
@@ -90,11 +107,14 @@ class ProjectView:
         gitignore_text = "是" if self.project_model.use_gitignore else "否"
         ttk.Label(info_frame, text=gitignore_text).grid(row=2, column=1, sticky=tk.W)
         
-        # 统计信息
+        # 统计信息（按需加载模式下只统计已加载的部分）
         if self.project_model.root_node:
             stats = self.get_statistics()
             ttk.Label(info_frame, text="统计:").grid(row=3, column=0, sticky=tk.W, padx=(0, 5))
-            stats_text = f"目录 {stats['directories']} 个，文件 {stats['files']} 个"
+            stats_text = (f"目录 {stats['directories']} 个，文件 {stats['files']} 个，"
+                          f"共 {Utils.format_file_size(stats['size'])}")
+            if stats['partial']:
+                stats_text = f"已加载{stats_text}（按需加载）"
             ttk.Label(info_frame, text=stats_text).grid(row=3, column=1, sticky=tk.W)
     
     def create_tag_panel(self, parent):
@@ -136,6 +156,7 @@ class ProjectView:
             tag_label = ttk.Label(tag_frame, text=tag, background="lightblue", 
                                  relief="solid", borderwidth=1, padding="2")
             tag_label.grid(row=0, column=0)
+            tag_label.bind('<Button-1>', lambda e, t=tag: self.select_tagged(t))
             
             # 删除按钮
             if tag not in ["功能复合", "单一职责", "服务层"]:  # 默认标签不可删除
@@ -148,6 +169,7 @@ class ProjectView:
         new_tag = self.new_tag_entry.get().strip()
         if new_tag and len(new_tag) <= 5 and new_tag not in self.available_tags:
             self.available_tags.append(new_tag)
+            self.save_available_tags()
             self.new_tag_entry.delete(0, tk.END)
             self.update_tag_display()
             logger.info(f"Added new tag: {new_tag}")
@@ -156,19 +178,97 @@ class ProjectView:
         """删除标签"""
         if tag in self.available_tags and tag not in ["功能复合", "单一职责", "服务层"]:
             self.available_tags.remove(tag)
-            # 同时从所有节点中删除此标签
-            for node_id in list(self.node_tags.keys()):
-                if tag in self.node_tags[node_id]:
-                    self.node_tags[node_id].remove(tag)
+            self.save_available_tags()
+            # 同时从所有节点中删除此标签（按需加载模式下node_tags只包含已加载的节点，按存储查找）
+            rel_paths = self.project_model.find_tagged(tag)
+            if rel_paths is None:
+                rel_paths = [node_id for node_id, tags in self.node_tags.items() if tag in tags]
+            for node_id in rel_paths:
+                tags = self.node_tags.get(node_id)
+                if tags is None:
+                    tags = self.project_model.get_tags(node_id)
+                self.node_tags[node_id] = [other for other in tags if other != tag]
+                self.project_model.set_tags(node_id, self.node_tags[node_id])
+            self.schedule_flush()
             self.update_tag_display()
             self.refresh_tree()
             logger.info(f"Removed tag: {tag}")
     
+    def select_tagged(self, tag):
+        """选中当前选中目录（未选中时为整个工程）下标记了该标签的节点"""
+        base = self.get_node_from_item(self.tree.focus())
+        if base is not None and not base.is_directory:
+            base = base.parent
+        prefix = self.project_model.get_relative_path(base) if base is not None else ""
+        
+        rel_paths = self.project_model.find_tagged(tag, prefix)
+        if rel_paths is None:
+            # 没有持久化存储时在内存中查找
+            rel_paths = sorted(path for path, tags in self.node_tags.items()
+                               if tag in tags and (not prefix or path == prefix or path.startswith(prefix + os.sep)))
+        
+        nodes = [node for node in map(self.project_model.find_node, rel_paths) if node is not None]
+        items = [item_id for item_id in map(self.reveal_node, nodes) if item_id]
+        self.tree.selection_set(items)
+        if items:
+            self.tree.see(items[0])
+        self.search_result_label.config(text=f"标签“{tag}”: {len(items)} 项")
+        logger.info(f"Selected {len(items)} nodes tagged '{tag}' under '{prefix}'")
+    
+    def load_annotations(self):
+        """从持久化存储读取已加载节点的标签和可用标签列表（按需加载的目录展开时再读取）"""
+        store = self.project_model.annotation_store
+        if store is None:
+            return
+        saved_tags = store.get_available_tags()
+        if saved_tags:
+            self.available_tags = saved_tags
+        self.node_tags = self.project_model.load_tags()
+    
+    def save_available_tags(self):
+        """保存可用标签列表"""
+        if self.project_model.annotation_store is not None:
+            self.project_model.annotation_store.set_available_tags(self.available_tags)
+    
+    def schedule_flush(self):
+        """安排延迟保存描述和标签，连续编辑合并为一次写入"""
+        if self.project_model.annotation_store is None or self.flush_scheduled:
+            return
+        self.flush_scheduled = True
+        self.root.after(1000, self.flush_annotations)
+    
+    def flush_annotations(self):
+        """写入排队的描述和标签修改"""
+        self.flush_scheduled = False
+        if self.project_model.annotation_store is not None:
+            self.project_model.annotation_store.flush()
+    
+    def create_search_bar(self, parent):
+        """创建搜索栏"""
+        search_frame = ttk.Frame(parent)
+        search_frame.grid(row=0, column=0, sticky=(tk.W, tk.E), pady=(0, 5))
+        search_frame.columnconfigure(1, weight=1)
+        
+        ttk.Label(search_frame, text="搜索:").grid(row=0, column=0, sticky=tk.W, padx=(0, 5))
+        
+        search_entry = ttk.Entry(search_frame, textvariable=self.search_text)
+        search_entry.grid(row=0, column=1, sticky=(tk.W, tk.E))
+        search_entry.bind('<Return>', self.on_search)
+        
+        fuzzy_checkbox = ttk.Checkbutton(search_frame, text="模糊匹配", variable=self.fuzzy_search)
+        fuzzy_checkbox.grid(row=0, column=2, padx=(5, 0))
+        
+        search_button = ttk.Button(search_frame, text="搜索", command=self.on_search)
+        search_button.grid(row=0, column=3, padx=(5, 0))
+        
+        self.search_result_label = ttk.Label(search_frame, text="")
+        self.search_result_label.grid(row=0, column=4, padx=(5, 0))
+    
     def create_tree_view(self, parent):
         """创建树形视图"""
         # 创建框架用于放置树形视图和滚动条
         tree_frame = ttk.Frame(parent)
-        tree_frame.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
+        tree_frame.grid(row=1, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
         tree_frame.columnconfigure(0, weight=1)
         tree_frame.rowconfigure(0, weight=1)
         
@@ -203,6 +303,7 @@ class ProjectView:
         self.populate_tree()
         
         # 绑定事件
+        self.tree.bind('<<TreeviewOpen>>', self.on_item_open)
         self.tree.bind('<Double-1>', self.on_item_double_click)
         self.tree.bind('<Button-3>', self.show_context_menu)
         self.tree.bind('<Button-1>', self.on_item_click)
@@ -221,6 +322,13 @@ class ProjectView:
         refresh_button = ttk.Button(button_frame, text="刷新", command=self.refresh_tree)
         refresh_button.grid(row=0, column=1, padx=(0, 10))
         
+        # 实时同步选项（列式存储的文件树不支持增量修改）
+        if self.file_processor and self.project_model.tree_store is None:
+            live_sync_checkbox = ttk.Checkbutton(button_frame, text="实时同步磁盘变化",
+                                                 variable=self.live_sync,
+                                                 command=self.toggle_live_sync)
+            live_sync_checkbox.grid(row=0, column=2, sticky=tk.W)
+        
         # 导出按钮
         export_frame = ttk.Frame(button_frame)
         export_frame.grid(row=0, column=3)
@@ -236,6 +344,16 @@ class ProjectView:
         export_rules_button = ttk.Button(export_frame, text="导出 Cursor Rules", 
                                         command=self.export_cursor_rules)
         export_rules_button.grid(row=0, column=2)
+        
+        save_snapshot_button = ttk.Button(export_frame, text="保存快照",
+                                          command=self.save_snapshot)
+        save_snapshot_button.grid(row=0, column=3, padx=(5, 0))
+        
+        # 过滤统计（扫描时开启了统计才显示）
+        if self.file_processor and self.file_processor.filter_engine.collect_stats:
+            filter_stats_button = ttk.Button(export_frame, text="过滤统计",
+                                             command=self.show_filter_stats)
+            filter_stats_button.grid(row=0, column=4, padx=(5, 0))
     
     def populate_tree(self):
         """填充树形数据"""
@@ -244,45 +362,145 @@ class ProjectView:
             self.tree.delete(item)
         
         self.node_entries.clear()
-        # 创建item_id到节点的映射
+        # 创建item_id与节点的双向映射
         self.item_to_node_map = {}
+        self.node_to_item_map = {}
+        
+        # 按需加载的占位项
+        self.placeholder_items = set()
         
         # 如果有根节点，开始填充
         if self.project_model.root_node:
             self.insert_node(self.project_model.root_node, '')
     
     def insert_node(self, node, parent_id):
-        """插入节点到树形视图"""
-        # 确定图标
-        if node.is_directory:
-            icon = "📁"
-        else:
-            icon = "📄"
+        """插入节点到树形视图（显式栈实现，不受递归深度限制）"""
+        stack = [(node, parent_id)]
         
-        # 获取节点标签
-        node_key = f"{node.path}_{node.name}"
-        tags = self.node_tags.get(node_key, [])
-        tags_text = ", ".join(tags) if tags else ""
+        while stack:
+            current, current_parent_id = stack.pop()
+            
+            # 确定图标
+            if current.is_directory:
+                icon = "📁"
+            else:
+                icon = "📄"
+            
+            # 获取节点标签
+            tags = self.node_tags.get(self.project_model.get_relative_path(current), [])
+            tags_text = ", ".join(tags) if tags else ""
+            
+            # 插入节点（未完整扫描的目录附加提示）
+            display_text = f"{icon} {current.name}"
+            if current.truncated:
+                display_text += " (未完整扫描)"
+            item_id = self.tree.insert(current_parent_id, 'end', text=display_text, 
+                                      values=(tags_text, current.description))
+            
+            # 存储节点引用映射
+            self.item_to_node_map[item_id] = current
+            self.node_to_item_map[current] = item_id
+            
+            # 设置行的背景色（创建分隔线效果）
+            if len(self.tree.get_children(current_parent_id)) % 2 == 0:
+                self.tree.set(item_id, 'tags', tags_text)
+            
+            # 未加载的目录插入占位项，展开时再加载（根节点默认展开，直接加载）；
+            # 列式存储的文件树节点众多，其目录同样在展开时才插入子节点
+            deferred = not current.is_loaded() or (self.project_model.tree_store is not None
+                                                    and current.has_children())
+            if deferred and current_parent_id != '':
+                placeholder_id = self.tree.insert(item_id, 'end', text="加载中...")
+                self.placeholder_items.add(placeholder_id)
+                continue
+            
+            # 子节点逆序入栈，保证插入顺序与原顺序一致
+            stack.extend((child, item_id) for child in reversed(current.children))
+            
+            # 展开目录节点
+            if current.is_directory and current_parent_id == '':
+                self.tree.item(item_id, open=True)
+    
+    def on_item_open(self, event):
+        """展开目录时按需加载子节点"""
+        self.load_item_children(self.tree.focus())
+    
+    def load_item_children(self, item_id):
+        """将目录项的占位项替换为子节点"""
+        node = self.get_node_from_item(item_id)
+        if not node:
+            return
         
-        # 插入节点
-        display_text = f"{icon} {node.name}"
-        item_id = self.tree.insert(parent_id, 'end', text=display_text, 
-                                  values=(tags_text, node.description))
+        placeholders = [child_id for child_id in self.tree.get_children(item_id)
+                        if child_id in self.placeholder_items]
+        if not placeholders:
+            return
         
-        # 存储节点引用映射
-        self.item_to_node_map[item_id] = node
+        for placeholder_id in placeholders:
+            self.placeholder_items.discard(placeholder_id)
+            self.tree.delete(placeholder_id)
         
-        # 设置行的背景色（创建分隔线效果）
-        if len(self.tree.get_children(parent_id)) % 2 == 0:
-            self.tree.set(item_id, 'tags', tags_text)
+        try:
+            if self.watcher and not node.is_loaded():
+                self.watcher.watch_directory(node)
+            children = node.children
+            if self.project_model.lazy_load:
+                # 刚加载的子节点还没有应用保存的描述和标签
+                self.project_model.apply_descriptions(node)
+                self.node_tags.update(self.project_model.load_tags(node))
+            for child in children:
+                self.insert_node(child, item_id)
+        except Exception as e:
+            logger.error(f"Error loading directory {node.path}: {str(e)}")
+    
+    def reveal_node(self, node):
+        """
+        在树形视图中显示节点（依次插入并展开尚未显示的上级目录）
+        
+        Returns:
+            str: 节点对应的项目ID，节点不在树中时返回None
+        """
+        ancestors = []
+        current = node
+        while current is not None and current not in self.node_to_item_map:
+            ancestors.append(current)
+            current = current.parent
+        if current is None:
+            return None
+        
+        item_id = self.node_to_item_map[current]
+        for ancestor in reversed(ancestors):
+            self.load_item_children(item_id)
+            self.tree.item(item_id, open=True)
+            item_id = self.node_to_item_map.get(ancestor)
+            if item_id is None:
+                return None
+        return item_id
+    
+    def on_search(self, event=None):
+        """搜索并选中匹配的节点"""
+        query = self.search_text.get().strip()
+        if not query:
+            return
+        
+        limit = 50
+        try:
+            results = self.project_model.search(query, limit, self.fuzzy_search.get())
+        except Exception as e:
+            logger.error(f"Error searching {query}: {str(e)}")
+            messagebox.showerror("错误", f"搜索时出现错误: {str(e)}")
+            return
         
-        # 递归插入子节点
-        for child in node.children:
-            self.insert_node(child, item_id)
+        items = [item_id for item_id in map(self.reveal_node, results) if item_id]
+        self.tree.selection_set(items)
+        if items:
+            self.tree.see(items[0])
         
-        # 展开目录节点
-        if node.is_directory and parent_id == '':
-            self.tree.item(item_id, open=True)
+        result_text = f"找到 {len(results)} 项"
+        if len(results) >= limit:
+            result_text = f"显示得分最高的 {limit} 项"
+        self.search_result_label.config(text=result_text)
+        logger.info(f"Search '{query}' matched {len(results)} nodes")
     
     def on_item_click(self, event):
         """处理单击事件 - 用于标签编辑"""
@@ -309,7 +527,7 @@ class ProjectView:
         if not node:
             return
         
-        node_key = f"{node.path}_{node.name}"
+        node_key = self.project_model.get_relative_path(node)
         current_tags = self.node_tags.get(node_key, [])
         
         # 创建标签选择对话框
@@ -318,6 +536,8 @@ class ProjectView:
         
         if new_tags is not None:
             self.node_tags[node_key] = new_tags
+            self.project_model.set_tags(node_key, new_tags)
+            self.schedule_flush()
             # 更新树形视图显示
             tags_text = ", ".join(new_tags) if new_tags else ""
             self.tree.set(item_id, 'tags', tags_text)
@@ -343,7 +563,8 @@ class ProjectView:
         # 定义保存函数
         def save_description(event=None):
             new_description = edit_entry.get()
-            node.description = new_description
+            self.project_model.set_description(node, new_description)
+            self.schedule_flush()
             self.tree.set(item_id, 'description', new_description)
             edit_frame.destroy()
             logger.info(f"Updated description for {node.name}")
@@ -374,7 +595,8 @@ class ProjectView:
             
             if new_description is not None:
                 # 更新节点描述
-                node.description = new_description
+                self.project_model.set_description(node, new_description)
+                self.schedule_flush()
                 
                 # 更新树形视图显示
                 self.tree.set(item_id, 'description', new_description)
@@ -413,6 +635,9 @@ class ProjectView:
     def expand_all(self):
         """展开所有节点"""
         def expand_item(item_id):
+            # 未加载的目录保持折叠，避免一次性加载整棵树
+            if any(child_id in self.placeholder_items for child_id in self.tree.get_children(item_id)):
+                return
             self.tree.item(item_id, open=True)
             for child_id in self.tree.get_children(item_id):
                 expand_item(child_id)
@@ -434,21 +659,90 @@ class ProjectView:
         """刷新树形视图"""
         self.populate_tree()
     
-    def get_statistics(self):
-        """获取统计信息"""
-        stats = {'directories': 0, 'files': 0}
+    def toggle_live_sync(self):
+        """开启或关闭文件系统实时同步"""
+        if self.live_sync.get():
+            self.start_live_sync()
+        else:
+            self.stop_live_sync()
+    
+    def start_live_sync(self):
+        """开启文件系统实时同步"""
+        if self.watcher or not self.project_model.root_node or not self.file_processor:
+            return
         
-        def count_nodes(node):
-            if node.is_directory:
-                stats['directories'] += 1
-            else:
-                stats['files'] += 1
+        try:
+            self.watcher = FileSystemWatcher(
+                self.file_processor,
+                self.project_model.root_node,
+                on_changes=lambda dirty: self.root.after(0, lambda: self.on_fs_changes(dirty)),
+                path_index=self.project_model.path_index,
+                search_index=self.project_model.search_index,
+                lazy=self.project_model.lazy_load
+            )
+            self.watcher.start()
+            mode = "polling" if self.watcher.is_polling() else "inotify"
+            logger.info(f"Live sync started ({mode})")
+        except Exception as e:
+            self.watcher = None
+            self.live_sync.set(False)
+            logger.error(f"Failed to start live sync: {str(e)}")
+            messagebox.showerror("错误", f"开启实时同步失败: {str(e)}")
+    
+    def stop_live_sync(self):
+        """关闭文件系统实时同步"""
+        if self.watcher:
+            self.watcher.stop()
+            self.watcher = None
+            logger.info("Live sync stopped")
+    
+    def on_fs_changes(self, dirty_paths):
+        """处理监听器合并后的目录变化（在主线程中执行）"""
+        if not self.watcher:
+            return
+        
+        changes = self.watcher.apply(dirty_paths)
+        if changes:
+            self.apply_tree_changes(changes)
+            logger.info(f"Applied {len(changes)} file system changes")
+    
+    def apply_tree_changes(self, changes):
+        """将节点变化增量应用到树形视图，无需重新填充整棵树"""
+        affected_parents = []
+        
+        for action, parent, node in changes:
+            parent_item = self.node_to_item_map.get(parent)
+            if parent_item is None:
+                continue
             
-            for child in node.children:
-                count_nodes(child)
+            if action == 'removed':
+                item_id = self.node_to_item_map.get(node)
+                if item_id is not None:
+                    for removed, _ in node.walk(loaded_only=True):
+                        removed_item = self.node_to_item_map.pop(removed, None)
+                        self.item_to_node_map.pop(removed_item, None)
+                    self.tree.delete(item_id)
+            elif action == 'added':
+                self.insert_node(node, parent_item)
+                affected_parents.append(parent)
+        
+        # 按节点顺序调整新增项的位置
+        for parent in dict.fromkeys(affected_parents):
+            parent_item = self.node_to_item_map.get(parent)
+            for index, child in enumerate(parent.children):
+                child_item = self.node_to_item_map.get(child)
+                if parent_item is not None and child_item is not None:
+                    self.tree.move(child_item, parent_item, index)
+    
+    def get_statistics(self):
+        """获取统计信息（读取根节点的子树汇总，按需加载模式下只包含已加载部分）"""
+        stats = {'directories': 0, 'files': 0, 'size': 0, 'partial': self.project_model.lazy_load}
         
-        if self.project_model.root_node:
-            count_nodes(self.project_model.root_node)
+        root_node = self.project_model.root_node
+        if root_node:
+            stats['directories'] = root_node.dir_count
+            stats['files'] = root_node.file_count
+            stats['size'] = root_node.total_size
         
         return stats
     
@@ -518,8 +812,63 @@ class ProjectView:
             messagebox.showerror("错误", error_msg)
             logger.error(error_msg)
     
+    def save_snapshot(self):
+        """保存工程快照（之后可在配置界面直接打开，无需重新扫描）"""
+        try:
+            file_path = filedialog.asksaveasfilename(
+                title="保存工程快照",
+                defaultextension=".snap",
+                filetypes=[("Project snapshot", "*.snap"), ("All files", "*.*")]
+            )
+            
+            if file_path:
+                output_path, message = ProjectSnapshot().save(self.project_model, file_path)
+                if output_path:
+                    messagebox.showinfo("成功", f"快照保存成功！\n文件保存至: {output_path}")
+                    logger.info(f"Saved snapshot: {output_path}")
+                else:
+                    messagebox.showerror("错误", message)
+                    logger.error(f"Save snapshot failed: {message}")
+        except Exception as e:
+            error_msg = f"保存快照失败: {str(e)}"
+            messagebox.showerror("错误", error_msg)
+            logger.error(error_msg)
+    
+    def show_filter_stats(self):
+        """显示各过滤条件的匹配统计"""
+        pattern_stats = self.file_processor.filter_engine.get_pattern_stats()
+        if not pattern_stats:
+            messagebox.showinfo("过滤统计", "没有设置过滤条件")
+            return
+        FilterStatsDialog(self.root, pattern_stats, on_export=self.export_filter_report)
+    
+    def export_filter_report(self, pattern_stats):
+        """导出过滤条件统计报告"""
+        try:
+            file_path = filedialog.asksaveasfilename(
+                title="保存过滤统计报告",
+                defaultextension=".md",
+                filetypes=[("Markdown files", "*.md"), ("All files", "*.*")]
+            )
+            
+            if file_path:
+                output_path, message = self.exporter.export_filter_report(self.project_model, pattern_stats,
+                                                                          file_path)
+                if output_path:
+                    messagebox.showinfo("成功", f"导出成功！\n文件保存至: {output_path}")
+                    logger.info(f"Exported filter report: {output_path}")
+                else:
+                    messagebox.showerror("错误", message)
+                    logger.error(f"Export filter report failed: {message}")
+        except Exception as e:
+            error_msg = f"导出失败: {str(e)}"
+            messagebox.showerror("错误", error_msg)
+            logger.error(error_msg)
+    
     def on_back_click(self):
         """处理返回按钮点击"""
+        self.stop_live_sync()
+        self.flush_annotations()
         if self.on_back_to_config:
             logger.info("Returning to config view")
             self.on_back_to_config()
@@ -726,4 +1075,80 @@ class TagSelectionDialog:
     def on_cancel(self):
         """取消按钮"""
         self.result = None
-        self.dialog.destroy()
\ No newline at end of file
+        self.dialog.destroy()
+
+class FilterStatsDialog:
+    """过滤条件统计对话框"""
+    
+    COLUMNS = (
+        ('evaluations', "匹配次数", 80),
+        ('hits', "命中次数", 80),
+        ('time', "耗时 (ms)", 90),
+        ('pruned_entries', "排除条目", 80),
+        ('pruned_bytes', "排除大小", 90),
+    )
+    
+    def __init__(self, parent, pattern_stats, on_export=None):
+        self.pattern_stats = pattern_stats
+        self.on_export = on_export
+        
+        # 创建对话框窗口
+        self.dialog = tk.Toplevel(parent)
+        self.dialog.title("过滤统计")
+        self.dialog.geometry("680x420")
+        self.dialog.transient(parent)
+        
+        # 创建界面
+        self.setup_ui()
+    
+    def setup_ui(self):
+        """设置对话框界面"""
+        main_frame = ttk.Frame(self.dialog, padding="10")
+        main_frame.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
+        
+        # 配置网格权重
+        self.dialog.columnconfigure(0, weight=1)
+        self.dialog.rowconfigure(0, weight=1)
+        main_frame.columnconfigure(0, weight=1)
+        main_frame.rowconfigure(1, weight=1)
+        
+        # 汇总信息
+        total_time = sum(stats['time'] for stats in self.pattern_stats)
+        unused = sum(1 for stats in self.pattern_stats if not stats['hits'])
+        summary = f"共 {len(self.pattern_stats)} 个模式，累计匹配耗时 {total_time * 1000:.2f} ms，未命中 {unused} 个"
+        ttk.Label(main_frame, text=summary).grid(row=0, column=0, sticky=tk.W, pady=(0, 10))
+        
+        # 统计表格，按耗时从高到低排列
+        tree = ttk.Treeview(main_frame, columns=[key for key, _, _ in self.COLUMNS])
+        tree.heading('#0', text="模式")
+        tree.column('#0', width=220)
+        for key, title, width in self.COLUMNS:
+            tree.heading(key, text=title)
+            tree.column(key, width=width, anchor=tk.E)
+        
+        for stats in sorted(self.pattern_stats, key=lambda stats: stats['time'], reverse=True):
+            tree.insert('', 'end', text=stats['pattern'], values=(
+                stats['evaluations'],
+                stats['hits'],
+                f"{stats['time'] * 1000:.2f}",
+                stats['pruned_entries'],
+                Utils.format_file_size(stats['pruned_bytes'])
+            ))
+        tree.grid(row=1, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
+        
+        scrollbar = ttk.Scrollbar(main_frame, orient=tk.VERTICAL, command=tree.yview)
+        scrollbar.grid(row=1, column=1, sticky=(tk.N, tk.S))
+        tree.configure(yscrollcommand=scrollbar.set)
+        
+        # 按钮
+        button_frame = ttk.Frame(main_frame)
+        button_frame.grid(row=2, column=0, columnspan=2, sticky=(tk.W, tk.E), pady=(10, 0))
+        button_frame.columnconfigure(0, weight=1)
+        
+        if self.on_export:
+            ttk.Button(button_frame, text="导出报告", command=self.on_export_click).grid(row=0, column=1, padx=(5, 0))
+        ttk.Button(button_frame, text="关闭", command=self.dialog.destroy).grid(row=0, column=2, padx=(5, 0))
+    
+    def on_export_click(self):
+        """导出按钮"""
+        self.on_export(self.pattern_stats)